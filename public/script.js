@@ -1,10 +1,27 @@
 class StockScreenerApp {
     constructor() {
         this.dataUrl = 'data/screener_results.json';
-        this.refreshInterval = 15 * 60 * 1000; // 15 minutes
+        this.shardBaseUrl = 'data/shards/';
+        this.indexUrl = `${this.shardBaseUrl}index.json`;
+        this.index = null; // shard index; null when serving the single results file
+        this.shardCache = new Map(); // shard file -> stocks (file names are content-hashed)
+        this.totalStocks = 0;
+        this.versionUrl = 'data/version.json';
+        this.dataVersion = null; // version.json "version" of the rendered data
+        this.refreshInterval = 5 * 60 * 1000; // 5 minutes (only version.json is polled)
         this.refreshTimer = null;
         this.isLoading = false;
         this.allStocks = []; // Store all stocks for filtering
+        this.filterWorker = this.createFilterWorker(); // null: filter on the main thread
+        this.filterRequestId = 0;
+        this.columnsSource = null; // allStocks array the worker/main-thread columns were built from
+        this.columns = null;
+        this.visibleIndices = new Int32Array(0); // filtered, sorted indices into allStocks
+        this.virtualGrid = null; // { columns, cardHeight, rowStride } of the virtualized list
+        this.virtualRange = null; // [firstRow, lastRow) currently in the DOM
+        this.virtualFrame = null;
+        this.remeasurePending = false;
+        this.overscanRows = 4;
         this.filters = {
             market: 'all',
             signal: 'all',
@@ -89,6 +106,10 @@ class StockScreenerApp {
                 this.hideAbout();
             }
         });
+        
+        // Virtualized list: only the rows around the viewport are in the DOM
+        window.addEventListener('scroll', () => this.scheduleVirtualRender(), { passive: true });
+        window.addEventListener('resize', () => this.scheduleVirtualRender(true));
     }
     
     bindFilterListeners() {
@@ -114,7 +135,7 @@ class StockScreenerApp {
         button.classList.add('active');
         
         // Apply filters
-        this.applyFilters();
+        this.updateView();
     }
     
     clearAllFilters() {
@@ -134,59 +155,111 @@ class StockScreenerApp {
         });
         
         // Apply filters
+        this.updateView();
+    }
+    
+    async updateView() {
+        if (this.index) {
+            try {
+                await this.loadShards();
+            } catch (error) {
+                console.error('Error loading shards:', error);
+                this.showError(this.getErrorMessage(error));
+                return;
+            }
+        }
         this.applyFilters();
     }
     
+    shardMatchesFilters(shard) {
+        if (this.filters.market !== 'all' && shard.market !== this.filters.market) {
+            return false;
+        }
+        if (this.filters.signal !== 'all' && !shard.signals.includes(this.filters.signal)) {
+            return false;
+        }
+        if (this.filters.action !== 'all' && !shard.actions.includes(this.filters.action)) {
+            return false;
+        }
+        return true;
+    }
+    
+    async loadShards() {
+        // Only fetch shards the active filters can show; hashed names make cached shards reusable
+        const missing = this.index.shards.filter(shard => this.shardMatchesFilters(shard) && !this.shardCache.has(shard.file));
+        const loaded = await Promise.all(missing.map(shard => this.fetchJson(`${this.shardBaseUrl}${shard.file}`)));
+        missing.forEach((shard, i) => this.shardCache.set(shard.file, loaded[i]));
+        
+        // Filters may have changed while fetching, so select from the current ones
+        this.allStocks = this.index.shards
+            .filter(shard => this.shardMatchesFilters(shard) && this.shardCache.has(shard.file))
+            .flatMap(shard => this.shardCache.get(shard.file));
+    }
+    
+    createFilterWorker() {
+        if (typeof Worker === 'undefined') {
+            return null;
+        }
+        try {
+            const worker = new Worker('stock-filter.js');
+            worker.onmessage = (e) => this.onFilterResult(e.data);
+            worker.onerror = (e) => {
+                // e.g. workers blocked on file:// pages: filter on the main thread instead
+                console.warn('Filter worker unavailable, filtering on the main thread:', e.message);
+                worker.terminate();
+                this.filterWorker = null;
+                this.columnsSource = null;
+                this.applyFilters();
+            };
+            return worker;
+        } catch (error) {
+            return null;
+        }
+    }
+    
     applyFilters() {
-        if (!this.allStocks || this.allStocks.length === 0) {
+        if (!this.allStocks || this.totalStocks === 0) {
             return;
         }
         
-        let filteredStocks = this.allStocks.filter(stock => {
-            // Market filter
-            if (this.filters.market !== 'all' && stock.market !== this.filters.market) {
-                return false;
-            }
-            
-            // Signal type filter
-            if (this.filters.signal !== 'all') {
-                const hasSignal1 = stock.signals.signal1.entry || stock.signals.signal1.exit;
-                const hasSignal2 = stock.signals.signal2.entry;
-                
-                if (this.filters.signal === 'signal1' && !hasSignal1) {
-                    return false;
-                }
-                if (this.filters.signal === 'signal2' && !hasSignal2) {
-                    return false;
-                }
-            }
-            
-            // Action filter
-            if (this.filters.action !== 'all') {
-                const hasEntry = stock.signals.signal1.entry || stock.signals.signal2.entry;
-                const hasExit = stock.signals.signal1.exit;
-                
-                if (this.filters.action === 'entry' && !hasEntry) {
-                    return false;
-                }
-                if (this.filters.action === 'exit' && !hasExit) {
-                    return false;
-                }
+        // Ship a compact columnar copy whenever the stock list itself changed
+        if (this.columnsSource !== this.allStocks) {
+            this.columnsSource = this.allStocks;
+            const columns = buildStockColumns(this.allStocks);
+            if (this.filterWorker) {
+                this.filterWorker.postMessage(
+                    { type: 'load', columns },
+                    [columns.market.buffer, columns.flags.buffer, columns.price.buffer]
+                );
+            } else {
+                this.columns = columns;
             }
-            
-            return true;
-        });
+        }
+        
+        const requestId = ++this.filterRequestId;
+        if (this.filterWorker) {
+            this.filterWorker.postMessage({ type: 'filter', requestId, filters: { ...this.filters } });
+        } else {
+            this.onFilterResult({ requestId, indices: filterStockColumns(this.columns, this.filters) });
+        }
+    }
+    
+    onFilterResult({ requestId, indices }) {
+        // Ignore answers to filter clicks that have since been superseded
+        if (requestId !== this.filterRequestId) {
+            return;
+        }
         
         // Update filter count
-        this.updateFilterCount(filteredStocks.length);
+        this.updateFilterCount(indices.length);
         
         // Render filtered stocks
-        this.renderFilteredStocks(filteredStocks);
+        this.renderFilteredStocks(indices);
     }
     
     updateFilterCount(count) {
         const filterCount = document.getElementById('filterCount');
-        const totalCount = this.allStocks.length;
+        const totalCount = this.totalStocks;
         
         if (filterCount) {
             if (count === totalCount) {
@@ -197,15 +270,20 @@ class StockScreenerApp {
         }
     }
     
-    renderFilteredStocks(stocks) {
+    renderFilteredStocks(indices) {
         const stocksList = document.getElementById('stocksList');
         const emptyState = document.getElementById('emptyState');
         const noFilterResults = document.getElementById('noFilterResults');
         
         if (!stocksList) return;
         
-        if (stocks.length === 0) {
+        this.visibleIndices = indices;
+        this.virtualRange = null;
+        
+        if (indices.length === 0) {
             stocksList.innerHTML = '';
+            stocksList.style.paddingTop = '';
+            stocksList.style.paddingBottom = '';
             if (emptyState) emptyState.classList.add('hidden');
             if (noFilterResults) noFilterResults.classList.remove('hidden');
             return;
@@ -214,44 +292,141 @@ class StockScreenerApp {
         if (emptyState) emptyState.classList.add('hidden');
         if (noFilterResults) noFilterResults.classList.add('hidden');
         
-        // Generate stock cards
-        stocksList.innerHTML = stocks.map(stock => this.createStockCard(stock)).join('');
+        this.measureVirtualGrid(stocksList);
+        this.renderVirtualWindow(true);
+    }
+    
+    measureVirtualGrid(stocksList) {
+        // Lay out the first cards for real to learn the column count and a common card height
+        stocksList.style.paddingTop = '';
+        stocksList.style.paddingBottom = '';
+        stocksList.style.gridAutoRows = '';
+        stocksList.innerHTML = this.cardsHtml(this.visibleIndices.slice(0, 24));
         
-        // Add animation to cards
-        const cards = stocksList.querySelectorAll('.stock-card');
-        cards.forEach((card, index) => {
-            card.style.animationDelay = `${index * 0.1}s`;
-            card.classList.add('slide-up');
+        const style = getComputedStyle(stocksList);
+        const columns = style.gridTemplateColumns.split(' ').filter(Boolean).length;
+        const cardHeight = Math.max(0, ...Array.from(stocksList.querySelectorAll('.stock-card'), card => card.offsetHeight));
+        if (!cardHeight || style.gridTemplateColumns === 'none') {
+            this.virtualGrid = null; // not laid out (hidden); render everything
+            return;
+        }
+        
+        this.virtualGrid = { columns, cardHeight, rowGap: parseFloat(style.rowGap) || 0 };
+        this.virtualGrid.rowStride = cardHeight + this.virtualGrid.rowGap;
+        stocksList.style.gridAutoRows = `${cardHeight}px`;
+    }
+    
+    cardsHtml(indices) {
+        return Array.from(indices, i => this.createStockCard(this.allStocks[i])).join('');
+    }
+    
+    renderVirtualWindow(animate = false) {
+        const stocksList = document.getElementById('stocksList');
+        const grid = this.virtualGrid;
+        if (!stocksList || this.visibleIndices.length === 0) return;
+        
+        if (!grid) {
+            if (!this.virtualRange) {
+                this.virtualRange = [0, Infinity];
+                stocksList.innerHTML = this.cardsHtml(this.visibleIndices);
+            }
+            return;
+        }
+        
+        // Rows intersecting the viewport plus some overscan; the rest is padding
+        const totalRows = Math.ceil(this.visibleIndices.length / grid.columns);
+        const viewTop = -stocksList.getBoundingClientRect().top;
+        const firstRow = Math.min(totalRows, Math.max(0, Math.floor(viewTop / grid.rowStride) - this.overscanRows));
+        const lastRow = Math.min(
+            totalRows,
+            Math.max(firstRow, Math.ceil((viewTop + window.innerHeight) / grid.rowStride) + this.overscanRows)
+        );
+        if (!animate && this.virtualRange && this.virtualRange[0] === firstRow && this.virtualRange[1] === lastRow) {
+            return;
+        }
+        this.virtualRange = [firstRow, lastRow];
+        
+        stocksList.style.paddingTop = `${firstRow * grid.rowStride}px`;
+        stocksList.style.paddingBottom = `${(totalRows - lastRow) * grid.rowStride}px`;
+        stocksList.innerHTML = this.cardsHtml(this.visibleIndices.slice(firstRow * grid.columns, lastRow * grid.columns));
+        
+        const cards = Array.from(stocksList.querySelectorAll('.stock-card'));
+        if (cards.some(card => card.scrollHeight > card.clientHeight + 1)) {
+            // A card taller than the measured ones (e.g. a wrapped long name): relayout with its height
+            stocksList.style.gridAutoRows = '';
+            const cardHeight = Math.max(...cards.map(card => card.offsetHeight));
+            if (cardHeight > grid.cardHeight) {
+                grid.cardHeight = cardHeight;
+                grid.rowStride = cardHeight + grid.rowGap;
+                stocksList.style.gridAutoRows = `${cardHeight}px`;
+                this.virtualRange = null;
+                this.renderVirtualWindow(animate);
+                return;
+            }
+            stocksList.style.gridAutoRows = `${grid.cardHeight}px`;
+        }
+        
+        // Animate only freshly filtered results, not rows scrolled into view
+        if (animate) {
+            cards.forEach((card, index) => {
+                card.style.animationDelay = `${Math.min(index, 10) * 0.05}s`;
+                card.classList.add('slide-up');
+            });
+        }
+    }
+    
+    scheduleVirtualRender(remeasure = false) {
+        this.remeasurePending = this.remeasurePending || remeasure;
+        if (this.virtualFrame) return;
+        
+        this.virtualFrame = requestAnimationFrame(() => {
+            this.virtualFrame = null;
+            const stocksList = document.getElementById('stocksList');
+            if (this.remeasurePending && stocksList && this.visibleIndices.length) {
+                this.measureVirtualGrid(stocksList);
+                this.virtualRange = null;
+            }
+            this.remeasurePending = false;
+            this.renderVirtualWindow();
         });
     }
     
-    async loadData() {
+    async loadData(manifest) {
         if (this.isLoading) return;
         
         this.isLoading = true;
         this.showLoading();
         
         try {
-            const controller = new AbortController();
-            const timeoutId = setTimeout(() => controller.abort(), 10000); // 10 second timeout
-            
-            const response = await fetch(this.dataUrl, {
-                signal: controller.signal,
-                cache: 'no-cache'
-            });
-            
-            clearTimeout(timeoutId);
+            if (manifest === undefined) {
+                manifest = await this.fetchManifest();
+            }
             
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            // Prefer the small shard index; fall back to the single results file
+            const index = await this.fetchJson(this.indexUrl, { cache: 'no-cache' }).catch(() => null);
+            let data;
+            if (index && Array.isArray(index.shards)) {
+                this.index = index;
+                const current = new Set(index.shards.map(shard => shard.file));
+                for (const file of this.shardCache.keys()) {
+                    if (!current.has(file)) {
+                        this.shardCache.delete(file);
+                    }
+                }
+                await this.loadShards();
+                data = index;
+            } else {
+                this.index = null;
+                data = await this.fetchJson(this.dataUrl, { cache: 'no-cache' });
             }
             
-            const data = await response.json();
             this.renderData(data);
+            this.dataVersion = manifest ? manifest.version : null;
             this.hideLoading();
             this.hideError();
             
         } catch (error) {
+            this.dataVersion = null;
             console.error('Error loading data:', error);
             this.showError(this.getErrorMessage(error));
             this.hideLoading();
@@ -260,6 +435,45 @@ class StockScreenerApp {
         }
     }
     
+    updateLastUpdated(lastUpdated) {
+        const element = document.getElementById('lastUpdated');
+        if (element && lastUpdated) {
+            element.textContent = this.formatDateTime(new Date(lastUpdated));
+        }
+    }
+    
+    fetchManifest() {
+        return this.fetchJson(this.versionUrl, { cache: 'no-cache' }).catch(() => null);
+    }
+    
+    async checkForUpdates() {
+        if (this.isLoading) return;
+        
+        // Poll only the tiny manifest; reload and re-render when the published version changed
+        const manifest = await this.fetchManifest();
+        if (manifest && this.dataVersion && manifest.version === this.dataVersion) {
+            // Same stocks as rendered; only the run timestamp may have moved on
+            this.updateLastUpdated(manifest.last_updated);
+            return;
+        }
+        this.loadData(manifest);
+    }
+    
+    async fetchJson(url, options = {}) {
+        const controller = new AbortController();
+        const timeoutId = setTimeout(() => controller.abort(), 10000); // 10 second timeout
+        
+        try {
+            const response = await fetch(url, { ...options, signal: controller.signal });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            return await response.json();
+        } finally {
+            clearTimeout(timeoutId);
+        }
+    }
+    
     getErrorMessage(error) {
         if (error.name === 'AbortError') {
             return 'Request timed out. Please try again.';
@@ -275,28 +489,32 @@ class StockScreenerApp {
     
     renderData(data) {
         try {
-            // Validate data structure
-            if (!data || !data.metadata || !Array.isArray(data.filtered_stocks)) {
+            // Validate data structure (shard mode has already loaded the stocks)
+            const stocks = this.index ? this.allStocks : data && data.filtered_stocks;
+            if (!data || !data.metadata || !Array.isArray(stocks)) {
                 throw new Error('Invalid data format received');
             }
             
             // Store all stocks for filtering
-            this.allStocks = data.filtered_stocks;
+            this.allStocks = stocks;
+            this.totalStocks = this.index
+                ? this.index.shards.reduce((sum, shard) => sum + shard.count, 0)
+                : stocks.length;
             
             // Render statistics
             this.renderStatistics(data.metadata, data);
             
             // Show filters if we have data
-            if (this.allStocks.length > 0) {
+            if (this.totalStocks > 0) {
                 this.showFilters();
             }
             
+            // Show appropriate sections (before rendering, so the list can be measured)
+            this.showResults();
+            
             // Apply current filters to render stocks
             this.applyFilters();
             
-            // Show appropriate sections
-            this.showResults();
-            
         } catch (error) {
             console.error('Error rendering data:', error);
             this.showError('Error displaying data. Please refresh the page.');
@@ -331,8 +549,15 @@ class StockScreenerApp {
         
         if (elements.lastUpdated && metadata.last_updated) {
             const date = new Date(metadata.last_updated);
-            elements.lastUpdated.textContent = this.formatDateTime(date);
-            elements.lastUpdated.title = date.toLocaleString();
+            elements.lastUpdated.textContent = this.formatDateTime(date) + (metadata.complete === false ? ' (partial)' : '');
+            // Single-market runs keep the other market's timestamp from an earlier run
+            const marketTimes = Object.entries(metadata.markets || {})
+                .filter(([, summary]) => summary && summary.last_updated)
+                .map(([market, summary]) => `${market}: ${new Date(summary.last_updated).toLocaleString()}`);
+            if (metadata.complete === false && metadata.time_budget) {
+                marketTimes.push(`Partial run: ${metadata.time_budget.deferred_count} tickers deferred by the time budget`);
+            }
+            elements.lastUpdated.title = [date.toLocaleString(), ...marketTimes].join('\n');
         }
     }
     
@@ -615,7 +840,7 @@ class StockScreenerApp {
         
         // Set up new timer
         this.refreshTimer = setInterval(() => {
-            this.loadData();
+            this.checkForUpdates();
         }, this.refreshInterval);
     }
     
@@ -670,7 +895,7 @@ document.addEventListener('visibilitychange', () => {
         } else {
             window.stockScreenerApp.startAutoRefresh();
             // Refresh data when page becomes visible
-            setTimeout(() => window.stockScreenerApp.loadData(), 1000);
+            setTimeout(() => window.stockScreenerApp.checkForUpdates(), 1000);
         }
     }
 });
@@ -0,0 +1,62 @@
+// Stock filtering on a compact columnar copy of the stock list.
+// Loaded as a Web Worker by script.js; also included as a plain script so the page can
+// filter on the main thread when workers are unavailable.
+
+const FILTER_MARKETS = ['KRX', 'US'];
+const SIGNAL1_ENTRY = 1;
+const SIGNAL1_EXIT = 2;
+const SIGNAL2_ENTRY = 4;
+
+function buildStockColumns(stocks) {
+    const count = stocks.length;
+    const columns = {
+        count,
+        market: new Int8Array(count),
+        flags: new Uint8Array(count),
+        price: new Float64Array(count)
+    };
+
+    stocks.forEach((stock, i) => {
+        const signals = stock.signals;
+        columns.market[i] = FILTER_MARKETS.indexOf(stock.market);
+        columns.flags[i] = (signals.signal1.entry ? SIGNAL1_ENTRY : 0)
+            | (signals.signal1.exit ? SIGNAL1_EXIT : 0)
+            | (signals.signal2.entry ? SIGNAL2_ENTRY : 0);
+        columns.price[i] = typeof stock.current_price === 'number' ? stock.current_price : 0;
+    });
+    return columns;
+}
+
+function filterStockColumns(columns, filters) {
+    const market = filters.market === 'all' ? null : FILTER_MARKETS.indexOf(filters.market);
+    const signalMask = { signal1: SIGNAL1_ENTRY | SIGNAL1_EXIT, signal2: SIGNAL2_ENTRY }[filters.signal] || 0;
+    const actionMask = { entry: SIGNAL1_ENTRY | SIGNAL2_ENTRY, exit: SIGNAL1_EXIT }[filters.action] || 0;
+
+    const matches = new Int32Array(columns.count);
+    let found = 0;
+    for (let i = 0; i < columns.count; i++) {
+        const flags = columns.flags[i];
+        if (market !== null && columns.market[i] !== market) continue;
+        if (signalMask && !(flags & signalMask)) continue;
+        if (actionMask && !(flags & actionMask)) continue;
+        matches[found++] = i;
+    }
+
+    // Highest price first, like the published results; ties keep list order
+    const price = columns.price;
+    return matches.slice(0, found).sort((a, b) => (price[b] - price[a]) || (a - b));
+}
+
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+    let columns = null;
+
+    self.onmessage = (event) => {
+        const message = event.data;
+        if (message.type === 'load') {
+            columns = message.columns;
+        } else if (message.type === 'filter') {
+            const indices = columns ? filterStockColumns(columns, message.filters) : new Int32Array(0);
+            self.postMessage({ requestId: message.requestId, indices }, [indices.buffer]);
+        }
+    };
+}
@@ -0,0 +1,284 @@
+# File: run_benchmark.py
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from run_screener import FixtureDataProvider, TurtleTradingScreener
+
+logger = logging.getLogger("run_benchmark")
+
+DEFAULT_SIZES = [1_000, 5_000, 20_000]
+DEFAULT_BASELINE_FILE = 'benchmarks/baseline.json'
+
+
+def generate_synthetic_universe(
+    num_tickers: int,
+    bars: int = 240,
+    seed: int = 42,
+    krx_share: float = 0.5,
+) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    Generate a synthetic universe of random-walk OHLCV histories ending today.
+    Returns: (history by ticker, KRX classification frame, US listings by index name)
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=bars, name='Date')
+
+    num_krx = int(num_tickers * krx_share)
+    krx_codes = [f"{i:06d}" for i in range(1, num_krx + 1)]
+    krx_markets = ['KOSPI' if i % 2 == 0 else 'KOSDAQ' for i in range(num_krx)]
+    krx_tickers = [f"{code}{'.KS' if market == 'KOSPI' else '.KQ'}" for code, market in zip(krx_codes, krx_markets)]
+    us_tickers = [f"S{i:05d}" for i in range(num_tickers - num_krx)]
+    tickers = krx_tickers + us_tickers
+
+    # Geometric random walks, one column per ticker
+    start_prices = np.where(
+        np.arange(len(tickers)) < num_krx,
+        rng.uniform(1_000, 200_000, len(tickers)),
+        rng.uniform(1, 500, len(tickers)),
+    )
+    returns = rng.normal(0.0005, 0.02, size=(bars, len(tickers)))
+    close = start_prices * np.exp(np.cumsum(returns, axis=0))
+    spread = np.abs(rng.normal(0, 0.01, size=(bars, len(tickers))))
+    high = close * (1 + spread)
+    low = close * (1 - spread)
+    open_ = (high + low) / 2
+    volume = rng.lognormal(mean=12, sigma=1.5, size=(bars, len(tickers))).astype(np.int64)
+
+    history = {
+        ticker: pd.DataFrame(
+            {
+                'Open': open_[:, idx],
+                'High': high[:, idx],
+                'Low': low[:, idx],
+                'Close': close[:, idx],
+                'Volume': volume[:, idx],
+            },
+            index=dates,
+        )
+        for idx, ticker in enumerate(tickers)
+    }
+
+    classification = pd.DataFrame(
+        {
+            '종목코드': krx_codes,
+            '종목명': [f"합성종목{code}" for code in krx_codes],
+            '시장구분': krx_markets,
+        }
+    )
+    half = len(us_tickers) // 2
+    listings = {
+        'S&P500': pd.DataFrame({'Symbol': us_tickers[:half]}),
+        'NASDAQ': pd.DataFrame({'Symbol': us_tickers[half:]}),
+    }
+    return history, classification, listings
+
+
+class StageRecorder:
+    """Collect wall-clock time and (optionally) tracemalloc peak memory per stage."""
+
+    def __init__(self, track_memory: bool = True):
+        self.track_memory = track_memory
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if self.track_memory else None
+            self.stages[name] = {
+                'seconds': round(elapsed, 4),
+                'peak_mb': round(peak_mb, 2) if peak_mb is not None else None,
+            }
+            logger.info(f"  {name}: {elapsed:.3f}s" + (f", peak {peak_mb:.1f} MB" if peak_mb is not None else ""))
+
+
+def _build_screener(work_dir: str) -> TurtleTradingScreener:
+    """Create a screener wired to the local fixture stand-in, with pacing disabled and signal state on."""
+    screener = TurtleTradingScreener(
+        output_file=os.path.join(work_dir, 'public', 'screener_results.json'),
+        krx_classification_file=os.path.join(work_dir, 'stock_classification.csv'),
+        no_data_cache_file=os.path.join(work_dir, '.cache', 'no_data_cache.json'),
+        price_store_dir=None,
+        download_tuning_file=None,
+        data_provider=FixtureDataProvider(os.path.join(work_dir, 'fixture')),
+        universe_cache_file=None,
+        signal_state_file=os.path.join(work_dir, '.cache', 'signal_state.json'),
+        shard_output_dir=os.path.join(work_dir, 'public', 'shards'),
+        version_file=os.path.join(work_dir, 'public', 'version.json'),
+        liquidity_index_file=None,
+        checkpoint_file=None,
+    )
+    screener.adaptive_batching = False
+    screener.retry_max_attempts = 0
+    screener.batch_pause_seconds = 1e-6
+    screener.request_burst = 1_000_000
+    return screener
+
+
+def run_universe_benchmark(num_tickers: int, track_memory: bool = True, seed: int = 42) -> Dict[str, Any]:
+    """Run every pipeline stage once for a synthetic universe and return per-stage metrics."""
+    logger.info(f"Benchmarking synthetic universe of {num_tickers} tickers")
+    history, classification, listings = generate_synthetic_universe(num_tickers, seed=seed)
+    recorder = StageRecorder(track_memory=track_memory)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        FixtureDataProvider.save(os.path.join(work_dir, 'fixture'), history, listings)
+        classification.to_csv(os.path.join(work_dir, 'stock_classification.csv'), index=False, encoding='utf-8-sig')
+        del history
+
+        screener = _build_screener(work_dir)
+        screener._reset_request_limiter()
+        if track_memory:
+            tracemalloc.start()
+
+        try:
+            with recorder.stage('universe'):
+                krx_tickers, us_tickers = screener.get_ticker_universe()
+            all_tickers = krx_tickers + us_tickers
+            batches = [all_tickers[i:i + screener.batch_size] for i in range(0, len(all_tickers), screener.batch_size)]
+
+            with recorder.stage('download_normalize'):
+                frames: Dict[str, pd.DataFrame] = {}
+                for batch in batches:
+                    frames.update(screener.download_data_safe(batch))
+
+            with recorder.stage('signals_per_ticker'):
+                analyses = {ticker: screener.calculate_turtle_signals(frame, ticker) for ticker, frame in frames.items()}
+
+            with recorder.stage('signals_batch'):
+                screener.calculate_turtle_signals_batch(frames)
+
+            # The production path: states built from yesterday's histories, then today's bar folded in
+            previous = {ticker: frame.iloc[:-1] for ticker, frame in frames.items()}
+            with recorder.stage('signal_state_build'):
+                screener._calculate_signals_incremental(previous)
+            del previous
+
+            with recorder.stage('signal_state_update'):
+                screener._calculate_signals_incremental(frames)
+
+            with recorder.stage('passes_filters'):
+                passing = [ticker for ticker, analysis in analyses.items() if screener.passes_filters(analysis)]
+
+            with recorder.stage('result_assembly'):
+                filtered_stocks: List[Dict[str, Any]] = []
+                errors: List[str] = []
+                for batch in batches:
+                    batch_data = {ticker: frames[ticker] for ticker in batch if ticker in frames}
+                    screener._process_batch(batch, batch, batch_data, filtered_stocks, errors)
+                results = screener._assemble_results(
+                    krx_tickers, us_tickers, filtered_stocks, errors,
+                    {'queued': 0, 'recovered': 0, 'rounds': 0}, time.time(),
+                )
+
+            with recorder.stage('save_results'):
+                screener.save_results(results)
+        finally:
+            if track_memory:
+                tracemalloc.stop()
+
+    return {
+        'tickers': num_tickers,
+        'downloaded': len(frames),
+        'signals': len(passing),
+        'stages': recorder.stages,
+        'total_seconds': round(sum(stage['seconds'] for stage in recorder.stages.values()), 4),
+    }
+
+
+def compare_with_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+) -> List[str]:
+    """Return human-readable regressions where a stage is slower than baseline * (1 + tolerance)."""
+    regressions = []
+    if baseline.get('track_memory') != report.get('track_memory'):
+        # tracemalloc slows every stage down, so timings are only comparable within one mode
+        logger.warning("Baseline was recorded with a different memory-tracking mode; skipping comparison")
+        return regressions
+
+    baseline_runs = {str(run['tickers']): run for run in baseline.get('runs', [])}
+
+    for run in report['runs']:
+        reference = baseline_runs.get(str(run['tickers']))
+        if not reference:
+            continue
+        for stage, metrics in run['stages'].items():
+            ref_metrics = reference['stages'].get(stage)
+            if not ref_metrics or not ref_metrics.get('seconds'):
+                continue
+            ratio = metrics['seconds'] / ref_metrics['seconds']
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{run['tickers']} tickers / {stage}: {metrics['seconds']:.3f}s "
+                    f"vs baseline {ref_metrics['seconds']:.3f}s (x{ratio:.2f})"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Benchmark entry point"""
+    parser = argparse.ArgumentParser(description="End-to-end screener benchmark on synthetic universes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Universe sizes to benchmark")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Overwrite the baseline with this run")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown ratio before flagging")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc peak-memory tracking")
+    parser.add_argument('--output', help="Write the report JSON to this path")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit 1 when a stage regresses")
+    args = parser.parse_args(argv)
+
+    logging.getLogger('run_screener').setLevel(logging.ERROR)
+
+    report = {
+        'generated_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        'track_memory': not args.no_memory,
+        'runs': [run_universe_benchmark(size, track_memory=not args.no_memory) for size in args.sizes],
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        logger.info(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(report, baseline, args.tolerance)
+    for line in regressions:
+        logger.warning(f"Regression: {line}")
+    if not regressions:
+        logger.info("No stage regressed beyond tolerance")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    raise SystemExit(main())
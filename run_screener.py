@@ -1,32 +1,759 @@
 # File: run_screener.py
 
+import argparse
+import cProfile
+import gzip
+import hashlib
 import json
+import math
+import multiprocessing
 import os
+import pstats
+import threading
 import time
 import re
-from datetime import datetime, timedelta, timezone
+import sys
+import zlib
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from multiprocessing import shared_memory
+from zoneinfo import ZoneInfo
+import numpy as np
 import pandas as pd
 import yfinance as yf
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Union, Container
 import logging
 import FinanceDataReader as fdr
 import certifi
 from curl_cffi import requests as curl_requests
 
+try:
+    import brotli  # optional: .br result siblings are skipped without it
+except ImportError:
+    brotli = None
+
+try:
+    import holidays  # optional: market calendars fall back to weekends only without it
+except ImportError:
+    holidays = None
+
+try:
+    import resource  # POSIX only: peak RSS is left out of the metrics without it
+except ImportError:
+    resource = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Columns the signal, backtest and sweep engines read; Open and Adj Close are dropped on download
+PRICE_COLUMNS = ("High", "Low", "Close")
+HISTORY_COLUMNS = PRICE_COLUMNS + ("Volume",)
+
+# Market scopes for run_screening: both markets, or one market merged with the published other half
+MARKET_SCOPES = ('all', 'krx', 'us')
+
+# Exchange time zone and regular-session close (local HH:MM) per market
+MARKET_SESSIONS = {'KRX': ('Asia/Seoul', '15:30'), 'US': ('America/New_York', '16:00')}
+EXCHANGE_HOLIDAY_CODES = {'KRX': 'XKRX', 'US': 'NYSE'}  # holidays.financial_holidays markets
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None where the platform can't report it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def period_to_days(period: str) -> Optional[int]:
+    """Convert a yfinance period string ('240d', '6mo', '5y', ...) into calendar days."""
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', str(period).strip().lower())
+    if not match:
+        return None
+    return int(match.group(1)) * {'d': 1, 'wk': 7, 'mo': 31, 'y': 366}[match.group(2)]
+
+
+def exchange_holidays(market: str) -> Optional[Container]:
+    """Holiday calendar for a market ('KRX' or 'US'), or None when the holidays package is missing."""
+    if holidays is None:
+        return None
+    try:
+        return holidays.financial_holidays(EXCHANGE_HOLIDAY_CODES[market])
+    except NotImplementedError as e:
+        logger.warning(f"No holiday calendar for {market}: {e}")
+        return None
+
+
+class MarketCalendar:
+    """Trading days (weekdays minus exchange holidays) and the session close in exchange-local time."""
+
+    def __init__(self, tz_name: str, close: str, holiday_calendar: Optional[Container] = None):
+        self.tz = ZoneInfo(tz_name)
+        hour, minute = (int(part) for part in close.split(':'))
+        self.close_minutes = hour * 60 + minute
+        self.holidays = holiday_calendar if holiday_calendar is not None else ()
+
+    def is_session(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def last_closed_session(self, now: Optional[datetime] = None) -> date:
+        """Most recent trading day whose session has closed at `now` (default: current time)."""
+        local = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        day = local.date()
+        if local.hour * 60 + local.minute < self.close_minutes:
+            day -= timedelta(days=1)
+        while not self.is_session(day):
+            day -= timedelta(days=1)
+        return day
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces outbound requests shared by all download workers."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate_per_second = max(float(rate_per_second), 1e-6)
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, sleeping until they are available. Returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(now - self._updated_at, 0.0)
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+            self._updated_at = now
+            # Reserve immediately (the balance may go negative) so concurrent callers queue up fairly
+            self._tokens -= tokens
+            wait_seconds = -self._tokens / self.rate_per_second if self._tokens < 0 else 0.0
+
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return wait_seconds
+
+    def set_rate(self, rate_per_second: float) -> None:
+        """Change the refill rate for subsequent acquisitions."""
+        with self._lock:
+            self.rate_per_second = max(float(rate_per_second), 1e-6)
+
+
+class AdaptiveBatchController:
+    """
+    AIMD tuner for downloader pacing.
+    Clean batches grow the batch size additively and shrink pauses; rate limiting or a
+    batch with more than missing_failure_ratio of its tickers missing cuts the batch size
+    and stretches pauses/cooldowns multiplicatively.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        pause_seconds: float,
+        failure_cooldown_seconds: float,
+        rate_limit_cooldown_seconds: float,
+    ):
+        self.batch_size = int(batch_size)
+        self.pause_seconds = float(pause_seconds)
+        self.failure_cooldown_seconds = float(failure_cooldown_seconds)
+        self.rate_limit_cooldown_seconds = float(rate_limit_cooldown_seconds)
+
+        # Floors are the hand-tuned defaults for cooldowns; bounds keep batches/pauses sane
+        self.min_batch_size = 5
+        self.max_batch_size = 200
+        self.batch_size_step = 5
+        self.min_pause_seconds = 0.2
+        self.max_pause_seconds = 30.0
+        self.min_failure_cooldown_seconds = float(failure_cooldown_seconds)
+        self.max_failure_cooldown_seconds = 120.0
+        self.min_rate_limit_cooldown_seconds = float(rate_limit_cooldown_seconds)
+        self.max_rate_limit_cooldown_seconds = 300.0
+        self.increase_factor = 0.9
+        self.decrease_factor = 0.5
+        self.missing_failure_ratio = 0.2  # a few delisted/no-data names are not a pacing failure
+        self._lock = threading.Lock()
+
+    def record_batch(self, missing_count: int, rate_limited: bool, tickers: int) -> None:
+        """Feed back the outcome of one downloaded batch of `tickers` tickers."""
+        with self._lock:
+            if rate_limited:
+                self.batch_size = max(self.min_batch_size, int(self.batch_size * self.decrease_factor))
+                self.pause_seconds = min(self.max_pause_seconds, self.pause_seconds / self.decrease_factor)
+                self.rate_limit_cooldown_seconds = min(
+                    self.max_rate_limit_cooldown_seconds,
+                    self.rate_limit_cooldown_seconds / self.decrease_factor,
+                )
+            elif missing_count > tickers * self.missing_failure_ratio:
+                self.batch_size = max(self.min_batch_size, int(self.batch_size * self.decrease_factor))
+                self.pause_seconds = min(self.max_pause_seconds, self.pause_seconds / self.decrease_factor)
+                self.failure_cooldown_seconds = min(
+                    self.max_failure_cooldown_seconds,
+                    self.failure_cooldown_seconds / self.decrease_factor,
+                )
+            else:
+                self.batch_size = min(self.max_batch_size, self.batch_size + self.batch_size_step)
+                self.pause_seconds = max(self.min_pause_seconds, self.pause_seconds * self.increase_factor)
+                self.failure_cooldown_seconds = max(
+                    self.min_failure_cooldown_seconds,
+                    self.failure_cooldown_seconds * self.increase_factor,
+                )
+                self.rate_limit_cooldown_seconds = max(
+                    self.min_rate_limit_cooldown_seconds,
+                    self.rate_limit_cooldown_seconds * self.increase_factor,
+                )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the learned settings."""
+        return {
+            'batch_size': self.batch_size,
+            'pause_seconds': round(self.pause_seconds, 3),
+            'failure_cooldown_seconds': round(self.failure_cooldown_seconds, 3),
+            'rate_limit_cooldown_seconds': round(self.rate_limit_cooldown_seconds, 3),
+        }
+
+    def load_dict(self, payload: Dict[str, Any]) -> None:
+        """Restore learned settings, clamped to the controller bounds."""
+        try:
+            self.batch_size = min(self.max_batch_size, max(self.min_batch_size, int(payload['batch_size'])))
+            self.pause_seconds = min(self.max_pause_seconds, max(self.min_pause_seconds, float(payload['pause_seconds'])))
+            self.failure_cooldown_seconds = min(
+                self.max_failure_cooldown_seconds,
+                max(self.min_failure_cooldown_seconds, float(payload['failure_cooldown_seconds'])),
+            )
+            self.rate_limit_cooldown_seconds = min(
+                self.max_rate_limit_cooldown_seconds,
+                max(self.min_rate_limit_cooldown_seconds, float(payload['rate_limit_cooldown_seconds'])),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring malformed downloader tuning state: {e}")
+
+
+class RunMetrics:
+    """
+    Thread-safe per-run instrumentation: accumulated seconds per stage, event counters
+    and one record per download batch. Stages may overlap (e.g. signals inside main_pass),
+    and worker-side stages are summed across threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.batches: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def timer(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - started)
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def record_batch(self, batch_no: int, tickers: int, seconds: float, missing: int, retry_round: int = 0) -> None:
+        with self._lock:
+            self.batches.append(
+                {
+                    'batch': batch_no,
+                    'retry_round': retry_round,
+                    'tickers': tickers,
+                    'seconds': round(seconds, 3),
+                    'missing': missing,
+                }
+            )
+
+    def mean_batch_seconds(self) -> float:
+        """Mean download time of the batches recorded so far (0 before the first one)."""
+        with self._lock:
+            seconds = [batch['seconds'] for batch in self.batches]
+        return sum(seconds) / len(seconds) if seconds else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact view for result metadata (per-batch records are aggregated)."""
+        with self._lock:
+            batch_seconds = [batch['seconds'] for batch in self.batches]
+            return {
+                'timings_seconds': {stage: round(seconds, 3) for stage, seconds in sorted(self.timings.items())},
+                'counters': dict(sorted(self.counters.items())),
+                'download_batches': {
+                    'count': len(batch_seconds),
+                    'max_seconds': round(max(batch_seconds), 3) if batch_seconds else 0,
+                    'mean_seconds': round(sum(batch_seconds) / len(batch_seconds), 3) if batch_seconds else 0,
+                },
+                'memory_mb': {
+                    'price_history': round(self.counters.get('history_bytes', 0) / (1024 * 1024), 1),
+                    'peak_rss': peak_rss_mb(),
+                },
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Full view for the metrics file, including every batch record."""
+        payload = self.summary()
+        with self._lock:
+            payload['batches'] = list(self.batches)
+        return payload
+
+
+class RollingExtreme:
+    """
+    Monotonic-deque max/min over the last `window` pushed values, O(1) amortized per push.
+    Like pandas rolling(window) with min_periods=window, a NaN anywhere in the window yields NaN.
+    """
+
+    def __init__(self, window: int, is_max: bool):
+        self.window = int(window)
+        self.is_max = is_max
+        self._count = 0
+        self._last_nan = -1
+        self._deque: deque = deque()
+
+    def push(self, value: float) -> None:
+        idx = self._count
+        self._count += 1
+        if math.isnan(value):
+            self._last_nan = idx
+        else:
+            while self._deque and (
+                self._deque[-1][1] <= value if self.is_max else self._deque[-1][1] >= value
+            ):
+                self._deque.pop()
+            self._deque.append((idx, value))
+        while self._deque and self._deque[0][0] <= idx - self.window:
+            self._deque.popleft()
+
+    def value(self) -> float:
+        """Extreme of the last `window` values, or NaN while the window is short or holds a NaN."""
+        if self._count < self.window or self._last_nan > self._count - 1 - self.window or not self._deque:
+            return float('nan')
+        return self._deque[0][1]
+
+    @classmethod
+    def from_values(cls, window: int, is_max: bool, values: np.ndarray, count: int) -> 'RollingExtreme':
+        """
+        Build the deque that pushing `count` values would leave, given the last of them in `values`.
+        A value stays in the deque while no later value in the window is at least as extreme.
+        """
+        extreme = cls(window, is_max)
+        extreme._count = int(count)
+        values = values[-extreme.window:]
+        first = extreme._count - len(values)
+        missing = np.isnan(values)
+        if missing.any():
+            extreme._last_nan = first + int(np.flatnonzero(missing)[-1])
+
+        accumulate = np.fmax.accumulate if is_max else np.fmin.accumulate
+        later = np.append(accumulate(values[::-1])[::-1][1:], np.nan)
+        with np.errstate(invalid='ignore'):
+            dominated = later >= values if is_max else later <= values
+        keep = np.flatnonzero(~missing & ~dominated)
+        extreme._deque = deque(zip((first + keep).tolist(), values[keep].tolist()))
+        return extreme
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self._count, 'last_nan': self._last_nan, 'deque': [list(item) for item in self._deque]}
+
+    def load_dict(self, payload: Dict[str, Any]) -> None:
+        self._count = int(payload['count'])
+        self._last_nan = int(payload['last_nan'])
+        self._deque = deque((int(idx), float(value)) for idx, value in payload['deque'])
+
+
+class RangeExtremeTable:
+    """
+    Sparse-table max/min over a (bars x tickers) panel. Level k holds the extreme of the 2**k
+    bars ending at each row, so any trailing window is the extreme of two overlapping level-k
+    lookups, O(1) per cell no matter how many window lengths are queried. Only the levels the
+    requested windows need are kept. NaNs propagate like rolling(window) with min_periods=window.
+    """
+
+    def __init__(self, panel: np.ndarray, windows: List[int], is_max: bool):
+        self._reduce = np.maximum if is_max else np.minimum
+        self.windows = sorted({int(window) for window in windows})
+        needed = {window.bit_length() - 1 for window in self.windows}
+        self._levels: Dict[int, np.ndarray] = {0: panel} if 0 in needed else {}
+
+        level, span = panel, 1
+        for k in range(1, max(needed) + 1):
+            doubled = np.full_like(panel, np.nan)
+            self._reduce(level[span:], level[:-span], out=doubled[span:])
+            level, span = doubled, span * 2
+            if k in needed:
+                self._levels[k] = level
+
+    def window(self, window: int, shift: int = 1) -> np.ndarray:
+        """Extreme of the `window` bars ending `shift` rows before each row (rolling(window) + shift(shift))."""
+        if window not in self.windows:
+            raise ValueError(f"window {window} was not precomputed")
+        k = window.bit_length() - 1
+        level = self._levels[k]
+        offset = window - (1 << k)
+        rows = level.shape[0]
+        result = np.full_like(level, np.nan)
+        if rows > shift + offset:
+            self._reduce(level[offset:rows - shift], level[:rows - shift - offset], out=result[shift + offset:])
+        return result
+
+
+class SharedPanels:
+    """
+    Copies named numpy panels into one shared-memory block so pool workers can map them
+    instead of unpickling them. `spec` is the small picklable descriptor workers attach() with.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        layout: Dict[str, Tuple[int, Tuple[int, ...], str]] = {}
+        offset = 0
+        for name, array in arrays.items():
+            layout[name] = (offset, array.shape, array.dtype.str)
+            offset += -(-array.nbytes // 8) * 8  # keep every panel 8-byte aligned
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.spec = {'name': self._shm.name, 'layout': layout}
+        views = self._views(self._shm, layout)
+        for name, view in views.items():
+            view[...] = arrays[name]
+        del views
+
+    @staticmethod
+    def _views(shm: shared_memory.SharedMemory, layout: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        return {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, (offset, shape, dtype) in layout.items()
+        }
+
+    @classmethod
+    def read_columns(cls, spec: Dict[str, Any], start: int, stop: int) -> Dict[str, np.ndarray]:
+        """Attach in a worker and copy out columns [start, stop) of every panel."""
+        # Spawned workers share the parent's resource tracker, so the block stays owned (and
+        # unlinked) by the creating process
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        try:
+            views = cls._views(shm, spec['layout'])
+            columns = {name: np.ascontiguousarray(view[:, start:stop]) for name, view in views.items()}
+            del views
+            return columns
+        finally:
+            shm.close()
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> 'SharedPanels':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_pool_screener: Optional['TurtleTradingScreener'] = None
+
+
+def _init_pool_worker(settings: Dict[str, Any]) -> None:
+    """Process-pool initializer: one cache-less screener per worker with the parent's signal settings."""
+    global _pool_screener
+    _pool_screener = TurtleTradingScreener(
+        price_store_dir=None,
+        download_tuning_file=None,
+        universe_cache_file=None,
+        signal_state_file=None,
+        shard_output_dir=None,
+        version_file=None,
+    )
+    for name, value in settings.items():
+        setattr(_pool_screener, name, value)
+
+
+def _run_panel_task(method_name: str, spec: Dict[str, Any], start: int, stop: int, tickers: List[str], args: tuple):
+    """Run a panel engine method on one column chunk of the shared panels."""
+    panels: Dict[str, Any] = SharedPanels.read_columns(spec, start, stop)
+    panels['tickers'] = tickers
+    return getattr(_pool_screener, method_name)(panels, *args)
+
+
+class TurtleSignalState:
+    """
+    Streaming per-ticker Turtle state: rolling extremes, the volume window and the
+    levels/bar of the last processed day, so each new bar is folded in with O(1) work.
+    `spec` maps level name -> (price column, window, is_max); levels follow
+    rolling().max()/min().shift(1), i.e. they are read before the bar is pushed.
+    """
+
+    def __init__(self, spec: Dict[str, Tuple[str, int, bool]], volume_period: int, tail_bars: int):
+        self.spec = spec
+        self.volume_period = int(volume_period)
+        self.windows = {name: RollingExtreme(window, is_max) for name, (_, window, is_max) in spec.items()}
+        self.volumes: deque = deque(maxlen=self.volume_period)
+        self.tail: deque = deque(maxlen=max(int(tail_bars), 1))
+        self.bars = 0
+        self.levels: Dict[str, float] = {}
+        self.volume_avg = float('nan')
+
+    @property
+    def last_bar(self) -> Optional[List[Any]]:
+        """[date, high, low, close, volume] of the last processed bar."""
+        return self.tail[-1] if self.tail else None
+
+    def push(self, date: str, high: float, low: float, close: float, volume: float) -> None:
+        self.levels = {name: window.value() for name, window in self.windows.items()}
+        for name, window in self.windows.items():
+            window.push(high if self.spec[name][0] == 'High' else low)
+        self.volumes.append(volume)
+        # The volume window holds only `volume_period` values; summing it fresh keeps results identical to np.mean
+        self.volume_avg = (
+            float(np.mean(np.fromiter(self.volumes, dtype=np.float64)))
+            if len(self.volumes) == self.volume_period
+            else float('nan')
+        )
+        self.tail.append([date, high, low, close, volume])
+        self.bars += 1
+
+    def push_frame(self, frame: pd.DataFrame) -> None:
+        dates = frame.index.strftime('%Y-%m-%d')
+        values = frame[['High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64)
+        for date, (high, low, close, volume) in zip(dates, values):
+            self.push(date, float(high), float(low), float(close), float(volume))
+
+    @classmethod
+    def from_frame(
+        cls,
+        frame: pd.DataFrame,
+        spec: Dict[str, Tuple[str, int, bool]],
+        volume_period: int,
+        tail_bars: int,
+    ) -> 'TurtleSignalState':
+        """Build a state from the tail of a full history (only the longest window + 1 bars are needed)."""
+        state = cls(spec, volume_period, tail_bars)
+        depth = max([window for _, window, _ in spec.values()] + [volume_period, tail_bars]) + 1
+        state.push_frame(frame.iloc[-depth:])
+        state.bars = len(frame)
+        return state
+
+    @classmethod
+    def from_columns(
+        cls,
+        spec: Dict[str, Tuple[str, int, bool]],
+        volume_period: int,
+        tail_bars: int,
+        columns: Dict[str, np.ndarray],
+        dates: List[str],
+        bars: int,
+        levels: Dict[str, float],
+    ) -> 'TurtleSignalState':
+        """
+        Build the state of a `bars`-long history straight from its last bars, as laid out by
+        _build_price_panels (`columns` holds High/Low/Close/Volume, `dates` at least the tail's days).
+        `levels` are the prior-window extremes at the last bar, as the batch engine computes them.
+        """
+        state = cls(spec, volume_period, tail_bars)
+        state.bars = int(bars)
+        state.levels = {name: float(value) for name, value in levels.items()}
+        for name, (column, window, is_max) in spec.items():
+            state.windows[name] = RollingExtreme.from_values(window, is_max, columns[column], state.bars)
+        state.volumes.extend(columns['Volume'][-state.volume_period:].tolist())
+        if len(state.volumes) == state.volume_period:
+            state.volume_avg = float(np.mean(np.fromiter(state.volumes, dtype=np.float64)))
+
+        tail = state.tail.maxlen
+        values = np.column_stack([columns[col][-tail:] for col in ('High', 'Low', 'Close', 'Volume')])
+        state.tail.extend([date, *bar] for date, bar in zip(dates[-tail:], values.tolist()))
+        return state
+
+    def signature(self) -> List[Any]:
+        return [[name, *self.spec[name]] for name in sorted(self.spec)] + [self.volume_period]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'signature': self.signature(),
+            'bars': self.bars,
+            'tail': list(self.tail),
+            'volumes': list(self.volumes),
+            'volume_avg': self.volume_avg,
+            'levels': self.levels,
+            'windows': {name: window.to_dict() for name, window in self.windows.items()},
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        payload: Dict[str, Any],
+        spec: Dict[str, Tuple[str, int, bool]],
+        volume_period: int,
+        tail_bars: int,
+    ) -> Optional['TurtleSignalState']:
+        """Restore a persisted state; None when it was built with different periods."""
+        state = cls(spec, volume_period, tail_bars)
+        if payload.get('signature') != state.signature():
+            return None
+        state.bars = int(payload['bars'])
+        state.tail.extend(payload['tail'])
+        state.volumes.extend(float(volume) for volume in payload['volumes'])
+        state.volume_avg = float(payload['volume_avg'])
+        state.levels = {name: float(value) for name, value in payload['levels'].items()}
+        for name, window in state.windows.items():
+            window.load_dict(payload['windows'][name])
+        return state
+
+
+class DataProvider(ABC):
+    """Market data source used by the screener: daily OHLCV history and stock listings."""
+
+    @abstractmethod
+    def download_history(self, tickers: Union[str, List[str]], period: str) -> Optional[pd.DataFrame]:
+        """
+        Return daily auto-adjusted OHLCV shaped like yf.download output:
+        flat columns for a single ticker string, (ticker, field) columns for a list.
+        """
+
+    @abstractmethod
+    def stock_listing(self, market: str) -> pd.DataFrame:
+        """Return a FinanceDataReader-style listing for a market/index name (e.g. 'KRX', 'S&P500')."""
+
+
+class YFinanceDataProvider(DataProvider):
+    """Live provider: yfinance for price history, FinanceDataReader for listings."""
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        self.session_factory = session_factory
+
+    def download_history(self, tickers: Union[str, List[str]], period: str) -> Optional[pd.DataFrame]:
+        """Download daily history via yf.download."""
+        kwargs = {
+            'period': period,
+            'interval': '1d',
+            'auto_adjust': True,
+            'progress': False,
+            'threads': False,
+            'session': self.session_factory() if self.session_factory else None,
+        }
+        if isinstance(tickers, list):
+            kwargs['group_by'] = 'ticker'
+        return yf.download(tickers, **kwargs)
+
+    def stock_listing(self, market: str) -> pd.DataFrame:
+        """Fetch a listing via FinanceDataReader."""
+        return fdr.StockListing(market)
+
+
+class FixtureDataProvider(DataProvider):
+    """
+    Offline provider that replays recorded or synthetic data from a directory:
+      <fixture_dir>/history.parquet         long format: Ticker, Date, Open, High, Low, Close, Volume
+      <fixture_dir>/listings/<market>.csv   one listing per market/index name
+    Periods are applied relative to the last bar in the fixture, so replays are deterministic.
+    """
+
+    def __init__(self, fixture_dir: str):
+        self.fixture_dir = fixture_dir
+        self._history: Optional[Dict[str, pd.DataFrame]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _listing_filename(market: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_-]', '_', market) + '.csv'
+
+    @classmethod
+    def save(
+        cls,
+        fixture_dir: str,
+        history: Dict[str, pd.DataFrame],
+        listings: Optional[Dict[str, pd.DataFrame]] = None,
+    ) -> None:
+        """Record per-ticker OHLCV frames and listings into a fixture directory."""
+        os.makedirs(os.path.join(fixture_dir, 'listings'), exist_ok=True)
+        tables = []
+        for ticker, frame in history.items():
+            table = frame[["Open", "High", "Low", "Close", "Volume"]].rename_axis('Date').reset_index()
+            table.insert(0, 'Ticker', ticker)
+            tables.append(table)
+        if tables:
+            pd.concat(tables, ignore_index=True).to_parquet(os.path.join(fixture_dir, 'history.parquet'), index=False)
+        for market, listing in (listings or {}).items():
+            listing.to_csv(os.path.join(fixture_dir, 'listings', cls._listing_filename(market)), index=False)
+
+    def _load_history(self) -> Dict[str, pd.DataFrame]:
+        with self._lock:
+            if self._history is None:
+                path = os.path.join(self.fixture_dir, 'history.parquet')
+                history = {}
+                if os.path.exists(path):
+                    table = pd.read_parquet(path)
+                    for ticker, frame in table.groupby('Ticker', sort=False):
+                        history[ticker] = frame.drop(columns='Ticker').set_index('Date').sort_index()
+                self._history = history
+            return self._history
+
+    def _slice_period(self, frame: pd.DataFrame, period: str) -> pd.DataFrame:
+        days = period_to_days(period)
+        if days is None or frame.empty:
+            return frame
+        cutoff = frame.index[-1] - pd.Timedelta(days=days - 1)
+        return frame[frame.index >= cutoff]
+
+    def download_history(self, tickers: Union[str, List[str]], period: str) -> Optional[pd.DataFrame]:
+        """Serve fixture history in the same shape yf.download would return."""
+        history = self._load_history()
+        if isinstance(tickers, str):
+            frame = history.get(tickers)
+            return self._slice_period(frame, period).copy() if frame is not None else pd.DataFrame()
+
+        frames = {ticker: self._slice_period(history[ticker], period) for ticker in tickers if ticker in history}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1, names=['Ticker', 'Price'])
+
+    def stock_listing(self, market: str) -> pd.DataFrame:
+        """Read a recorded listing CSV."""
+        path = os.path.join(self.fixture_dir, 'listings', self._listing_filename(market))
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No fixture listing for {market}: {path}")
+        return pd.read_csv(path, dtype=str)
+
+
 class TurtleTradingScreener:
     def __init__(
         self,
         output_file: str = 'public/data/screener_results.json',
         krx_classification_file: str = 'stock_classification.csv',
-        no_data_cache_file: str = '.cache/yfinance_no_data_cache.json',
+        no_data_cache_file: Optional[str] = '.cache/yfinance_no_data_cache.json',
+        price_store_dir: Optional[str] = '.cache/price_history',
+        download_tuning_file: Optional[str] = '.cache/downloader_tuning.json',
+        data_provider: Optional[DataProvider] = None,
+        metrics_file: Optional[str] = None,
+        universe_cache_file: Optional[str] = '.cache/ticker_universe.json',
+        signal_state_file: Optional[str] = '.cache/signal_state.json',
+        shard_output_dir: Optional[str] = 'public/data/shards',
+        version_file: Optional[str] = 'public/data/version.json',
+        liquidity_index_file: Optional[str] = '.cache/liquidity_index.json',
+        checkpoint_file: Optional[str] = '.cache/screening_checkpoint.json',
     ):
         self.output_file = output_file
         self.krx_classification_file = krx_classification_file
         self.no_data_cache_file = no_data_cache_file
+        self.price_store_dir = price_store_dir
+        self.download_tuning_file = download_tuning_file
+        self.metrics_file = metrics_file
+        self.universe_cache_file = universe_cache_file
+        self.signal_state_file = signal_state_file
+        self.shard_output_dir = shard_output_dir
+        self.version_file = version_file
+        self.liquidity_index_file = liquidity_index_file
+        self.checkpoint_file = checkpoint_file
+        self.metrics = RunMetrics()
+        self.data_provider = data_provider or YFinanceDataProvider(
+            session_factory=lambda: self._get_yfinance_session()
+        )
         
         # Liquidity filters (20-day average volume)
         self.krx_min_volume = 100_000  # KRX stocks
@@ -37,6 +764,7 @@ class TurtleTradingScreener:
         self.signal1_exit_period = 10     # Signal 1: 10-day exit
         self.signal2_entry_period = 55    # Signal 2: 55-day breakout entry (11 weeks)
         self.signal2_exit_period = 20     # Signal 2: 20-day exit (4 weeks)
+        self.volume_avg_period = 20       # Liquidity filter: 20-day average volume
         
         # Price filter
         self.min_price_usd = 5.0          # Minimum price for US stocks
@@ -52,15 +780,85 @@ class TurtleTradingScreener:
         self.batch_pause_seconds = 1
         self.batch_failure_cooldown_seconds = 8
         self.rate_limit_cooldown_seconds = 20
+        self.missing_failure_ratio = 0.2  # missing share beyond which a batch counts as failed
+        self.max_inflight_batches = 3     # concurrent yf.download batches
+        self.request_burst = 3            # token bucket capacity (requests)
+        self.retry_max_attempts = 2       # deferred retry rounds for missing tickers
+        self.retry_backoff_seconds = 5    # doubled every retry round
         self.history_period = '240d'
         self.no_data_skip_threshold = 3
         self.no_data_skip_ttl_days = 14
         self._cache_skipped_tickers = 0
-        self._yf_session = None
+        self._yf_session_local = threading.local()
+        self._batch_local = threading.local()  # per-worker flags of the batch being downloaded
+        self.profile_workers = False           # cProfile each download batch in its worker thread
+        self.worker_profiles: List[cProfile.Profile] = []
+        self._request_limiter: Optional[TokenBucket] = None
+        self._state_lock = threading.RLock()
+        self.adaptive_batching = True
+        self._rate_limit_hits = 0
+        self._batch_controller: Optional[AdaptiveBatchController] = None
         self._sanitized_ca_bundle_envs: List[str] = []
         self._sanitize_ca_bundle_environment()
         self._no_data_cache = self._load_no_data_cache()
 
+        # Local OHLCV store (per-market Parquet partitions, delta fetching)
+        self.price_store_overlap_days = 5
+        self.price_store_revision_rtol = 1e-4  # overlap drift beyond this = re-adjusted history (split/dividend)
+        self.min_history_rows = 60
+        self._price_store: Optional[Dict[str, pd.DataFrame]] = None
+        self._price_store_dirty: set = set()
+
+        # Ticker universe cache (normalized listing snapshots per source)
+        self.universe_cache_ttl_hours = 24
+        self._universe_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._universe_cache_dirty = False
+        self._universe_sources: Dict[str, Dict[str, Any]] = {}
+
+        # Streaming signal state (per-ticker rolling windows, updated by new bars only)
+        self.signal_state_tail_bars = 5   # last bars re-checked to detect revised history
+        self.signal_state_max_new_bars = 5  # more new bars than this (a gap) recomputes with the batch engine
+        self._signal_states: Optional[Dict[str, TurtleSignalState]] = None
+
+        # Process pool for the full-history engines (backtest/sweep); panels go through shared memory
+        self.process_workers = 1          # >1 fans out, 0 = one per CPU core
+        self.min_tickers_per_process = 250
+
+        # Liquidity index (skip tickers far below the price/volume filters before downloading)
+        self.liquidity_skip_ratio = 0.5           # "far below" = under half of the minimum price or volume
+        self.liquidity_skip_min_runs = 3          # consecutive far-below runs before a ticker is skipped
+        self.liquidity_revalidate_fraction = 0.1  # rotating share of skipped tickers downloaded anyway
+        self.liquidity_max_age_days = 30          # older observations are re-downloaded regardless
+        self._liquidity_index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._liquidity_rotation = 0
+        self._liquidity_skipped_tickers = 0
+        self._liquidity_revalidated_tickers = 0
+
+        # Checkpoint/resume (completed main-pass batches survive a killed run)
+        self.checkpoint_every_batches = 5     # main-pass batches between checkpoint writes
+        self._checkpoint: Optional[Dict[str, Any]] = None
+
+        # Time-budgeted runs (most signal-relevant tickers first, partial results when time runs out)
+        self.time_budget_reserve_seconds = 15  # kept back for result assembly and saving
+        self._time_budget_seconds: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self._deferred_tickers: List[str] = []
+
+        # Session freshness (skip scheduled runs when no market has a new daily bar)
+        self.market_calendars = {
+            market: MarketCalendar(tz_name, close, exchange_holidays(market))
+            for market, (tz_name, close) in MARKET_SESSIONS.items()
+        }
+        self.session_bellwethers = {
+            'KRX': ['005930.KS', '000660.KS', '035420.KS'],
+            'US': ['AAPL', 'MSFT', 'SPY'],
+        }
+        self.session_poll_seconds = 300       # re-probe interval while a closed session's bar is unpublished
+        self._session_dates: Dict[str, str] = {}
+
+    # Settings a pool worker's screener needs to reproduce this screener's panel engines
+    _POOL_SETTINGS = ('signal1_entry_period', 'signal1_exit_period', 'signal2_entry_period', 'signal2_exit_period')
+
     def _find_column(self, columns: List[str], candidates: List[str]) -> Optional[str]:
         """Find first matching column name from candidates (case-insensitive)."""
         lower_map = {col.lower(): col for col in columns}
@@ -89,17 +887,19 @@ class TurtleTradingScreener:
             self._sanitized_ca_bundle_envs.append(env_key)
 
     def _get_yfinance_session(self):
-        """Create a curl_cffi session pinned to certifi's bundle."""
-        if self._yf_session is None:
-            self._yf_session = curl_requests.Session(
+        """Create a per-thread curl_cffi session pinned to certifi's bundle."""
+        session = getattr(self._yf_session_local, 'session', None)
+        if session is None:
+            session = curl_requests.Session(
                 impersonate='chrome',
                 verify=certifi.where(),
             )
-        return self._yf_session
+            self._yf_session_local.session = session
+        return session
 
     def _load_no_data_cache(self) -> Dict[str, Dict[str, Any]]:
         """Load persisted no-data ticker cache."""
-        if not os.path.exists(self.no_data_cache_file):
+        if not self.no_data_cache_file or not os.path.exists(self.no_data_cache_file):
             return {}
 
         try:
@@ -114,6 +914,8 @@ class TurtleTradingScreener:
 
     def _save_no_data_cache(self) -> None:
         """Persist no-data ticker cache to disk."""
+        if not self.no_data_cache_file:
+            return
         os.makedirs(os.path.dirname(self.no_data_cache_file), exist_ok=True)
         payload = {
             'updated_at': datetime.utcnow().isoformat() + 'Z',
@@ -169,6 +971,112 @@ class TurtleTradingScreener:
         """Clear persisted no-data cache after a healthy recovery."""
         self._no_data_cache.pop(ticker, None)
 
+    def _load_liquidity_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the persisted per-ticker liquidity index once per screener."""
+        if self._liquidity_index is not None:
+            return self._liquidity_index
+
+        self._liquidity_index = {}
+        if not self.liquidity_index_file or not os.path.exists(self.liquidity_index_file):
+            return self._liquidity_index
+
+        try:
+            with open(self.liquidity_index_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read liquidity index {self.liquidity_index_file}: {e}")
+            return self._liquidity_index
+
+        if isinstance(payload, dict) and isinstance(payload.get('tickers'), dict):
+            self._liquidity_index = payload['tickers']
+            self._liquidity_rotation = int(payload.get('rotation', 0) or 0)
+        return self._liquidity_index
+
+    def _save_liquidity_index(self) -> None:
+        """Persist the liquidity index, dropping tickers not observed for twice the max age."""
+        if not self.liquidity_index_file or self._liquidity_index is None:
+            return
+
+        oldest = pd.Timestamp.now().normalize() - pd.Timedelta(days=2 * self.liquidity_max_age_days)
+        cutoff = oldest.strftime('%Y-%m-%d')
+        tickers = {
+            ticker: entry for ticker, entry in self._liquidity_index.items() if str(entry.get('date', '')) >= cutoff
+        }
+        os.makedirs(os.path.dirname(self.liquidity_index_file) or '.', exist_ok=True)
+        payload = {
+            'updated_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'rotation': self._liquidity_rotation,
+            'tickers': tickers,
+        }
+        with open(self.liquidity_index_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, sort_keys=True)
+
+    def _is_far_below_filters(self, ticker: str, price: float, volume_avg: float) -> bool:
+        """Return True when price or 20-day average volume is under liquidity_skip_ratio of the market minimum."""
+        is_krx = ticker.endswith(('.KS', '.KQ'))
+        min_price = self.min_price_krw if is_krx else self.min_price_usd
+        min_volume = self.krx_min_volume if is_krx else self.us_min_volume
+        return price < min_price * self.liquidity_skip_ratio or volume_avg < min_volume * self.liquidity_skip_ratio
+
+    def _record_liquidity(self, ticker: str, analysis: Dict[str, Any], bar_date: Any) -> None:
+        """Update a ticker's liquidity index entry (last price, 20-day average volume, bar date)."""
+        if not self.liquidity_index_file:
+            return
+
+        index = self._load_liquidity_index()
+        far_below = self._is_far_below_filters(ticker, analysis['current_price'], analysis['volume_20_avg'])
+        index[ticker] = {
+            'price': round(float(analysis['current_price']), 4),
+            'volume_avg': int(analysis['volume_20_avg']),
+            'date': pd.Timestamp(bar_date).strftime('%Y-%m-%d'),
+            'below_runs': int(index.get(ticker, {}).get('below_runs', 0)) + 1 if far_below else 0,
+        }
+
+    def _record_session_date(self, ticker: str, bar_date: Any) -> None:
+        """Track the latest daily bar screened per market (published as markets.<M>.session_date)."""
+        market = 'KRX' if ticker.endswith(('.KS', '.KQ')) else 'US'
+        day = pd.Timestamp(bar_date).strftime('%Y-%m-%d')
+        if day > self._session_dates.get(market, ''):
+            self._session_dates[market] = day
+
+    def _select_liquid_tickers(self, tickers: List[str]) -> List[str]:
+        """
+        Drop tickers that were far below the filters on their last liquidity_skip_min_runs runs
+        (with a recent observation). A rotating 1/N slice of them, picked by ticker hash and run
+        number, is still downloaded every run so recovering names come back.
+        """
+        self._liquidity_skipped_tickers = 0
+        self._liquidity_revalidated_tickers = 0
+        if not self.liquidity_index_file:
+            return tickers
+
+        index = self._load_liquidity_index()
+        self._liquidity_rotation += 1
+        slots = int(round(1 / self.liquidity_revalidate_fraction)) if self.liquidity_revalidate_fraction > 0 else 0
+        cutoff = (pd.Timestamp.now().normalize() - pd.Timedelta(days=self.liquidity_max_age_days)).strftime('%Y-%m-%d')
+
+        selected = []
+        for ticker in tickers:
+            entry = index.get(ticker)
+            if (
+                not entry
+                or int(entry.get('below_runs', 0)) < self.liquidity_skip_min_runs
+                or str(entry.get('date', '')) < cutoff
+            ):
+                selected.append(ticker)
+            elif slots and (zlib.crc32(ticker.encode('utf-8')) + self._liquidity_rotation) % slots == 0:
+                self._liquidity_revalidated_tickers += 1
+                selected.append(ticker)
+            else:
+                self._liquidity_skipped_tickers += 1
+
+        if self._liquidity_skipped_tickers:
+            logger.info(
+                f"Liquidity index: skipping {self._liquidity_skipped_tickers} illiquid tickers, "
+                f"re-validating {self._liquidity_revalidated_tickers}"
+            )
+        return selected
+
     def _build_no_data_cache_summary(self) -> Dict[str, Any]:
         """Create a compact summary of persisted repeated no-data tickers."""
         active_entries = []
@@ -196,6 +1104,186 @@ class TurtleTradingScreener:
             'sample': active_entries[:20],
         }
 
+    def _price_store_partition(self, ticker: str) -> str:
+        """Return the price store partition (market) a ticker belongs to."""
+        return 'krx' if ticker.endswith(('.KS', '.KQ')) else 'us'
+
+    def _price_store_path(self, partition: str) -> str:
+        """Return the Parquet file path for a price store partition."""
+        return os.path.join(self.price_store_dir, f"{partition}.parquet")
+
+    def _history_period_days(self) -> int:
+        """Convert the yfinance history period (e.g. '240d') into calendar days."""
+        return period_to_days(self.history_period) or 240
+
+    def _history_cutoff(self) -> pd.Timestamp:
+        """Return the oldest bar date kept for the configured history window."""
+        return pd.Timestamp.now().normalize() - pd.Timedelta(days=self._history_period_days())
+
+    def _trim_history_window(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Drop bars older than the configured history window."""
+        cutoff = self._history_cutoff()
+        if getattr(frame.index, 'tz', None) is not None:
+            cutoff = cutoff.tz_localize(frame.index.tz)
+        return frame[frame.index >= cutoff]
+
+    def _load_price_store(self) -> Dict[str, pd.DataFrame]:
+        """Load persisted per-market OHLCV partitions into a ticker -> frame map."""
+        with self._state_lock:
+            if self._price_store is None:
+                self._price_store = self._read_price_store()
+            return self._price_store
+
+    def _read_price_store(self) -> Dict[str, pd.DataFrame]:
+        """Read all price store partitions from disk."""
+        store: Dict[str, pd.DataFrame] = {}
+        if not self.price_store_dir:
+            return store
+
+        for partition in ('krx', 'us'):
+            path = self._price_store_path(partition)
+            if not os.path.exists(path):
+                continue
+
+            try:
+                table = pd.read_parquet(path)
+            except Exception as e:
+                logger.warning(f"Could not read price store partition {path}: {e}")
+                continue
+
+            if any(table[col].dtype == np.float32 for col in PRICE_COLUMNS if col in table.columns):
+                # float32 prices already lost precision; refetch full histories instead of reusing them
+                logger.info(f"Discarding price store partition {path} written with float32 prices")
+                continue
+
+            for ticker, frame in table.groupby('Ticker', sort=False):
+                # Partitions written before the compact layout still carry Open
+                store[ticker] = self._compact_history(frame.set_index('Date').sort_index())
+
+        logger.info(f"Loaded price store with {len(store)} tickers from {self.price_store_dir}")
+        return store
+
+    def _get_stored_history(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Return stored OHLCV history for a ticker, if any."""
+        frame = self._load_price_store().get(ticker)
+        if frame is None or frame.empty:
+            return None
+        return frame
+
+    def _store_price_history(self, ticker: str, frame: pd.DataFrame) -> None:
+        """Replace the stored history for a ticker with a freshly fetched/merged frame."""
+        if not self.price_store_dir:
+            return
+
+        columns = [col for col in HISTORY_COLUMNS if col in frame.columns]
+        store = self._load_price_store()
+        with self._state_lock:
+            store[ticker] = frame[columns]
+            self._price_store_dirty.add(self._price_store_partition(ticker))
+
+    def _merge_price_history(self, ticker: str, delta: pd.DataFrame) -> pd.DataFrame:
+        """Append freshly fetched tail bars to stored history (new bars win on overlap)."""
+        stored = self._get_stored_history(ticker)
+        if stored is None:
+            return delta
+
+        columns = [col for col in HISTORY_COLUMNS if col in delta.columns]
+        merged = pd.concat([stored[columns], delta[columns]])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        merged.index.name = stored.index.name or delta.index.name
+        return self._trim_history_window(merged)
+
+    def _history_revised(self, ticker: str, delta: pd.DataFrame) -> bool:
+        """
+        Compare re-fetched overlap bars with the stored ones. auto_adjust rewrites every past bar
+        after a split or dividend, so drift beyond price_store_revision_rtol means the stored
+        history is stale. The last stored bar may have been fetched before the session settled,
+        so it is only compared when it is the sole overlapping bar.
+        """
+        stored = self._get_stored_history(ticker)
+        if stored is None:
+            return False
+
+        common = stored.index.intersection(delta.index)
+        if common.empty:
+            return True
+        settled = common[common < stored.index[-1]]
+        if not settled.empty:
+            common = settled
+        columns = list(PRICE_COLUMNS)
+        return not np.allclose(
+            stored.loc[common, columns].to_numpy(dtype=np.float64),
+            delta.loc[common, columns].to_numpy(dtype=np.float64),
+            rtol=self.price_store_revision_rtol,
+            atol=0.0,
+            equal_nan=True,
+        )
+
+    def _plan_history_fetch(self, tickers: List[str]) -> Tuple[List[str], List[str], str]:
+        """
+        Split tickers into full-window fetches and tail-only (delta) fetches.
+        Returns: (full_tickers, delta_tickers, delta_period)
+        """
+        today = pd.Timestamp.now().normalize()
+        period_days = self._history_period_days()
+        full_tickers = []
+        delta_tickers = []
+        max_gap_days = 0
+
+        for ticker in tickers:
+            stored = self._get_stored_history(ticker)
+            if stored is None or len(stored) < self.min_history_rows:
+                full_tickers.append(ticker)
+                continue
+
+            last_date = pd.Timestamp(stored.index[-1])
+            if last_date.tzinfo is not None:
+                last_date = last_date.tz_localize(None)
+            gap_days = max((today - last_date.normalize()).days, 0) + self.price_store_overlap_days
+            if gap_days >= period_days:
+                full_tickers.append(ticker)
+                continue
+
+            delta_tickers.append(ticker)
+            max_gap_days = max(max_gap_days, gap_days)
+
+        return full_tickers, delta_tickers, f"{max_gap_days}d"
+
+    def _save_price_store(self) -> None:
+        """Persist modified price store partitions to Parquet."""
+        if not self.price_store_dir or self._price_store is None or not self._price_store_dirty:
+            return
+
+        os.makedirs(self.price_store_dir, exist_ok=True)
+        cutoff = self._history_cutoff()
+
+        for partition in sorted(self._price_store_dirty):
+            frames = []
+            for ticker, frame in self._price_store.items():
+                if self._price_store_partition(ticker) != partition or frame.empty:
+                    continue
+                last_date = pd.Timestamp(frame.index[-1])
+                if last_date.tzinfo is not None:
+                    last_date = last_date.tz_localize(None)
+                if last_date < cutoff:
+                    continue
+                table = frame.rename_axis('Date').reset_index()
+                table.insert(0, 'Ticker', ticker)
+                frames.append(table)
+
+            path = self._price_store_path(partition)
+            if not frames:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+
+            temp_path = f"{path}.tmp"
+            pd.concat(frames, ignore_index=True).to_parquet(temp_path, index=False)
+            os.replace(temp_path, path)
+            logger.info(f"Saved {len(frames)} tickers to price store partition {path}")
+
+        self._price_store_dirty.clear()
+
     def _normalize_krx_code(self, raw_code: Any) -> Optional[str]:
         """Normalize KRX code to 6-character uppercase alphanumeric string."""
         if pd.isna(raw_code):
@@ -214,63 +1302,93 @@ class TurtleTradingScreener:
             return None
         return code.zfill(6)[-6:]
 
-    def _market_value_to_suffix(self, market_value: Any) -> Optional[str]:
-        """Map KRX market text to Yahoo suffix."""
-        market_val = str(market_value or "").strip().upper().replace(" ", "")
-        if not market_val:
-            return None
+    def _normalize_krx_codes(self, raw_codes: pd.Series) -> pd.Series:
+        """Column-wise _normalize_krx_code: normalized codes, missing where a code is invalid."""
+        codes = pd.Series(None, index=raw_codes.index, dtype=object)
+        present = raw_codes.notna()
 
+        # Handle numeric values that may be parsed as float (e.g., 5930.0)
+        is_float = raw_codes.map(type).isin([float, np.float64, np.float32])
+        float_values = pd.to_numeric(raw_codes[present & is_float], errors='coerce')
+        integral = float_values[float_values.notna() & (float_values % 1 == 0)]
+        codes[integral.index] = integral.astype(np.int64).astype(str).str.zfill(6)
+
+        text = raw_codes[present & ~codes.index.isin(integral.index)].astype(str).str.strip().str.upper()
+        dot_zero = text.str.endswith('.0') & text.str[:-2].str.isdigit()
+        cleaned = text.str.replace(r'[^0-9A-Z]', '', regex=True).where(~dot_zero, text.str[:-2])
+        cleaned = cleaned[cleaned != '']
+        codes[cleaned.index] = cleaned.str.zfill(6).str[-6:]
+        return codes
+
+    def _market_values_to_suffixes(self, market_values: pd.Series) -> pd.Series:
+        """Map KRX market text to Yahoo suffixes column-wise (missing when unknown)."""
+        text = market_values.astype(str).str.strip().str.upper().str.replace(" ", "", regex=False)
         kospi_tokens = ("KOSPI", "유가증권", "STK", "MAIN")
         kosdaq_tokens = ("KOSDAQ", "코스닥", "KSQ")
+        is_kospi = text.str.contains('|'.join(map(re.escape, kospi_tokens)), regex=True)
+        is_kosdaq = text.str.contains('|'.join(map(re.escape, kosdaq_tokens)), regex=True)
+        return pd.Series(np.select([is_kospi, is_kosdaq], ['.KS', '.KQ'], None), index=market_values.index)
+
+    def _ticker_text_suffixes(self, values: pd.Series) -> pd.Series:
+        """Return the .KS/.KQ suffix already present in ticker-like text (missing otherwise)."""
+        text = values.astype(str).str.strip().str.upper()
+        return pd.Series(
+            np.select([text.str.endswith('.KS'), text.str.endswith('.KQ')], ['.KS', '.KQ'], None),
+            index=values.index,
+        )
 
-        if any(token in market_val for token in kospi_tokens):
-            return ".KS"
-        if any(token in market_val for token in kosdaq_tokens):
-            return ".KQ"
-        return None
-
-    def _detect_market_suffix(self, row: pd.Series, market_cols: List[str], code_col: str) -> Optional[str]:
-        """Detect Yahoo suffix (.KS/.KQ) from market value or raw ticker text."""
-        for market_col in market_cols:
-            suffix = self._market_value_to_suffix(row.get(market_col, ""))
-            if suffix:
-                return suffix
+    def _clean_text_column(self, values: pd.Series) -> pd.Series:
+        """Return stripped text per value, missing for NaN/blank values."""
+        text = pd.Series(None, index=values.index, dtype=object)
+        present = values[values.notna()].astype(str).str.strip()
+        present = present[present != '']
+        text[present.index] = present
+        return text
+
+    def _first_non_null(self, columns: List[pd.Series], index: pd.Index) -> pd.Series:
+        """Coalesce candidate columns left to right."""
+        result = pd.Series(None, index=index, dtype=object)
+        for column in columns:
+            result = result.where(result.notna(), column)
+        return result
+
+    def _detect_market_suffixes(self, df: pd.DataFrame, market_cols: List[str], code_col: str) -> pd.Series:
+        """Detect Yahoo suffixes (.KS/.KQ) from market values or raw ticker text, column-wise."""
+        candidates = [self._market_values_to_suffixes(df[market_col]) for market_col in market_cols]
 
         # fallback 1: code column already has suffix
-        code_raw = str(row.get(code_col, "")).strip().upper()
-        if code_raw.endswith(".KS"):
-            return ".KS"
-        if code_raw.endswith(".KQ"):
-            return ".KQ"
+        candidates.append(self._ticker_text_suffixes(df[code_col]))
 
         # fallback 2: check other likely ticker columns
-        for col in row.index:
+        for col in df.columns:
             col_name = str(col).lower()
             if any(token in col_name for token in ("ticker", "symbol", "종목", "코드")):
-                val = str(row.get(col, "")).strip().upper()
-                if val.endswith(".KS"):
-                    return ".KS"
-                if val.endswith(".KQ"):
-                    return ".KQ"
+                candidates.append(self._ticker_text_suffixes(df[col]))
 
-        return None
+        return self._first_non_null(candidates, df.index)
 
     def _load_krx_listing_lookup(self) -> Tuple[Dict[str, str], Dict[str, str]]:
-        """Load code->suffix/name lookup from FinanceDataReader KRX listing."""
+        """Load code->suffix/name lookup from the (cached) FinanceDataReader KRX listing."""
         if self._krx_listing_lookup is not None:
             return self._krx_listing_lookup
 
         try:
-            krx_df = fdr.StockListing('KRX')
+            records = self._get_listing_records('KRX', self._normalize_krx_listing)
         except Exception as e:
             logger.warning(f"Could not load KRX listing lookup from FinanceDataReader: {e}")
             self._krx_listing_lookup = ({}, {})
             return self._krx_listing_lookup
 
+        suffix_by_code = {record['code']: record['suffix'] for record in records}
+        name_by_code = {record['code']: record['name'] for record in records if record.get('name')}
+        self._krx_listing_lookup = (suffix_by_code, name_by_code)
+        return self._krx_listing_lookup
+
+    def _normalize_krx_listing(self, krx_df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Normalize a FinanceDataReader KRX listing into {code, suffix, name} records."""
         if krx_df is None or krx_df.empty:
             logger.warning("FinanceDataReader returned an empty KRX listing lookup.")
-            self._krx_listing_lookup = ({}, {})
-            return self._krx_listing_lookup
+            return []
 
         columns = krx_df.columns.tolist()
         code_col = self._find_column(columns, ["Code", "code", "Symbol", "symbol", "종목코드"])
@@ -282,48 +1400,149 @@ class TurtleTradingScreener:
                 "FinanceDataReader KRX listing is missing required columns for market lookup: "
                 f"code_col={code_col}, market_col={market_col}"
             )
-            self._krx_listing_lookup = ({}, {})
-            return self._krx_listing_lookup
-
-        suffix_by_code = {}
-        name_by_code = {}
-        unresolved_market = 0
-
-        for _, row in krx_df.iterrows():
-            code = self._normalize_krx_code(row.get(code_col))
-            suffix = self._market_value_to_suffix(row.get(market_col))
-            if not code or not suffix:
-                if code and not suffix:
-                    unresolved_market += 1
-                continue
-
-            suffix_by_code[code] = suffix
+            return []
 
-            if name_col:
-                name = row.get(name_col)
-                if pd.notna(name):
-                    stripped_name = str(name).strip()
-                    if stripped_name:
-                        name_by_code[code] = stripped_name
+        codes = self._normalize_krx_codes(krx_df[code_col])
+        suffixes = self._market_values_to_suffixes(krx_df[market_col])
+        names = (
+            self._clean_text_column(krx_df[name_col]) if name_col
+            else pd.Series(None, index=krx_df.index, dtype=object)
+        )
+        resolved = codes.notna() & suffixes.notna()
+        unresolved_market = int((codes.notna() & suffixes.isna()).sum())
+
+        # Later rows win for the suffix; the name falls back to the last non-empty one seen
+        grouped = pd.DataFrame(
+            {'code': codes[resolved], 'suffix': suffixes[resolved], 'name': names[resolved]}
+        ).groupby('code', sort=False)
+        last_suffix = grouped['suffix'].last()
+        last_name = grouped['name'].last()
+        records = [
+            {'code': code, 'suffix': suffix, 'name': None if pd.isna(name) else name}
+            for code, suffix, name in zip(last_suffix.index, last_suffix, last_name.reindex(last_suffix.index))
+        ]
 
         logger.info(
             "Loaded KRX lookup from FinanceDataReader "
-            f"(codes: {len(suffix_by_code)}, unresolved_market: {unresolved_market})"
+            f"(codes: {len(records)}, unresolved_market: {unresolved_market})"
         )
-        self._krx_listing_lookup = (suffix_by_code, name_by_code)
-        return self._krx_listing_lookup
+        return records
 
-    def _extract_name_from_row(self, row: pd.Series, name_cols: List[str]) -> Optional[str]:
-        """Extract first non-empty stock name from candidate name columns."""
-        for col in name_cols:
-            if col not in row.index:
-                continue
-            val = row.get(col)
-            if pd.notna(val):
-                name = str(val).strip()
-                if name:
-                    return name
-        return None
+    def _normalize_us_listing(self, listing: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Normalize an S&P500/NASDAQ listing into {ticker, name, sector} records."""
+        if listing is None or listing.empty:
+            return []
+
+        columns = listing.columns.tolist()
+        name_col = self._find_column(columns, ["Name", "종목명"])
+        sector_col = self._find_column(columns, ["Sector", "Industry"])
+        empty = pd.Series(None, index=listing.index, dtype=object)
+        normalized = pd.DataFrame(
+            {
+                # Clean up for yfinance compatibility, e.g. BRK.B -> BRK-B
+                'ticker': listing['Symbol'].astype(str).str.strip().str.replace('.', '-', regex=False),
+                'name': self._clean_text_column(listing[name_col]) if name_col else empty,
+                'sector': self._clean_text_column(listing[sector_col]) if sector_col else empty,
+            }
+        )
+        normalized = normalized[normalized['ticker'] != ''].drop_duplicates('ticker')
+        return [
+            {'ticker': ticker, 'name': None if pd.isna(name) else name, 'sector': None if pd.isna(sector) else sector}
+            for ticker, name, sector in zip(normalized['ticker'], normalized['name'], normalized['sector'])
+        ]
+
+    def _load_universe_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load persisted listing snapshots once per screener."""
+        with self._state_lock:
+            if self._universe_cache is None:
+                self._universe_cache = self._read_universe_cache()
+            return self._universe_cache
+
+    def _read_universe_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Read listing snapshots keyed by source from the universe cache file."""
+        if not self.universe_cache_file or not os.path.exists(self.universe_cache_file):
+            return {}
+
+        try:
+            with open(self.universe_cache_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read universe cache file {self.universe_cache_file}: {e}")
+            return {}
+
+        sources = payload.get('sources', {}) if isinstance(payload, dict) else {}
+        return sources if isinstance(sources, dict) else {}
+
+    def _universe_entry_is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Return True while a listing snapshot is younger than the universe TTL."""
+        fetched_at = self._parse_cache_timestamp(entry.get('fetched_at'))
+        if fetched_at is None:
+            return False
+
+        age = datetime.now(fetched_at.tzinfo) - fetched_at
+        return age <= timedelta(hours=self.universe_cache_ttl_hours)
+
+    def _get_listing_records(
+        self,
+        source: str,
+        normalizer: Callable[[pd.DataFrame], List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Return normalized listing records for a source, served from the universe cache while fresh.
+        Stale snapshots are refetched; if the refetch fails the last good snapshot is used instead.
+        """
+        cache = self._load_universe_cache()
+        entry = cache.get(source) or {}
+        if entry.get('records') and self._universe_entry_is_fresh(entry):
+            self._universe_sources[source] = {
+                'version': entry['content_hash'][:12],
+                'fetched_at': entry['fetched_at'],
+                'status': 'cached',
+            }
+            return entry['records']
+
+        try:
+            self.metrics.increment('listing_requests')
+            records = normalizer(self.data_provider.stock_listing(source))
+            if not records:
+                raise ValueError(f"{source} listing is empty")
+        except Exception as e:
+            if not entry.get('records'):
+                raise
+            logger.warning(f"Could not refresh {source} listing ({e}); using snapshot from {entry.get('fetched_at')}")
+            self._universe_sources[source] = {
+                'version': entry['content_hash'][:12],
+                'fetched_at': entry['fetched_at'],
+                'status': 'stale',
+            }
+            return entry['records']
+
+        content_hash = hashlib.sha256(
+            json.dumps(records, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        if entry and entry.get('content_hash') != content_hash:
+            logger.info(f"{source} listing changed: {len(entry.get('records', []))} -> {len(records)} records")
+
+        fetched_at = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        with self._state_lock:
+            cache[source] = {'fetched_at': fetched_at, 'content_hash': content_hash, 'records': records}
+            self._universe_cache_dirty = True
+        self._universe_sources[source] = {'version': content_hash[:12], 'fetched_at': fetched_at, 'status': 'refreshed'}
+        return records
+
+    def _save_universe_cache(self) -> None:
+        """Persist refreshed listing snapshots for the next run."""
+        if not self.universe_cache_file or not self._universe_cache_dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.universe_cache_file) or '.', exist_ok=True)
+        payload = {
+            'updated_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'sources': self._universe_cache,
+        }
+        with open(self.universe_cache_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, sort_keys=True)
+        self._universe_cache_dirty = False
 
     def _safe_int_value(self, raw_value: Any, default: int = 0) -> int:
         """Convert numeric-ish values to int without crashing on NaN."""
@@ -346,7 +1565,15 @@ class TurtleTradingScreener:
     def _apply_rate_limit_cooldown(self, seconds: Optional[int] = None) -> None:
         """Back off globally for a short period after upstream rate limiting."""
         cooldown = seconds or self.rate_limit_cooldown_seconds
-        self._yf_rate_limited_until = max(self._yf_rate_limited_until, time.time() + cooldown)
+        with self._state_lock:
+            if seconds is None:
+                # Only detected upstream rate limiting uses the default duration
+                self._rate_limit_hits += 1
+                self._batch_local.rate_limited = True
+                self.metrics.increment('rate_limit_hits')
+            else:
+                self.metrics.increment('failure_cooldowns')
+            self._yf_rate_limited_until = max(self._yf_rate_limited_until, time.time() + cooldown)
         logger.warning(f"Applying yfinance cooldown for {cooldown} seconds")
 
     def _wait_for_rate_limit_cooldown(self) -> None:
@@ -355,60 +1582,177 @@ class TurtleTradingScreener:
         if remaining > 0:
             sleep_for = int(remaining) + 1
             logger.warning(f"Waiting {sleep_for} seconds for yfinance cooldown")
-            time.sleep(sleep_for)
+            with self.metrics.timer('cooldown_sleep'):
+                time.sleep(sleep_for)
+
+    def _reset_request_limiter(self) -> None:
+        """(Re)build the shared request limiter; one token refills every batch_pause_seconds."""
+        self._request_limiter = TokenBucket(
+            rate_per_second=1.0 / max(self.batch_pause_seconds, 0.01),
+            capacity=self.request_burst,
+        )
+
+    def _get_batch_controller(self) -> AdaptiveBatchController:
+        """Create the AIMD controller from current settings plus persisted tuning."""
+        if self._batch_controller is None:
+            controller = AdaptiveBatchController(
+                batch_size=self.batch_size,
+                pause_seconds=self.batch_pause_seconds,
+                failure_cooldown_seconds=self.batch_failure_cooldown_seconds,
+                rate_limit_cooldown_seconds=self.rate_limit_cooldown_seconds,
+            )
+            controller.missing_failure_ratio = self.missing_failure_ratio
+            if self.adaptive_batching and self.download_tuning_file and os.path.exists(self.download_tuning_file):
+                try:
+                    with open(self.download_tuning_file, 'r', encoding='utf-8') as f:
+                        payload = json.load(f)
+                    controller.load_dict(payload.get('settings', {}) if isinstance(payload, dict) else {})
+                    logger.info(f"Loaded downloader tuning from {self.download_tuning_file}: {controller.to_dict()}")
+                except Exception as e:
+                    logger.warning(f"Could not read downloader tuning file {self.download_tuning_file}: {e}")
+            self._batch_controller = controller
+            self._apply_batch_controller_settings()
+        return self._batch_controller
+
+    def _apply_batch_controller_settings(self) -> None:
+        """Copy the controller's current settings onto the downloader pacing attributes."""
+        controller = self._batch_controller
+        if controller is None or not self.adaptive_batching:
+            return
+
+        self.batch_size = controller.batch_size
+        self.batch_pause_seconds = controller.pause_seconds
+        self.batch_failure_cooldown_seconds = controller.failure_cooldown_seconds
+        self.rate_limit_cooldown_seconds = controller.rate_limit_cooldown_seconds
+        if self._request_limiter is not None:
+            self._request_limiter.set_rate(1.0 / max(self.batch_pause_seconds, 0.01))
+
+    def _record_batch_feedback(self, missing_count: int, tickers: int, rate_limited: bool) -> None:
+        """Feed one batch outcome into the AIMD controller and apply the new settings."""
+        if not self.adaptive_batching:
+            return
+
+        controller = self._get_batch_controller()
+        controller.record_batch(missing_count, rate_limited, tickers)
+        self._apply_batch_controller_settings()
+
+    def _save_download_tuning(self) -> None:
+        """Persist learned downloader settings for the next run."""
+        if not self.adaptive_batching or not self.download_tuning_file or self._batch_controller is None:
+            return
+
+        os.makedirs(os.path.dirname(self.download_tuning_file) or '.', exist_ok=True)
+        payload = {
+            'updated_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'settings': self._batch_controller.to_dict(),
+        }
+        with open(self.download_tuning_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, sort_keys=True)
+
+    def _acquire_request_slot(self) -> None:
+        """Block until the global cooldown has passed and the token bucket grants a request."""
+        self._wait_for_rate_limit_cooldown()
+        if self._request_limiter is None:
+            self._reset_request_limiter()
+        self.metrics.add_time('pacing_sleep', self._request_limiter.acquire())
+        # A cooldown may have been applied by another worker while we waited for a token
+        self._wait_for_rate_limit_cooldown()
+
+    def _compact_history(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep only HISTORY_COLUMNS as float64, dropping bars where all of them are NaN.
+        Prices stay float64 so published levels match the source exactly; float64 volume is
+        exact for any real volume and keeps NaN for missing bars.
+        """
+        frame = frame.dropna(how='all', subset=list(HISTORY_COLUMNS))
+        columns = {col: frame[col].to_numpy(dtype=np.float64) for col in HISTORY_COLUMNS}
+        return pd.DataFrame(columns, index=frame.index, copy=False)
 
     def _normalize_downloaded_frame(self, data: Any, ticker: str) -> Optional[pd.DataFrame]:
-        """Normalize yfinance output into a single-ticker daily OHLCV frame."""
+        """Normalize yfinance output into a compact single-ticker daily history frame."""
         if not isinstance(data, pd.DataFrame) or data.empty:
             return None
 
-        frame = data.copy()
-
+        frame = data
         if isinstance(frame.columns, pd.MultiIndex):
             level0 = frame.columns.get_level_values(0)
             level_last = frame.columns.get_level_values(frame.columns.nlevels - 1)
 
             if ticker in level0:
-                frame = frame[ticker].copy()
+                frame = frame[ticker]
             elif ticker in level_last:
-                frame = frame.xs(ticker, axis=1, level=frame.columns.nlevels - 1, drop_level=True).copy()
+                frame = frame.xs(ticker, axis=1, level=frame.columns.nlevels - 1, drop_level=True)
             elif len(set(level_last)) == 1:
-                frame.columns = level0
+                frame = frame.set_axis(level0, axis=1)
             elif len(set(level0)) == 1:
-                frame.columns = level_last
+                frame = frame.set_axis(level_last, axis=1)
             else:
                 return None
 
-        required_columns = {"Open", "High", "Low", "Close", "Volume"}
-        if not required_columns.issubset(frame.columns):
+        if not set(HISTORY_COLUMNS).issubset(frame.columns):
             return None
 
-        frame = frame.dropna(how='all')
+        frame = self._compact_history(frame)
         if frame.empty:
             return None
 
         return frame
 
+    def _split_history_batch(self, data: Any, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Split a multi-ticker download into compact per-ticker frames.
+        The whole batch is converted once into one float64 array; every ticker's frame holds
+        views into it (a copy only when bars are missing mid-history).
+        """
+        if not isinstance(data, pd.DataFrame) or data.empty:
+            return {}
+        if not isinstance(data.columns, pd.MultiIndex) or data.columns.nlevels != 2:
+            frames = {ticker: self._normalize_downloaded_frame(data, ticker) for ticker in tickers}
+            return {ticker: frame for ticker, frame in frames.items() if frame is not None}
+
+        if not any(ticker in data.columns.get_level_values(0) for ticker in tickers):
+            data = data.swaplevel(axis=1)
+        present = set(data.columns)
+        tickers = [
+            ticker for ticker in dict.fromkeys(tickers)
+            if all((ticker, col) in present for col in HISTORY_COLUMNS)
+        ]
+        if not tickers:
+            return {}
+
+        fields = len(HISTORY_COLUMNS)
+        block = data.reindex(columns=pd.MultiIndex.from_product([tickers, HISTORY_COLUMNS]))
+        values = block.to_numpy(dtype=np.float64).reshape(len(block), len(tickers), fields)
+        has_bar = ~np.isnan(values).all(axis=2)
+        # (tickers, fields, bars) so each ticker's rows are contiguous views
+        history = np.ascontiguousarray(values.transpose(1, 2, 0))
+        del values
+
+        frames = {}
+        for idx, ticker in enumerate(tickers):
+            rows = np.flatnonzero(has_bar[:, idx])
+            if len(rows) == 0:
+                continue
+            start, stop = rows[0], rows[-1] + 1
+            bars = slice(start, stop) if len(rows) == stop - start else rows
+            columns = {col: history[idx, pos, bars] for pos, col in enumerate(HISTORY_COLUMNS)}
+            frames[ticker] = pd.DataFrame(columns, index=data.index[bars], copy=False)
+        return frames
+
     def _download_single_ticker_data(
         self,
         ticker: str,
         start_date: datetime,
         end_date: datetime,
         max_attempts: int = 3,
+        period: Optional[str] = None,
     ) -> Optional[pd.DataFrame]:
         """Retry single-ticker download for missing or malformed batch members."""
         for attempt in range(1, max_attempts + 1):
             try:
-                self._wait_for_rate_limit_cooldown()
-                data = yf.download(
-                    ticker,
-                    period=self.history_period,
-                    interval='1d',
-                    auto_adjust=True,
-                    progress=False,
-                    threads=False,
-                    session=self._get_yfinance_session(),
-                )
+                self._acquire_request_slot()
+                self.metrics.increment('http_requests')
+                data = self.data_provider.download_history(ticker, period or self.history_period)
                 frame = self._normalize_downloaded_frame(data, ticker)
                 if frame is not None and not frame.empty:
                     return frame
@@ -420,7 +1764,8 @@ class TurtleTradingScreener:
                 )
 
             if attempt < max_attempts:
-                time.sleep(attempt)
+                with self.metrics.timer('retry_backoff_sleep'):
+                    time.sleep(attempt)
 
         return None
 
@@ -469,39 +1814,34 @@ class TurtleTradingScreener:
             if col and col not in market_cols:
                 market_cols.append(col)
 
-        krx_tickers = []
-        mapped_names = 0
-        skipped_unknown_market = 0
-        skipped_invalid_code = 0
-        listing_fallback_hits = 0
-        listing_suffix_by_code = None
-        listing_name_by_code = None
-
-        for _, row in df.iterrows():
-            code = self._normalize_krx_code(row.get(code_col))
-            if not code:
-                skipped_invalid_code += 1
-                continue
-
-            suffix = self._detect_market_suffix(row, market_cols, code_col)
-            if not suffix:
-                if listing_suffix_by_code is None or listing_name_by_code is None:
-                    listing_suffix_by_code, listing_name_by_code = self._load_krx_listing_lookup()
-                suffix = listing_suffix_by_code.get(code)
-                if not suffix:
-                    skipped_unknown_market += 1
-                    continue
-                listing_fallback_hits += 1
-
-            full_ticker = f"{code}{suffix}"
-            krx_tickers.append(full_ticker)
+        codes = self._normalize_krx_codes(df[code_col])
+        suffixes = self._detect_market_suffixes(df, market_cols, code_col)
+        names = self._first_non_null([self._clean_text_column(df[col]) for col in name_cols], df.index)
+        skipped_invalid_code = int(codes.isna().sum())
 
-            stock_name = self._extract_name_from_row(row, name_cols)
-            if not stock_name and listing_name_by_code:
-                stock_name = listing_name_by_code.get(code)
-            if stock_name:
-                self.krx_ticker_map[full_ticker] = stock_name
-                mapped_names += 1
+        needs_listing = codes.notna() & suffixes.isna()
+        listing_fallback_hits = 0
+        skipped_unknown_market = 0
+        if needs_listing.any():
+            listing_suffix_by_code, listing_name_by_code = self._load_krx_listing_lookup()
+            listing_suffixes = codes[needs_listing].map(listing_suffix_by_code)
+            listing_fallback_hits = int(listing_suffixes.notna().sum())
+            skipped_unknown_market = int(listing_suffixes.isna().sum())
+            suffixes = suffixes.where(suffixes.notna(), listing_suffixes.reindex(df.index))
+
+            if listing_name_by_code:
+                # The listing is only consulted from the first row that needed it
+                listing_loaded = needs_listing.cummax()
+                listing_names = codes[listing_loaded & names.isna()].map(listing_name_by_code)
+                names = names.where(names.notna(), listing_names.reindex(df.index))
+
+        resolved = codes.notna() & suffixes.notna()
+        full_tickers = codes[resolved] + suffixes[resolved]
+        krx_tickers = full_tickers.tolist()
+
+        named = names[resolved].notna()
+        mapped_names = int(named.sum())
+        self.krx_ticker_map.update(zip(full_tickers[named], names[resolved][named]))
 
         # Remove duplicates while preserving order
         unique_tickers = list(dict.fromkeys(krx_tickers))
@@ -513,38 +1853,37 @@ class TurtleTradingScreener:
         )
         return unique_tickers
         
-    def get_ticker_universe(self) -> Tuple[List[str], List[str]]:
+    def get_ticker_universe(self, market: str = 'all') -> Tuple[List[str], List[str]]:
         """
-        Retrieve ticker universes for both KRX and US markets.
+        Retrieve ticker universes for the KRX and/or US markets ('all', 'krx' or 'us').
         KRX: fetch all tickers from KOSPI/KOSDAQ
         US: fetch S&P 500/NASDAQ ticker
-        Returns: (krx_tickers, us_tickers)
+        Returns: (krx_tickers, us_tickers); the market left out of scope is empty
         """
         logger.info("Building ticker universe from public sources...")
 
         # KRX (Korean) stocks from local CSV file
-        logger.info("Fetching KRX tickers from stock classification CSV...")
-        krx_tickers = self._load_krx_from_classification_csv()
+        krx_tickers = []
+        if market != 'us':
+            logger.info("Fetching KRX tickers from stock classification CSV...")
+            krx_tickers = self._load_krx_from_classification_csv()
 
-        # US stocks
+        # US stocks (listing snapshots are cached; one failing source no longer empties the other)
         us_tickers = []
-        try:
+        us_sources = ('S&P500', 'NASDAQ') if market != 'krx' else ()
+        if us_sources:
             logger.info("Fetching US tickers (NASDAQ, S&P500)")
-            sp500_df = fdr.StockListing('S&P500')
-            nasdaq_df = fdr.StockListing('NASDAQ')
-            # Clean up for yfinance compatibility, e.g. BRK.B -> BRK-B
-            sp500_df['Symbol'] = sp500_df['Symbol'].str.replace('.', '-', regex=False)
-            nasdaq_df['Symbol'] = nasdaq_df['Symbol'].str.replace('.', '-', regex=False)
-            us_tickers = sp500_df['Symbol'].tolist() + nasdaq_df['Symbol'].tolist()
-            # Remove duplicates
-            us_tickers = list(set(us_tickers))
-            logger.info(f"Found {len(us_tickers)} total US tickers")
-        except ImportError:
-            logger.error("FinanceDataReader is not installed. Please install it using `pip install finance-datareader` to fetch US tickers.")
-            us_tickers = []
-        except Exception as e:
-            logger.error(f"Could not fetch US tickers: {e}")
-            us_tickers = []
+        for source in us_sources:
+            try:
+                records = self._get_listing_records(source, self._normalize_us_listing)
+                us_tickers.extend(record['ticker'] for record in records)
+            except ImportError:
+                logger.error("FinanceDataReader is not installed. Please install it using `pip install finance-datareader` to fetch US tickers.")
+            except Exception as e:
+                logger.error(f"Could not fetch US tickers from {source}: {e}")
+        # Remove duplicates
+        us_tickers = list(dict.fromkeys(us_tickers))
+        logger.info(f"Found {len(us_tickers)} total US tickers")
 
         logger.info(f"Universe: {len(krx_tickers)} KRX tickers, {len(us_tickers)} US tickers")
         return krx_tickers, us_tickers
@@ -560,22 +1899,25 @@ class TurtleTradingScreener:
             logger.warning(f"Insufficient data for turtle signals: {ticker}")
             return None
         
-        # 수정: .copy()를 사용하여 SettingWithCopyWarning 방지
-        data = data.copy()
-        
-        # Calculate rolling highs and lows for different periods
-        data['High_20'] = data['High'].rolling(window=self.signal1_entry_period).max().shift(1)
-        data['Low_20'] = data['Low'].rolling(window=self.signal1_entry_period).min().shift(1)
-        data['Low_10'] = data['Low'].rolling(window=self.signal1_exit_period).min().shift(1)
-        
-        data['High_55'] = data['High'].rolling(window=self.signal2_entry_period).max().shift(1)
-        data['Low_20_exit'] = data['Low'].rolling(window=self.signal2_exit_period).min().shift(1)
-        
-        # Calculate 20-day average volume for liquidity filter
-        data['Volume_20_avg'] = data['Volume'].rolling(window=20).mean()
+        high, low = data['High'], data['Low']
         
         # Get current values (마지막 완성된 거래일 데이터 사용)
-        current_data = data.iloc[-1]
+        # Rolling levels are only read at the last bar, so they are not appended to `data` (no copy)
+        current_data = pd.Series(
+            {
+                'Close': data['Close'].iloc[-1],
+                'Volume': data['Volume'].iloc[-1],
+                'High_20': high.rolling(window=self.signal1_entry_period).max().shift(1).iloc[-1],
+                'Low_20': low.rolling(window=self.signal1_entry_period).min().shift(1).iloc[-1],
+                'Low_10': low.rolling(window=self.signal1_exit_period).min().shift(1).iloc[-1],
+                'High_55': high.rolling(window=self.signal2_entry_period).max().shift(1).iloc[-1],
+                'Low_20_exit': low.rolling(window=self.signal2_exit_period).min().shift(1).iloc[-1],
+                # 20-day average volume for liquidity filter
+                'Volume_20_avg': data['Volume'].rolling(window=self.volume_avg_period).mean().iloc[-1],
+            },
+            name=data.index[-1],
+            dtype=np.float64,
+        )
         if pd.isna(current_data['Close']):
             logger.warning(f"Latest close is NaN, skipping {ticker}")
             return None
@@ -674,108 +2016,999 @@ class TurtleTradingScreener:
                      signals['signal2']['entry'] is not None)
         
         return has_signal
-    
-    def download_data_safe(self, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+
+    def _build_price_panels(
+        self, frames: Dict[str, pd.DataFrame], depth: int, with_dates: bool = False
+    ) -> Dict[str, Any]:
         """
-        안전하게 데이터를 다운로드하여 개별 DataFrame으로 반환
+        Stack the last `depth` bars of each frame into right-aligned (bars x tickers) arrays.
+        Shorter histories are NaN-padded at the top, so each column keeps its own bar sequence.
+        `with_dates` adds a matching NaT-padded day panel under 'dates'.
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=200)
-        
-        # 수정: interval을 '1d'로 명시하여 일별 데이터만 가져오기
-        try:
-            if len(tickers) == 1:
-                # 단일 티커의 경우
-                frame = self._download_single_ticker_data(tickers[0], start_date, end_date)
-                return {tickers[0]: frame} if frame is not None else {}
-            else:
-                # 다중 티커의 경우
-                self._wait_for_rate_limit_cooldown()
-                all_data = yf.download(
-                    tickers,
-                    period=self.history_period,
-                    interval='1d',
-                    auto_adjust=True,
-                    group_by='ticker',
-                    progress=False,
-                    threads=False,
-                    session=self._get_yfinance_session(),
-                )
-                
-                result = {}
-                for ticker in tickers:
-                    try:
-                        single_data = None
-
-                        if isinstance(all_data, pd.DataFrame):
-                            if isinstance(all_data.columns, pd.MultiIndex):
-                                if ticker in all_data.columns.get_level_values(0):
-                                    single_data = self._normalize_downloaded_frame(all_data[ticker], ticker)
-                                elif ticker in all_data.columns.get_level_values(all_data.columns.nlevels - 1):
-                                    extracted = all_data.xs(
-                                        ticker,
-                                        axis=1,
-                                        level=all_data.columns.nlevels - 1,
-                                        drop_level=True,
-                                    )
-                                    single_data = self._normalize_downloaded_frame(extracted, ticker)
-                            else:
-                                single_data = self._normalize_downloaded_frame(all_data, ticker)
-
-                        if single_data is None or len(single_data) < 60:
-                            recovered = self._download_single_ticker_data(ticker, start_date, end_date)
-                            if recovered is not None and len(recovered) >= 60:
-                                result[ticker] = recovered
-                            else:
-                                logger.warning(f"No data available for {ticker}")
-                            continue
-
-                        result[ticker] = single_data
-                    except (KeyError, IndexError, TypeError, AttributeError) as e:
-                        if self._is_rate_limit_error(e):
-                            self._apply_rate_limit_cooldown()
-                        logger.warning(f"Malformed batch data for {ticker}: {e}")
-                        recovered = self._download_single_ticker_data(ticker, start_date, end_date)
-                        if recovered is not None and len(recovered) >= 60:
-                            result[ticker] = recovered
-                
-                return result
-        except Exception as e:
-            if self._is_rate_limit_error(e):
-                self._apply_rate_limit_cooldown()
-            logger.error(f"Error downloading data for batch: {str(e)}")
-            return {}
-    
-    def run_screening(self) -> Dict[str, Any]:
-        """Run the complete Turtle Trading screening process with improved data handling"""
-        start_time = time.time()
-        logger.info("Starting Turtle Trading screening process")
-        if self._sanitized_ca_bundle_envs:
-            logger.info(
-                "Sanitized invalid CA bundle environment variables: "
-                + ", ".join(self._sanitized_ca_bundle_envs)
+        tickers = list(frames.keys())
+        columns = ["High", "Low", "Close", "Volume"]
+        stacked = np.full((len(columns), depth, len(tickers)), np.nan)
+        lengths = np.zeros(len(tickers), dtype=np.int64)
+        last_dates = []
+        dates = np.full((depth, len(tickers)), np.datetime64('NaT'), dtype='datetime64[D]') if with_dates else None
+
+        for idx, ticker in enumerate(tickers):
+            frame = frames[ticker]
+            lengths[idx] = len(frame)
+            last_dates.append(frame.index[-1] if len(frame) else None)
+            rows = min(len(frame), depth)
+            if rows == 0:
+                continue
+            # One to_numpy per frame; selecting columns one by one costs far more per ticker
+            positions = [frame.columns.get_loc(col) for col in columns]
+            stacked[:, depth - rows:, idx] = frame.to_numpy(dtype=np.float64)[-rows:, positions].T
+            if dates is not None:
+                index = frame.index
+                if getattr(index, 'tz', None) is not None:
+                    index = index.tz_localize(None)
+                dates[depth - rows:, idx] = index.values[-rows:]
+
+        panels: Dict[str, Any] = dict(zip(columns, stacked))
+        if dates is not None:
+            panels['dates'] = dates
+        return {'tickers': tickers, 'lengths': lengths, 'last_dates': last_dates, **panels}
+
+    def _compute_signal_arrays(self, panels: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Vectorized equivalent of calculate_turtle_signals/passes_filters for the last bar of every column."""
+        high, low, close, volume = panels['High'], panels['Low'], panels['Close'], panels['Volume']
+
+        def prior_window(panel: np.ndarray, window: int, reducer) -> np.ndarray:
+            # rolling(window).max()/min().shift(1) evaluated at the last bar; NaN propagates like pandas
+            return reducer(panel[-window - 1:-1], axis=0)
+
+        high_20 = prior_window(high, self.signal1_entry_period, np.max)
+        low_20 = prior_window(low, self.signal1_entry_period, np.min)
+        low_10 = prior_window(low, self.signal1_exit_period, np.min)
+        high_55 = prior_window(high, self.signal2_entry_period, np.max)
+        low_20_exit = prior_window(low, self.signal2_exit_period, np.min)
+        volume_avg = np.mean(volume[-self.volume_avg_period:], axis=0)
+
+        price = close[-1]
+        valid = (panels['lengths'] >= self.signal2_entry_period + 1) & ~np.isnan(price)
+
+        with np.errstate(invalid='ignore'):
+            signal1_ready = ~(np.isnan(high_20) | np.isnan(low_20) | np.isnan(low_10))
+            signal1_entry = signal1_ready & (price > high_20)
+            signal1_exit = signal1_ready & ~signal1_entry & (price < low_20)
+            signal2_entry = ~(np.isnan(high_55) | np.isnan(low_20_exit)) & (price > high_55)
+
+            volume_avg_int = np.trunc(np.nan_to_num(volume_avg, nan=0.0))
+            is_krx = np.array([ticker.endswith(('.KS', '.KQ')) for ticker in panels['tickers']], dtype=bool)
+            min_price = np.where(is_krx, self.min_price_krw, self.min_price_usd)
+            min_volume = np.where(is_krx, self.krx_min_volume, self.us_min_volume)
+            passes = (
+                valid
+                & ~(price < min_price)
+                & ~(volume_avg_int < min_volume)
+                & (signal1_entry | signal1_exit | signal2_entry)
             )
-        
-        # Get ticker universes
+
+        return {
+            'valid': valid,
+            'price': price,
+            'volume': volume[-1],
+            'volume_avg': volume_avg_int,
+            'high_20': high_20,
+            'low_20': low_20,
+            'low_10': low_10,
+            'high_55': high_55,
+            'low_20_exit': low_20_exit,
+            'signal1_entry': signal1_entry,
+            'signal1_exit': signal1_exit,
+            'signal2_entry': signal2_entry,
+            'passes_filters': passes,
+        }
+
+    def calculate_turtle_signals_batch(
+        self, frames: Dict[str, pd.DataFrame]
+    ) -> Tuple[Dict[str, Optional[Dict[str, Any]]], Dict[str, bool]]:
+        """
+        Calculate Turtle signals for many tickers in one vectorized pass.
+        Produces the same analysis dicts as calculate_turtle_signals plus the passes_filters verdicts.
+        Returns: (analyses, passes_filters)
+        """
+        if not frames:
+            return {}, {}
+
+        panels = self._build_price_panels(frames, self._signal_panel_depth())
+        return self._signal_analyses(panels, self._compute_signal_arrays(panels))
+
+    def _signal_panel_depth(self) -> int:
+        """Bars the batch signal engine needs per ticker: the longest breakout window + 1, or the volume window."""
+        depth = max(
+            self.signal1_entry_period,
+            self.signal1_exit_period,
+            self.signal2_entry_period,
+            self.signal2_exit_period,
+        ) + 1
+        return max(depth, self.volume_avg_period)
+
+    def _signal_analyses(
+        self, panels: Dict[str, Any], arrays: Dict[str, np.ndarray]
+    ) -> Tuple[Dict[str, Optional[Dict[str, Any]]], Dict[str, bool]]:
+        """Turn the batch engine arrays into per-ticker analysis dicts and passes_filters verdicts."""
+        analyses: Dict[str, Optional[Dict[str, Any]]] = {}
+        passes: Dict[str, bool] = {}
+
+        for idx, ticker in enumerate(panels['tickers']):
+            if panels['lengths'][idx] < self.signal2_entry_period + 1:
+                logger.warning(f"Insufficient data for turtle signals: {ticker}")
+                analyses[ticker] = None
+                passes[ticker] = False
+                continue
+            if not arrays['valid'][idx]:
+                logger.warning(f"Latest close is NaN, skipping {ticker}")
+                analyses[ticker] = None
+                passes[ticker] = False
+                continue
+
+            analyses[ticker] = self._format_signal_analysis(
+                ticker,
+                float(arrays['price'][idx]),
+                self._safe_int_value(arrays['volume'][idx]),
+                int(arrays['volume_avg'][idx]),
+                {name: arrays[name][idx] for name in self._signal_window_spec()},
+                panels['last_dates'][idx].strftime('%Y-%m-%d'),
+                bool(arrays['signal1_entry'][idx]),
+                bool(arrays['signal1_exit'][idx]),
+                bool(arrays['signal2_entry'][idx]),
+            )
+            passes[ticker] = bool(arrays['passes_filters'][idx])
+
+        return analyses, passes
+
+    def _signal_window_spec(self) -> Dict[str, Tuple[str, int, bool]]:
+        """Breakout level name -> (price column, window, is_max), as used by calculate_turtle_signals."""
+        return {
+            'high_20': ('High', self.signal1_entry_period, True),
+            'low_20': ('Low', self.signal1_entry_period, False),
+            'low_10': ('Low', self.signal1_exit_period, False),
+            'high_55': ('High', self.signal2_entry_period, True),
+            'low_20_exit': ('Low', self.signal2_exit_period, False),
+        }
+
+    def _load_signal_states(self) -> Dict[str, TurtleSignalState]:
+        """Load persisted streaming signal states once per screener."""
+        if self._signal_states is not None:
+            return self._signal_states
+
+        self._signal_states = {}
+        if not self.signal_state_file or not os.path.exists(self.signal_state_file):
+            return self._signal_states
+
+        try:
+            with open(self.signal_state_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read signal state file {self.signal_state_file}: {e}")
+            return self._signal_states
+
+        spec = self._signal_window_spec()
+        for ticker, entry in (payload.get('tickers', {}) if isinstance(payload, dict) else {}).items():
+            try:
+                state = TurtleSignalState.from_dict(entry, spec, self.volume_avg_period, self.signal_state_tail_bars)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Discarding malformed signal state for {ticker}: {e}")
+                continue
+            if state is not None:
+                self._signal_states[ticker] = state
+
+        logger.info(f"Loaded {len(self._signal_states)} signal states from {self.signal_state_file}")
+        return self._signal_states
+
+    def _save_signal_states(self) -> None:
+        """Persist streaming signal states, dropping tickers not seen within the history window."""
+        if not self.signal_state_file or self._signal_states is None:
+            return
+
+        cutoff = self._history_cutoff().strftime('%Y-%m-%d')
+        tickers = {
+            ticker: state.to_dict()
+            for ticker, state in self._signal_states.items()
+            if state.last_bar and state.last_bar[0] >= cutoff
+        }
+        os.makedirs(os.path.dirname(self.signal_state_file) or '.', exist_ok=True)
+        payload = {
+            'updated_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'tickers': tickers,
+        }
+        with open(self.signal_state_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+
+    def _analysis_from_signal_state(self, ticker: str, state: TurtleSignalState) -> Optional[Dict[str, Any]]:
+        """Evaluate the Turtle rules for the last bar folded into a streaming state."""
+        if state.bars < self.signal2_entry_period + 1:
+            logger.warning(f"Insufficient data for turtle signals: {ticker}")
+            return None
+
+        signal_date, _, _, current_price, current_volume = state.last_bar
+        if math.isnan(current_price):
+            logger.warning(f"Latest close is NaN, skipping {ticker}")
+            return None
+
+        levels = state.levels
+        signal1_ready = not any(math.isnan(levels[name]) for name in ('high_20', 'low_20', 'low_10'))
+        signal1_entry = signal1_ready and current_price > levels['high_20']
+        signal1_exit = signal1_ready and not signal1_entry and current_price < levels['low_20']
+        signal2_entry = (
+            not (math.isnan(levels['high_55']) or math.isnan(levels['low_20_exit']))
+            and current_price > levels['high_55']
+        )
+
+        return self._format_signal_analysis(
+            ticker,
+            float(current_price),
+            self._safe_int_value(current_volume),
+            0 if math.isnan(state.volume_avg) else int(state.volume_avg),
+            levels,
+            signal_date,
+            signal1_entry,
+            signal1_exit,
+            signal2_entry,
+        )
+
+    def _calculate_signals_incremental(
+        self, frames: Dict[str, pd.DataFrame]
+    ) -> Tuple[Dict[str, Optional[Dict[str, Any]]], Dict[str, bool]]:
+        """
+        Fold only the new bars of each frame into its persisted signal state and read the
+        signals off the state. Tickers without a state, with revised history or with more than
+        signal_state_max_new_bars new bars are recomputed with the batch engine and get a fresh state.
+        """
+        if not self.signal_state_file or not frames:
+            return self._calculate_batch_signals_safe(frames)
+
+        states = self._load_signal_states()
+        analyses: Dict[str, Optional[Dict[str, Any]]] = {}
+        passes: Dict[str, bool] = {}
+
+        try:
+            recent = self._build_price_panels(
+                frames, self.signal_state_tail_bars + self.signal_state_max_new_bars, with_dates=True
+            )
+            folded = self._fold_signal_states(recent)
+        except Exception as e:
+            logger.warning(f"Signal state update failed, recomputing {len(frames)} tickers: {e}")
+            folded = []
+
+        for ticker in folded:
+            analysis = self._analysis_from_signal_state(ticker, states[ticker])
+            analyses[ticker] = analysis
+            passes[ticker] = self.passes_filters(analysis)
+        self.metrics.increment('signal_state_updates', len(folded))
+
+        recompute = {ticker: frame for ticker, frame in frames.items() if ticker not in analyses}
+        if not recompute:
+            return analyses, passes
+
+        self.metrics.increment('signal_state_rebuilds', len(recompute))
+        try:
+            depth = max(self._signal_panel_depth(), self.signal_state_tail_bars)
+            panels = self._build_price_panels(recompute, depth, with_dates=True)
+            arrays = self._compute_signal_arrays(panels)
+        except Exception as e:
+            logger.error(f"Vectorized signal calculation failed, falling back to per-ticker: {e}")
+            # Dropped states are rebuilt from scratch on the next run
+            for ticker in recompute:
+                states.pop(ticker, None)
+            recomputed_analyses, recomputed_passes = self._calculate_batch_signals_safe(recompute)
+        else:
+            self._rebuild_signal_states(panels, arrays)
+            recomputed_analyses, recomputed_passes = self._signal_analyses(panels, arrays)
+
+        analyses.update(recomputed_analyses)
+        passes.update(recomputed_passes)
+        return analyses, passes
+
+    def _fold_signal_states(self, panels: Dict[str, Any]) -> List[str]:
+        """
+        Push the new bars of every panel column into its state when the stored tail still sits
+        unchanged in the panel. The tail check runs on stacked (tickers x tail_bars) arrays.
+        Returns the tickers whose state is now at their last bar.
+        """
+        states = self._load_signal_states()
+        columns = ('High', 'Low', 'Close', 'Volume')
+        tickers = panels['tickers']
+        lengths = panels['lengths']
+        depth = panels['dates'].shape[0]
+        tail_bars = self.signal_state_tail_bars
+
+        cols = np.array(
+            [idx for idx, ticker in enumerate(tickers) if ticker in states and len(states[ticker].tail) == tail_bars],
+            dtype=np.int64,
+        )
+        if not cols.size:
+            return []
+
+        tails = [states[tickers[idx]].tail for idx in cols]
+        stored_dates = np.array([[bar[0] for bar in tail] for tail in tails], dtype='datetime64[D]')
+        stored = np.array([[bar[1:] for bar in tail] for tail in tails], dtype=np.float64)
+
+        # The panel holds tail_bars + signal_state_max_new_bars rows, so a larger gap never matches
+        new_counts = (panels['dates'][:, cols] > stored_dates[:, -1]).sum(axis=0)
+        starts = depth - new_counts - tail_bars
+        in_panel = (starts >= 0) & (starts >= depth - lengths[cols])
+        rows = np.maximum(starts, 0)[:, None] + np.arange(tail_bars)
+        current = np.stack([panels[col][rows, cols[:, None]] for col in columns], axis=-1)
+        matches = (
+            in_panel
+            & (panels['dates'][rows, cols[:, None]] == stored_dates).all(axis=1)
+            & ((current == stored) | (np.isnan(current) & np.isnan(stored))).all(axis=(1, 2))
+        )
+
+        # Only the newest rows are pushed; stack them once as (rows x tickers x column) Python-ready values
+        recent = max([1, *new_counts[matches].tolist()])
+        day_strings = np.datetime_as_string(panels['dates'][depth - recent:], unit='D')
+        bars = np.stack([panels[col][depth - recent:] for col in columns], axis=-1)
+        folded = []
+        for idx, new_count in zip(cols[matches].tolist(), new_counts[matches].tolist()):
+            ticker = tickers[idx]
+            try:
+                values = bars[recent - new_count:, idx].tolist()
+                for date, (high, low, close, volume) in zip(day_strings[recent - new_count:, idx].tolist(), values):
+                    states[ticker].push(date, high, low, close, volume)
+            except Exception as e:
+                states.pop(ticker, None)
+                logger.warning(f"Signal state update failed for {ticker}, recomputing: {e}")
+                continue
+            folded.append(ticker)
+        return folded
+
+    def _rebuild_signal_states(self, panels: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        """Replace the state of every panel column with one built from the panel and the batch engine levels."""
+        states = self._load_signal_states()
+        spec = self._signal_window_spec()
+        columns = ('High', 'Low', 'Close', 'Volume')
+        lengths = panels['lengths']
+        depth = panels['dates'].shape[0]
+        tail_bars = self.signal_state_tail_bars
+        day_strings = np.datetime_as_string(panels['dates'][depth - tail_bars:], unit='D')
+
+        for idx, ticker in enumerate(panels['tickers']):
+            if lengths[idx] == 0:
+                states.pop(ticker, None)
+                continue
+            rows = min(int(lengths[idx]), depth)
+            try:
+                states[ticker] = TurtleSignalState.from_columns(
+                    spec,
+                    self.volume_avg_period,
+                    tail_bars,
+                    {col: panels[col][depth - rows:, idx] for col in columns},
+                    day_strings[-min(rows, tail_bars):, idx].tolist(),
+                    int(lengths[idx]),
+                    {name: arrays[name][idx] for name in spec},
+                )
+            except Exception as e:
+                states.pop(ticker, None)
+                logger.warning(f"Could not build signal state for {ticker}: {e}")
+
+    def _format_signal_analysis(
+        self,
+        ticker: str,
+        current_price: float,
+        current_volume: int,
+        volume_avg: int,
+        levels: Dict[str, float],
+        signal_date: str,
+        signal1_entry: bool,
+        signal1_exit: bool,
+        signal2_entry: bool,
+    ) -> Dict[str, Any]:
+        """Build the analysis dict shared by the batch and streaming signal engines."""
+        def level(name: str) -> Optional[float]:
+            value = levels[name]
+            return None if math.isnan(value) else float(value)
+
+        results = {
+            'ticker': ticker,
+            'current_price': current_price,
+            'current_volume': current_volume,
+            'volume_20_avg': volume_avg,
+            'signals': {
+                'signal1': {'entry': None, 'exit': None},
+                'signal2': {'entry': None, 'exit': None}
+            },
+            'breakout_levels': {
+                'high_20': level('high_20'),
+                'low_20': level('low_20'),
+                'high_55': level('high_55'),
+                'low_10': level('low_10'),
+                'low_20_exit': level('low_20_exit'),
+            }
+        }
+
+        if signal1_entry:
+            results['signals']['signal1']['entry'] = {
+                'type': 'BUY',
+                'price': current_price,
+                'breakout_level': float(levels['high_20']),
+                'date': signal_date,
+                'exit_level': float(levels['low_10'])
+            }
+        elif signal1_exit:
+            results['signals']['signal1']['exit'] = {
+                'type': 'SELL',
+                'price': current_price,
+                'breakdown_level': float(levels['low_20']),
+                'date': signal_date
+            }
+
+        if signal2_entry:
+            results['signals']['signal2']['entry'] = {
+                'type': 'BUY',
+                'price': current_price,
+                'breakout_level': float(levels['high_55']),
+                'date': signal_date,
+                'exit_level': float(levels['low_20_exit'])
+            }
+
+        return results
+
+    def _calculate_batch_signals_safe(
+        self, frames: Dict[str, pd.DataFrame]
+    ) -> Tuple[Dict[str, Optional[Dict[str, Any]]], Dict[str, bool]]:
+        """Run the vectorized signal engine, falling back to per-ticker calculation on failure."""
+        try:
+            return self.calculate_turtle_signals_batch(frames)
+        except Exception as e:
+            logger.error(f"Vectorized signal calculation failed, falling back to per-ticker: {e}")
+
+        analyses = {}
+        passes = {}
+        for ticker, frame in frames.items():
+            try:
+                analysis = self.calculate_turtle_signals(frame, ticker)
+            except Exception as e:
+                # Left out of the result so run_screening records it as a processing error
+                logger.error(f"Error processing {ticker}: {str(e)}")
+                continue
+            analyses[ticker] = analysis
+            passes[ticker] = self.passes_filters(analysis)
+        return analyses, passes
+
+    def _build_history_panels(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Stack full histories into right-aligned (bars x tickers) arrays plus a matching date panel.
+        Like _build_price_panels, each column keeps its own bar sequence (shorter ones NaN-padded on top).
+        """
+        tickers = list(frames.keys())
+        columns = ["High", "Low", "Close"]
+        depth = max(len(frame) for frame in frames.values())
+        stacked = np.full((len(columns), depth, len(tickers)), np.nan)
+        dates = np.full((depth, len(tickers)), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+        for idx, ticker in enumerate(tickers):
+            frame = frames[ticker]
+            rows = len(frame)
+            if rows == 0:
+                continue
+            index = frame.index
+            if getattr(index, 'tz', None) is not None:
+                index = index.tz_localize(None)
+            dates[depth - rows:, idx] = index.to_numpy(dtype='datetime64[ns]')
+            positions = [frame.columns.get_loc(col) for col in columns]
+            stacked[:, depth - rows:, idx] = frame.to_numpy(dtype=np.float64)[:, positions].T
+
+        return {'tickers': tickers, 'dates': dates, **dict(zip(columns, stacked))}
+
+    def _positions_from_signals(self, entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+        """
+        Long/flat state machine over all bars at once: an entry sets 1, an exit sets 0 and every
+        other bar carries the previous state forward (vectorized forward fill).
+        """
+        bars = np.arange(entries.shape[0], dtype=np.int32)[:, None]
+        # An entry wins over an exit on the same bar; long while the last entry is newer than the last exit
+        last_entry = np.maximum.accumulate(np.where(entries, bars, -1), axis=0)
+        last_exit = np.maximum.accumulate(np.where(exits & ~entries, bars, -1), axis=0)
+        return last_entry > last_exit
+
+    def _extract_trades(
+        self,
+        position: np.ndarray,
+        close: np.ndarray,
+        dates: np.ndarray,
+        tickers: List[str],
+    ) -> pd.DataFrame:
+        """Pair entry/exit transitions of a position panel into one row per trade (open ones marked)."""
+        held = position > 0
+        previous = np.vstack([np.zeros((1, held.shape[1]), dtype=bool), held[:-1]])
+        last_bar = held.shape[0] - 1
+
+        # Transposed so nonzero() walks ticker by ticker, bars in order: starts and ends alternate
+        start_cols, start_bars = np.nonzero((held & ~previous).T)
+        end_cols, end_bars = np.nonzero((~held & previous).T)
+        open_cols = np.nonzero(held[-1])[0]
+        end_cols = np.concatenate([end_cols, open_cols])
+        end_bars = np.concatenate([end_bars, np.full(len(open_cols), last_bar)])
+        is_open = np.concatenate(
+            [np.zeros(len(end_cols) - len(open_cols), dtype=bool), np.ones(len(open_cols), dtype=bool)]
+        )
+        order = np.lexsort((end_bars, end_cols))
+        end_cols, end_bars, is_open = end_cols[order], end_bars[order], is_open[order]
+
+        entry_price = close[start_bars, start_cols]
+        exit_price = close[end_bars, end_cols]
+        return pd.DataFrame(
+            {
+                'ticker': np.asarray(tickers, dtype=object)[start_cols],
+                'entry_date': dates[start_bars, start_cols],
+                'exit_date': dates[end_bars, end_cols],
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'return_pct': (exit_price / entry_price - 1) * 100,
+                'holding_bars': end_bars - start_bars,
+                'open': is_open,
+            }
+        )
+
+    def _bar_returns(self, close: np.ndarray) -> np.ndarray:
+        """Close-to-close return of every bar (0 where either close is missing), shared by all rules."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.nan_to_num(close[1:] / close[:-1] - 1, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def _max_drawdowns(self, position: np.ndarray, bar_returns: np.ndarray) -> np.ndarray:
+        """Per-ticker max drawdown (%) of the equity curve from holding only while in position."""
+        equity = np.cumprod(1 + position[:-1] * bar_returns, axis=0)
+        peaks = np.maximum(np.maximum.accumulate(equity, axis=0), 1.0)
+        equity /= peaks
+        return (1 - equity.min(axis=0, initial=1.0)) * 100
+
+    def _range_extreme_tables(
+        self,
+        panels: Dict[str, Any],
+        specs: List[Tuple[str, int, bool]],
+    ) -> Dict[Tuple[str, bool], RangeExtremeTable]:
+        """One shared sparse table per (price column, max/min) covering every requested window."""
+        windows: Dict[Tuple[str, bool], List[int]] = {}
+        for column, window, is_max in specs:
+            windows.setdefault((column, is_max), []).append(window)
+        return {
+            (column, is_max): RangeExtremeTable(panels[column], column_windows, is_max)
+            for (column, is_max), column_windows in windows.items()
+        }
+
+    def _history_ready(self, dates: np.ndarray) -> np.ndarray:
+        """Like calculate_turtle_signals, no entries before a ticker has signal2_entry_period + 1 bars."""
+        return np.cumsum(~np.isnat(dates), axis=0) >= self.signal2_entry_period + 1
+
+    def _market_masks(self, tickers: List[str]) -> Dict[str, np.ndarray]:
+        is_krx = np.array([ticker.endswith(('.KS', '.KQ')) for ticker in tickers], dtype=bool)
+        return {market: mask for market, mask in (('KRX', is_krx), ('US', ~is_krx)) if mask.any()}
+
+    def _simulate_rule(
+        self,
+        panels: Dict[str, Any],
+        entries: np.ndarray,
+        exits: np.ndarray,
+        bar_returns: np.ndarray,
+    ) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Run one entry/exit rule over the panels. Returns: (trades frame, per-ticker max drawdown %)"""
+        position = self._positions_from_signals(entries, exits)
+        trades = self._extract_trades(position, panels['Close'], panels['dates'], panels['tickers'])
+        trades.insert(1, 'market', np.where(trades['ticker'].str.endswith(('.KS', '.KQ')), 'KRX', 'US'))
+        return trades, self._max_drawdowns(position, bar_returns)
+
+    def _summarize_trades(
+        self,
+        trades: pd.DataFrame,
+        drawdowns: np.ndarray,
+        market: str,
+        mask: np.ndarray,
+    ) -> Dict[str, Any]:
+        market_trades = trades[trades['market'] == market]
+        closed = market_trades[~market_trades['open']]
+        market_drawdowns = drawdowns[mask]
+        return {
+            'tickers': int(mask.sum()),
+            'trades': int(len(closed)),
+            'open_trades': int(len(market_trades) - len(closed)),
+            'hit_rate': round(float((closed['return_pct'] > 0).mean() * 100), 1) if len(closed) else None,
+            'avg_return_pct': round(float(closed['return_pct'].mean()), 2) if len(closed) else None,
+            'avg_holding_bars': round(float(closed['holding_bars'].mean()), 1) if len(closed) else None,
+            'max_holding_bars': int(closed['holding_bars'].max()) if len(closed) else None,
+            'avg_max_drawdown_pct': round(float(market_drawdowns.mean()), 2),
+            'worst_max_drawdown_pct': round(float(market_drawdowns.max()), 2),
+        }
+
+    def _process_worker_count(self) -> int:
+        return (os.cpu_count() or 1) if self.process_workers == 0 else max(int(self.process_workers), 1)
+
+    def _map_panel_chunks(self, method_name: str, panels: Dict[str, Any], *args) -> List[Any]:
+        """
+        Run a panel engine method over contiguous ticker-column chunks in a process pool, with the
+        panels shared through one SharedMemory block. Results come back in column order, so merging
+        them reproduces the single-process output. Runs in-process for one worker, small universes
+        or when the pool cannot start.
+        """
+        tickers = panels['tickers']
+        workers = min(self._process_worker_count(), len(tickers) // max(self.min_tickers_per_process, 1))
+        if workers <= 1:
+            return [getattr(self, method_name)(panels, *args)]
+
+        bounds = np.linspace(0, len(tickers), workers + 1).astype(int)
+        arrays = {name: value for name, value in panels.items() if isinstance(value, np.ndarray)}
+        settings = {name: getattr(self, name) for name in self._POOL_SETTINGS}
+        try:
+            with SharedPanels(arrays) as shared, ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_pool_worker,
+                initargs=(settings,),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _run_panel_task, method_name, shared.spec, int(start), int(stop), tickers[start:stop], args
+                    )
+                    for start, stop in zip(bounds[:-1], bounds[1:])
+                ]
+                results = [future.result() for future in futures]
+            logger.info(f"{method_name}: {len(tickers)} tickers over {workers} processes")
+            return results
+        except Exception as e:
+            logger.warning(f"Process pool unavailable for {method_name}, running in-process: {e}")
+            return [getattr(self, method_name)(panels, *args)]
+
+    def _merge_chunk_outcomes(
+        self, chunks: List[Dict[Any, Tuple[pd.DataFrame, np.ndarray]]]
+    ) -> Dict[Any, Tuple[pd.DataFrame, np.ndarray]]:
+        """Concatenate per-chunk (trades, drawdowns) outcomes key by key, in chunk order."""
+        if len(chunks) == 1:
+            return chunks[0]
+        return {
+            key: (
+                pd.concat([chunk[key][0] for chunk in chunks], ignore_index=True),
+                np.concatenate([chunk[key][1] for chunk in chunks]),
+            )
+            for key in chunks[0]
+        }
+
+    def _backtest_panels(self, panels: Dict[str, Any]) -> Dict[str, Tuple[pd.DataFrame, np.ndarray]]:
+        """Signal name -> (trades, per-ticker max drawdown %) for Signal 1 and Signal 2 over the panels."""
+        close = panels['Close']
+        spec = self._signal_window_spec()
+        tables = self._range_extreme_tables(panels, list(spec.values()))
+        levels = {
+            name: tables[(column, is_max)].window(window) for name, (column, window, is_max) in spec.items()
+        }
+        history_ready = self._history_ready(panels['dates'])
+
+        with np.errstate(invalid='ignore'):
+            signal1_ready = history_ready & ~(
+                np.isnan(levels['high_20']) | np.isnan(levels['low_20']) | np.isnan(levels['low_10'])
+            )
+            signal2_ready = history_ready & ~(np.isnan(levels['high_55']) | np.isnan(levels['low_20_exit']))
+            rules = {
+                'signal1': (signal1_ready & (close > levels['high_20']), close < levels['low_10']),
+                'signal2': (signal2_ready & (close > levels['high_55']), close < levels['low_20_exit']),
+            }
+
+        bar_returns = self._bar_returns(close)
+        return {
+            signal_name: self._simulate_rule(panels, entries, exits, bar_returns)
+            for signal_name, (entries, exits) in rules.items()
+        }
+
+    def backtest_turtle_signals(self, frames: Dict[str, pd.DataFrame]) -> Tuple[Dict[str, Any], pd.DataFrame]:
+        """
+        Replay Signal 1 (20-day breakout, 10-day low exit) and Signal 2 (55-day breakout,
+        20-day low exit) over every bar of every frame, using the same rolling levels as
+        calculate_turtle_signals. Positions enter/exit at the signal bar's close.
+        Returns: (per-market summary, trades frame)
+        """
+        frames = {ticker: frame for ticker, frame in frames.items() if len(frame)}
+        if not frames:
+            return {}, pd.DataFrame()
+
+        panels = self._build_history_panels(frames)
+        outcomes = self._merge_chunk_outcomes(self._map_panel_chunks('_backtest_panels', panels))
+        markets = self._market_masks(panels['tickers'])
+        summary: Dict[str, Any] = {market: {} for market in markets}
+        trade_frames = []
+
+        for signal_name, (trades, drawdowns) in outcomes.items():
+            trades.insert(1, 'signal', signal_name)
+            trade_frames.append(trades)
+            for market, mask in markets.items():
+                summary[market][signal_name] = self._summarize_trades(trades, drawdowns, market, mask)
+
+        return summary, pd.concat(trade_frames, ignore_index=True)
+
+    def _sweep_panels(
+        self,
+        panels: Dict[str, Any],
+        entry_periods: List[int],
+        exit_periods: List[int],
+    ) -> Dict[Tuple[int, int], Tuple[pd.DataFrame, np.ndarray]]:
+        """(entry, exit) -> (trades, per-ticker max drawdown %) for every period pair over the panels."""
+        close = panels['Close']
+        tables = self._range_extreme_tables(
+            panels,
+            [('High', period, True) for period in entry_periods] + [('Low', period, False) for period in exit_periods],
+        )
+        exit_levels = {period: tables[('Low', False)].window(period) for period in exit_periods}
+        history_ready = self._history_ready(panels['dates'])
+        bar_returns = self._bar_returns(close)
+        outcomes = {}
+
+        for entry_period in entry_periods:
+            with np.errstate(invalid='ignore'):
+                breakouts = history_ready & (close > tables[('High', True)].window(entry_period))
+            for exit_period in exit_periods:
+                exit_level = exit_levels[exit_period]
+                with np.errstate(invalid='ignore'):
+                    trades, drawdowns = self._simulate_rule(
+                        panels, breakouts & ~np.isnan(exit_level), close < exit_level, bar_returns
+                    )
+                # Only what the summary needs, to keep pool results small
+                outcomes[(entry_period, exit_period)] = (
+                    trades[['market', 'return_pct', 'holding_bars', 'open']],
+                    drawdowns,
+                )
+        return outcomes
+
+    def sweep_turtle_periods(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        entry_periods: List[int],
+        exit_periods: List[int],
+    ) -> pd.DataFrame:
+        """
+        Backtest every (entry, exit) period pair: enter on a close above the prior `entry`-bar high,
+        exit on a close below the prior `exit`-bar low. All windows are answered from one sparse
+        table per price column, so each extra pair only costs the position/trade pass.
+        Returns: one row per market and period pair
+        """
+        entry_periods = sorted({int(period) for period in entry_periods})
+        exit_periods = sorted({int(period) for period in exit_periods})
+        if not entry_periods or not exit_periods or min(entry_periods + exit_periods) < 1:
+            raise ValueError("sweep periods must be positive integers")
+
+        frames = {ticker: frame for ticker, frame in frames.items() if len(frame)}
+        if not frames:
+            return pd.DataFrame()
+
+        panels = self._build_history_panels(frames)
+        outcomes = self._merge_chunk_outcomes(
+            self._map_panel_chunks('_sweep_panels', panels, entry_periods, exit_periods)
+        )
+        markets = self._market_masks(panels['tickers'])
+        rows = []
+
+        for (entry_period, exit_period), (trades, drawdowns) in outcomes.items():
+            for market, mask in markets.items():
+                rows.append(
+                    {
+                        'market': market,
+                        'entry_period': entry_period,
+                        'exit_period': exit_period,
+                        **self._summarize_trades(trades, drawdowns, market, mask),
+                    }
+                )
+
+        return pd.DataFrame(rows)
+
+    def _download_backtest_history(self, tickers: List[str], period: str) -> Dict[str, pd.DataFrame]:
+        """Download long histories for the backtest (bypasses the 240-day price store)."""
+        batch_size = max(int(self.batch_size), 1)
+        batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+        frames: Dict[str, pd.DataFrame] = {}
+        self._reset_request_limiter()
+
+        with ThreadPoolExecutor(max_workers=self.max_inflight_batches, thread_name_prefix='yf-backtest') as executor:
+            for batch_no, batch_frames in enumerate(
+                executor.map(
+                    lambda batch: self._download_history_batch(batch, period, self.signal2_entry_period + 1),
+                    batches,
+                ),
+                start=1,
+            ):
+                logger.info(f"Backtest batch {batch_no}/{len(batches)}: {len(batch_frames)} histories")
+                frames.update(batch_frames)
+        return frames
+
+    def run_backtest(self, period: str = '5y') -> Tuple[Dict[str, Any], pd.DataFrame]:
+        """Backtest both Turtle signals over `period` of history for the whole universe."""
+        start_time = time.time()
         krx_tickers, us_tickers = self.get_ticker_universe()
+        frames = self._download_backtest_history(krx_tickers + us_tickers, period)
+
+        engine_start = time.time()
+        summary, trades = self.backtest_turtle_signals(frames)
+        logger.info(
+            f"Backtested {len(frames)} tickers in {time.time() - engine_start:.2f}s: "
+            f"{len(trades)} trades"
+        )
+
+        results = {
+            'metadata': {
+                'last_updated': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                'period': period,
+                'tickers_requested': len(krx_tickers) + len(us_tickers),
+                'tickers_backtested': len(frames),
+                'engine_seconds': round(time.time() - engine_start, 2),
+                'processing_time_seconds': round(time.time() - start_time, 2),
+            },
+            'markets': summary,
+        }
+        return results, trades
+
+    def run_period_sweep(
+        self,
+        entry_periods: List[int],
+        exit_periods: List[int],
+        period: str = '5y',
+    ) -> Dict[str, Any]:
+        """Sweep (entry, exit) breakout periods over `period` of history for the whole universe."""
+        start_time = time.time()
+        krx_tickers, us_tickers = self.get_ticker_universe()
+        frames = self._download_backtest_history(krx_tickers + us_tickers, period)
+
+        engine_start = time.time()
+        grid = self.sweep_turtle_periods(frames, entry_periods, exit_periods)
+        logger.info(
+            f"Swept {len(entry_periods)}x{len(exit_periods)} period pairs over {len(frames)} tickers "
+            f"in {time.time() - engine_start:.2f}s"
+        )
+
+        return {
+            'metadata': {
+                'last_updated': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                'period': period,
+                'entry_periods': sorted(set(entry_periods)),
+                'exit_periods': sorted(set(exit_periods)),
+                'tickers_requested': len(krx_tickers) + len(us_tickers),
+                'tickers_backtested': len(frames),
+                'engine_seconds': round(time.time() - engine_start, 2),
+                'processing_time_seconds': round(time.time() - start_time, 2),
+            },
+            'grid': [
+                {key: (None if pd.isna(value) else value) for key, value in row.items()}
+                for row in grid.to_dict('records')
+            ],
+        }
+
+    def save_backtest_results(
+        self,
+        results: Dict[str, Any],
+        trades: pd.DataFrame,
+        output_file: str,
+        trades_file: Optional[str] = None,
+    ) -> bool:
+        """Save the backtest summary as JSON and, optionally, every trade as CSV."""
+        try:
+            os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            if trades_file:
+                os.makedirs(os.path.dirname(trades_file) or '.', exist_ok=True)
+                trades.to_csv(trades_file, index=False)
+            logger.info(f"Backtest results saved to {output_file}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving backtest results: {str(e)}")
+            return False
+
+    def download_data_safe(self, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        안전하게 데이터를 다운로드하여 개별 DataFrame으로 반환
+        로컬 가격 저장소에 이력이 있는 티커는 누락된 최근 봉만 받아서 이어 붙임
+        겹치는 구간이 저장된 값과 다르면(분할/배당 재조정) 해당 티커만 전체 기간을 다시 받음
+        """
+        full_tickers, delta_tickers, delta_period = self._plan_history_fetch(tickers)
+        result = {}
+
+        def fetch_full(batch: List[str]) -> None:
+            fetched = self._download_history_batch(batch, self.history_period, self.min_history_rows)
+            for ticker, frame in fetched.items():
+                self._store_price_history(ticker, frame)
+                result[ticker] = frame
+
+        if full_tickers:
+            fetch_full(full_tickers)
+
+        if delta_tickers:
+            logger.info(f"Fetching {delta_period} tail for {len(delta_tickers)} tickers from price store")
+            fetched = self._download_history_batch(delta_tickers, delta_period, 1)
+            revised = [ticker for ticker, frame in fetched.items() if self._history_revised(ticker, frame)]
+            for ticker, frame in fetched.items():
+                if ticker in revised:
+                    continue
+                merged = self._merge_price_history(ticker, frame)
+                if len(merged) < self.min_history_rows:
+                    logger.warning(f"No data available for {ticker}")
+                    continue
+                self._store_price_history(ticker, merged)
+                result[ticker] = merged
+
+            if revised:
+                logger.info(f"Adjusted history revised for {len(revised)} tickers; re-downloading full window")
+                self.metrics.increment('history_revisions', len(revised))
+                fetch_full(revised)
+
+        self.metrics.increment('history_bytes', sum(int(frame.memory_usage().sum()) for frame in result.values()))
+        return result
+
+    def _download_batch_timed(self, tickers: List[str]) -> Tuple[Dict[str, pd.DataFrame], float, bool]:
+        """
+        Run download_data_safe in a worker and return (data, seconds spent, rate limited).
+        A worker downloads one batch at a time, so the thread-local flag charges a rate limit
+        only to the batch that hit it, not to every batch in flight.
+        """
+        started = time.perf_counter()
+        self._batch_local.rate_limited = False
+        # cProfile only sees the thread that enabled it, so each worker batch gets its own profiler
+        profiler = cProfile.Profile() if self.profile_workers else None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            data = self.download_data_safe(tickers)
+            return data, time.perf_counter() - started, self._batch_local.rate_limited
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                with self._state_lock:
+                    self.worker_profiles.append(profiler)
+            self.metrics.add_time('download_batches', time.perf_counter() - started)
+
+    def _download_history_batch(self, tickers: List[str], period: str, min_rows: int) -> Dict[str, pd.DataFrame]:
+        """Download one yfinance batch for a period and split it into per-ticker frames."""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=200)
         
-        if not krx_tickers and not us_tickers:
-            logger.error("No tickers to process")
-            return self._create_empty_results()
-        
-        all_tickers = krx_tickers + us_tickers
-        
-        batch_size = self.batch_size
-        filtered_stocks = []
-        errors = []
-        krx_processed = 0
-        us_processed = 0
-        
-        logger.info(f"Processing {len(all_tickers)} tickers in batches of {batch_size}")
-        
-        for i in range(0, len(all_tickers), batch_size):
-            batch_tickers = all_tickers[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1}: {len(batch_tickers)} tickers")
+        # 수정: interval을 '1d'로 명시하여 일별 데이터만 가져오기
+        try:
+            if len(tickers) == 1:
+                # 단일 티커의 경우
+                frame = self._download_single_ticker_data(tickers[0], start_date, end_date, max_attempts=1, period=period)
+                return {tickers[0]: frame} if frame is not None and len(frame) >= min_rows else {}
+            else:
+                # 다중 티커의 경우
+                self._acquire_request_slot()
+                self.metrics.increment('http_requests')
+                all_data = self.data_provider.download_history(tickers, period)
+                frames = self._split_history_batch(all_data, tickers)
+                
+                result = {}
+                for ticker in tickers:
+                    single_data = frames.get(ticker)
+
+                    # 누락/불량 종목은 run_screening의 재시도 큐에서 묶어서 재요청
+                    if single_data is None or len(single_data) < min_rows:
+                        logger.warning(f"No data available for {ticker}")
+                        continue
+
+                    result[ticker] = single_data
+                
+                return result
+        except Exception as e:
+            if self._is_rate_limit_error(e):
+                self._apply_rate_limit_cooldown()
+            logger.error(f"Error downloading data for batch: {str(e)}")
+            return {}
+    
+    def _iter_download_batches(self, tickers: List[str]):
+        """
+        Yield (batch_no, batch_tickers, active_batch_tickers) lazily, skipping cached no-data tickers.
+        batch_size is re-read for every batch so adaptive tuning takes effect mid-run.
+        """
+        i = 0
+        batch_no = 0
+        while i < len(tickers):
+            if self._budget_exhausted():
+                logger.warning(f"Time budget exhausted; deferring {len(tickers) - i} unscreened tickers")
+                self._deferred_tickers.extend(tickers[i:])
+                return
+            batch_size = max(int(self.batch_size), 1)
+            batch_tickers = tickers[i:i + batch_size]
+            i += len(batch_tickers)
+            batch_no += 1
+            logger.info(f"Processing batch {batch_no}: {len(batch_tickers)} tickers")
             active_batch_tickers = []
 
             for ticker in batch_tickers:
@@ -784,91 +3017,625 @@ class TurtleTradingScreener:
                     logger.warning(f"Skipping cached no-data ticker: {ticker}")
                 else:
                     active_batch_tickers.append(ticker)
-            
-            # 배치 데이터 다운로드
-            batch_data = self.download_data_safe(active_batch_tickers)
-            batch_missing_tickers = [ticker for ticker in active_batch_tickers if ticker not in batch_data]
-            
-            for ticker in batch_tickers:
-                try:
-                    if ticker not in active_batch_tickers:
-                        continue
-                    if ticker not in batch_data:
-                        errors.append(ticker)
-                        self._record_no_data_ticker(ticker, "download_missing")
-                        continue
-                    
-                    single_ticker_data = batch_data[ticker]
-                    
-                    # 데이터가 부족한 경우 건너뛰기
-                    if single_ticker_data.empty or len(single_ticker_data) < 60:
-                        self._record_no_data_ticker(ticker, "insufficient_history")
-                        continue
-                    
-                    # 터틀 신호 계산
-                    analysis = self.calculate_turtle_signals(single_ticker_data, ticker)
-                    
-                    if analysis is None:
-                        self._record_no_data_ticker(ticker, "invalid_latest_row")
-                        continue
 
-                    self._clear_no_data_ticker(ticker)
+            yield batch_no, batch_tickers, active_batch_tickers
 
-                    if not self.passes_filters(analysis):
+    def _process_batch(
+        self,
+        batch_tickers: List[str],
+        active_batch_tickers: List[str],
+        batch_data: Dict[str, pd.DataFrame],
+        filtered_stocks: List[Dict[str, Any]],
+        errors: List[str],
+        retry_queue: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Compute signals for one downloaded batch and append passing stocks/errors.
+        Missing tickers go to retry_queue when given, otherwise they are recorded as errors.
+        """
+        with self.metrics.timer('signals'):
+            batch_analyses, batch_passes = self._calculate_signals_incremental(
+                {
+                    ticker: frame
+                    for ticker, frame in batch_data.items()
+                    if not frame.empty and len(frame) >= self.min_history_rows
+                }
+            )
+        
+        for ticker in batch_tickers:
+            try:
+                if ticker not in active_batch_tickers:
+                    continue
+                if ticker not in batch_data:
+                    if retry_queue is not None:
+                        retry_queue.append(ticker)
                         continue
+                    errors.append(ticker)
+                    self._record_no_data_ticker(ticker, "download_missing")
+                    continue
+                
+                single_ticker_data = batch_data[ticker]
+                
+                # 데이터가 부족한 경우 건너뛰기
+                if single_ticker_data.empty or len(single_ticker_data) < self.min_history_rows:
+                    self._record_no_data_ticker(ticker, "insufficient_history")
+                    continue
+                
+                # 터틀 신호 계산 결과
+                analysis = batch_analyses[ticker]
+                
+                if analysis is None:
+                    self._record_no_data_ticker(ticker, "invalid_latest_row")
+                    continue
+
+                self._clear_no_data_ticker(ticker)
+                self._record_liquidity(ticker, analysis, single_ticker_data.index[-1])
+                self._record_session_date(ticker, single_ticker_data.index[-1])
+
+                if not batch_passes.get(ticker, False):
+                    continue
+                
+                # 회사명 가져오기
+                stock_name = self.krx_ticker_map.get(ticker, ticker)
+                
+                # 최종 결과 포맷팅
+                result = {
+                    'ticker': ticker,
+                    'name': stock_name,
+                    'market': 'KRX' if ticker.endswith(('.KS', '.KQ')) else 'US',
+                    'current_price': round(analysis['current_price'], 2),
+                    'volume_20_avg': analysis['volume_20_avg'],
+                    'signals': analysis['signals'],
+                    'breakout_levels': analysis['breakout_levels']
+                }
+                
+                filtered_stocks.append(result)
                     
-                    # 회사명 가져오기
-                    stock_name = self.krx_ticker_map.get(ticker, ticker)
-                    
-                    # 최종 결과 포맷팅
-                    result = {
-                        'ticker': ticker,
-                        'name': stock_name,
-                        'market': 'KRX' if ticker.endswith(('.KS', '.KQ')) else 'US',
-                        'current_price': round(analysis['current_price'], 2),
-                        'volume_20_avg': analysis['volume_20_avg'],
-                        'signals': analysis['signals'],
-                        'breakout_levels': analysis['breakout_levels']
-                    }
-                    
-                    filtered_stocks.append(result)
-                    if result['market'] == 'KRX':
-                        krx_processed += 1
-                    else:
-                        us_processed += 1
-                        
+            except Exception as e:
+                logger.error(f"Error processing {ticker}: {str(e)}")
+                errors.append(ticker)
+                self._record_no_data_ticker(ticker, "processing_error")
+
+    def _download_and_process_batches(
+        self,
+        batches,
+        filtered_stocks: List[Dict[str, Any]],
+        errors: List[str],
+        retry_queue: Optional[List[str]],
+        retry_round: int = 0,
+    ) -> int:
+        """
+        Download batches concurrently and process them in submission order.
+        The download window is refilled before a batch's signals are computed, so up to
+        max_inflight_batches downloads overlap the compute (even at 1) and at most one more
+        downloaded batch is held in memory. Returns the number of tickers without usable data.
+        """
+        missing_total = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_inflight_batches, thread_name_prefix='yf-batch') as executor:
+            pending = deque()
+
+            def submit_next_batch() -> bool:
+                batch = next(batches, None)
+                if batch is None:
+                    return False
+                batch_no, batch_tickers, active_batch_tickers = batch
+                future = executor.submit(self._download_batch_timed, active_batch_tickers)
+                pending.append((batch_no, batch_tickers, active_batch_tickers, future))
+                return True
+
+            while len(pending) < self.max_inflight_batches and submit_next_batch():
+                pass
+
+            # 결과는 제출 순서대로 처리 (결정적 출력)
+            while pending:
+                batch_no, batch_tickers, active_batch_tickers, future = pending.popleft()
+                batch_seconds = 0.0
+                rate_limited = False
+                try:
+                    with self.metrics.timer('download_wait'):
+                        batch_data, batch_seconds, rate_limited = future.result()
                 except Exception as e:
-                    logger.error(f"Error processing {ticker}: {str(e)}")
-                    errors.append(ticker)
-                    self._record_no_data_ticker(ticker, "processing_error")
-            
-            # 배치 간 잠시 대기 (API 제한 방지)
-            if i + batch_size < len(all_tickers):
-                pause_seconds = self.batch_failure_cooldown_seconds if batch_missing_tickers else self.batch_pause_seconds
-                if batch_missing_tickers:
+                    logger.error(f"Error downloading data for batch {batch_no}: {str(e)}")
+                    batch_data = {}
+
+                batch_missing_tickers = [ticker for ticker in active_batch_tickers if ticker not in batch_data]
+                missing_total += len(batch_missing_tickers)
+                self.metrics.record_batch(
+                    batch_no, len(active_batch_tickers), batch_seconds, len(batch_missing_tickers), retry_round
+                )
+                if retry_round == 0:
+                    # Retry batches are mostly known-missing tickers and would only drag the tuning down
+                    self._record_batch_feedback(len(batch_missing_tickers), len(active_batch_tickers), rate_limited)
+                # A few delisted names per batch go to the retry queue without stalling every worker
+                batch_failed = len(batch_missing_tickers) > len(active_batch_tickers) * self.missing_failure_ratio
+                if rate_limited or batch_failed:
+                    # 배치 실패 시 전역 쿨다운 (API 제한 방지)
                     logger.warning(
-                        f"Cooling down {pause_seconds}s after batch {i//batch_size + 1} "
-                        f"because {len(batch_missing_tickers)} tickers returned no usable data"
+                        f"Cooling down {self.batch_failure_cooldown_seconds}s after batch {batch_no}: "
+                        f"rate limited={rate_limited}, {len(batch_missing_tickers)}/{len(active_batch_tickers)} "
+                        f"tickers returned no usable data"
                     )
-                time.sleep(pause_seconds)
+                    self._apply_rate_limit_cooldown(self.batch_failure_cooldown_seconds)
+
+                # Feedback and cooldown are applied first, so they still gate the next download
+                while len(pending) < self.max_inflight_batches and submit_next_batch():
+                    pass
+
+                self._process_batch(
+                    batch_tickers, active_batch_tickers, batch_data, filtered_stocks, errors, retry_queue
+                )
+                if retry_round == 0:
+                    self._checkpoint_batch(batch_tickers, filtered_stocks, errors, retry_queue)
+
+        return missing_total
+
+    def _iter_retry_batches(self, tickers: List[str], attempt: int):
+        """Re-batch queued failures together (no cache skipping: they were already active)."""
+        batch_size = max(int(self.batch_size), 1)
+        for batch_no, i in enumerate(range(0, len(tickers), batch_size), start=1):
+            batch_tickers = tickers[i:i + batch_size]
+            logger.info(f"Retry round {attempt}, batch {batch_no}: {len(batch_tickers)} tickers")
+            yield batch_no, batch_tickers, batch_tickers
+
+    def _drain_retry_queue(
+        self,
+        retry_queue: List[str],
+        filtered_stocks: List[Dict[str, Any]],
+        errors: List[str],
+    ) -> Dict[str, int]:
+        """
+        Retry tickers that failed in the main pass, re-batched together, with exponential backoff.
+        Tickers still missing after the last attempt are recorded as download errors.
+        """
+        # A resumed checkpoint queue plus fresh misses may list a ticker twice
+        queue = list(dict.fromkeys(retry_queue))
+        queued = len(queue)
+        unrecovered = 0
+        rounds = 0
+
+        for attempt in range(1, self.retry_max_attempts + 1):
+            if not queue:
+                break
+
+            backoff = self.retry_backoff_seconds * (2 ** (attempt - 1))
+            if self._budget_exhausted(backoff):
+                logger.warning(f"Time budget exhausted; deferring {len(queue)} queued retries")
+                self._deferred_tickers.extend(queue)
+                unrecovered = len(queue)
+                break
+            rounds = attempt
+            logger.info(f"Retrying {len(queue)} tickers (round {attempt}/{self.retry_max_attempts}) after {backoff}s backoff")
+            with self.metrics.timer('retry_backoff_sleep'):
+                time.sleep(backoff)
+
+            next_queue: Optional[List[str]] = [] if attempt < self.retry_max_attempts else None
+            self.metrics.increment('retried_tickers', len(queue))
+            with self.metrics.timer('retry_pass'):
+                unrecovered = self._download_and_process_batches(
+                    self._iter_retry_batches(queue, attempt), filtered_stocks, errors, next_queue, attempt
+                )
+            queue = next_queue or []
+
+        if queued:
+            logger.info(f"Retry queue drained: {queued - unrecovered}/{queued} tickers recovered in {rounds} rounds")
+        return {'queued': queued, 'recovered': queued - unrecovered, 'rounds': rounds}
+
+    def _budget_exhausted(self, upcoming_seconds: float = 0.0) -> bool:
+        """
+        True when more work would overrun the time budget: `upcoming_seconds`, one more batch
+        at the mean batch time so far and the reserve must all fit before the deadline.
+        """
+        if self._deadline is None:
+            return False
+        needed = upcoming_seconds + self.metrics.mean_batch_seconds() + self.time_budget_reserve_seconds
+        return time.monotonic() + needed >= self._deadline
+
+    def _prioritize_tickers(self, tickers: List[str]) -> List[str]:
+        """
+        Order tickers by how likely they are to produce or change a signal (stable within ties):
+        1. tickers carrying a signal in the last published results,
+        2. tickers passing the price/volume filters, by the distance of their last close to the
+           next bar's 20/55-day highs or 20-day low (from the streaming signal state),
+        3. tickers without a signal state,
+        4. tickers already failing the price/volume filters, by the same distance.
+        """
+        states = self._load_signal_states()
+        published = self._load_published_results() or {}
+        open_signals = {stock.get('ticker') for stock in published.get('filtered_stocks', [])}
+
+        def priority(ticker: str) -> Tuple[int, float]:
+            if ticker in open_signals:
+                return 0, 0.0
+            state = states.get(ticker)
+            close = state.last_bar[3] if state is not None and state.last_bar else float('nan')
+            if not close > 0:
+                return 2, 0.0
+
+            is_krx = ticker.endswith(('.KS', '.KQ'))
+            min_price = self.min_price_krw if is_krx else self.min_price_usd
+            min_volume = self.krx_min_volume if is_krx else self.us_min_volume
+            fails_filters = close < min_price or state.volume_avg < min_volume
+
+            # The windows already hold the last bar, so their values are the next bar's levels
+            distances = [
+                state.windows['high_20'].value() / close - 1,
+                state.windows['high_55'].value() / close - 1,
+                1 - state.windows['low_20'].value() / close,
+            ]
+            distances = [distance for distance in distances if not np.isnan(distance)]
+            return (3 if fails_filters else 1), (max(min(distances), 0.0) if distances else float('inf'))
+
+        return sorted(tickers, key=priority)
+
+    def _restore_checkpoint(
+        self,
+        market: str,
+        universe: str,
+        filtered_stocks: List[Dict[str, Any]],
+        errors: List[str],
+        retry_queue: Optional[List[str]],
+    ) -> set:
+        """
+        Load a checkpoint written by an interrupted run of the same market scope and universe
+        into the run's lists and caches. Returns the tickers whose main-pass batch completed.
+        """
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return set()
+
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read checkpoint {self.checkpoint_file}: {e}")
+            return set()
+
+        if not isinstance(payload, dict) or payload.get('market') != market or payload.get('universe') != universe:
+            logger.info("Checkpoint belongs to a different market scope or universe; starting from scratch")
+            return set()
+        if payload.get('sessions') != self._checkpoint_sessions(market):
+            # A newer session closed since (its bars moved on), however old the checkpoint is
+            logger.info(f"Checkpoint was written for session(s) {payload.get('sessions')}; starting from scratch")
+            return set()
+
+        filtered_stocks.extend(payload.get('filtered_stocks', []))
+        errors.extend(payload.get('errors', []))
+        if retry_queue is not None:
+            retry_queue.extend(payload.get('retry_queue', []))
+        self._no_data_cache = payload.get('no_data_cache', self._no_data_cache)
+        if self.liquidity_index_file:
+            self._load_liquidity_index().update(payload.get('liquidity', {}))
+        self._cache_skipped_tickers += int(payload.get('cached_skip_count', 0))
+
+        processed = set(payload.get('processed', []))
+        logger.info(
+            f"Resuming from checkpoint of {payload.get('updated_at')}: {len(processed)} tickers done, "
+            f"{len(filtered_stocks)} signals so far"
+        )
+        return processed
+
+    def _checkpoint_sessions(self, market: str) -> Dict[str, str]:
+        """Last closed trading session of each market in scope; a checkpoint is resumable while these match."""
+        return {
+            name: self.market_calendars[name].last_closed_session().isoformat()
+            for name in MARKET_SESSIONS
+            if market in ('all', name.lower())
+        }
+
+    def _write_checkpoint(
+        self,
+        filtered_stocks: List[Dict[str, Any]],
+        errors: List[str],
+        retry_queue: Optional[List[str]],
+    ) -> None:
+        """Atomically write the completed main-pass work (never fails the run)."""
+        checkpoint = self._checkpoint
+        if not self.checkpoint_file or checkpoint is None:
+            return
+
+        liquidity = self._liquidity_index or {}
+        payload = {
+            'market': checkpoint['market'],
+            'universe': checkpoint['universe'],
+            'sessions': checkpoint['sessions'],
+            'updated_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'processed': checkpoint['processed'],
+            'filtered_stocks': filtered_stocks,
+            'errors': errors,
+            'retry_queue': retry_queue or [],
+            'cached_skip_count': self._cache_skipped_tickers - checkpoint['cached_skip_base'],
+            'no_data_cache': self._no_data_cache,
+            'liquidity': {ticker: liquidity[ticker] for ticker in checkpoint['processed'] if ticker in liquidity},
+        }
+        try:
+            with self.metrics.timer('checkpoint'):
+                os.makedirs(os.path.dirname(self.checkpoint_file) or '.', exist_ok=True)
+                temp_path = f"{self.checkpoint_file}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, ensure_ascii=False)
+                os.replace(temp_path, self.checkpoint_file)
+            checkpoint['unsaved_batches'] = 0
+        except Exception as e:
+            logger.warning(f"Could not write checkpoint {self.checkpoint_file}: {e}")
+
+    def _checkpoint_batch(
+        self,
+        batch_tickers: List[str],
+        filtered_stocks: List[Dict[str, Any]],
+        errors: List[str],
+        retry_queue: Optional[List[str]],
+    ) -> None:
+        """Mark a processed main-pass batch done, writing the checkpoint every checkpoint_every_batches."""
+        checkpoint = self._checkpoint
+        if checkpoint is None:
+            return
+
+        checkpoint['processed'].extend(batch_tickers)
+        checkpoint['unsaved_batches'] += 1
+        if checkpoint['unsaved_batches'] >= max(int(self.checkpoint_every_batches), 1):
+            self._write_checkpoint(filtered_stocks, errors, retry_queue)
+
+    def _clear_checkpoint(self) -> None:
+        """Remove the checkpoint once the run's results are saved."""
+        self._checkpoint = None
+        if self.checkpoint_file and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+    def _probe_session_dates(self, markets: List[str]) -> Dict[str, str]:
+        """Latest daily bar date among each market's bellwether tickers, in one small download."""
+        tickers = [ticker for market in markets for ticker in self.session_bellwethers.get(market, [])]
+        frames = self._download_history_batch(tickers, '5d', min_rows=1) if tickers else {}
+        latest: Dict[str, str] = {}
+        for ticker, frame in frames.items():
+            market = 'KRX' if ticker.endswith(('.KS', '.KQ')) else 'US'
+            day = pd.Timestamp(frame.index[-1]).strftime('%Y-%m-%d')
+            if day > latest.get(market, ''):
+                latest[market] = day
+        return latest
+
+    def check_new_session(
+        self,
+        market: str = 'all',
+        wait_seconds: float = 0.0,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, str]:
+        """
+        Classify each market in scope against the session_date of the last published results:
+        'closed' when no session has closed since (weekend, holiday, already screened) - decided
+        from the calendar without any request; 'fresh' when a bellwether ticker has a newer
+        daily bar; 'pending' when a session closed but its bar is not published yet. Pending
+        markets are re-probed every session_poll_seconds until wait_seconds runs out. Markets
+        whose bellwethers return no data at all count as fresh so an outage never blocks a run.
+        """
+        if market not in MARKET_SCOPES:
+            raise ValueError(f"Unknown market scope {market!r}; expected one of {', '.join(MARKET_SCOPES)}")
+        deadline = time.monotonic() + wait_seconds
+        published = ((self._load_published_results() or {}).get('metadata') or {}).get('markets') or {}
+        last_sessions = {
+            name: (published.get(name) or {}).get('session_date')
+            for name in MARKET_SESSIONS
+            if market in ('all', name.lower())
+        }
+
+        statuses: Dict[str, str] = {}
+        pending = []
+        for name, last_session in last_sessions.items():
+            expected = self.market_calendars[name].last_closed_session(now).isoformat()
+            if last_session and expected <= last_session:
+                statuses[name] = 'closed'
+            else:
+                pending.append(name)
+
+        self._reset_request_limiter()
+        while pending:
+            latest = self._probe_session_dates(pending)
+            for name in list(pending):
+                if name not in latest:
+                    logger.warning(f"Session probe returned no {name} data; assuming a new session")
+                if name not in latest or not last_sessions[name] or latest[name] > last_sessions[name]:
+                    statuses[name] = 'fresh'
+                    pending.remove(name)
+            if not pending or time.monotonic() + self.session_poll_seconds > deadline:
+                break
+            logger.info(f"No new bar yet for {', '.join(pending)}; re-probing in {self.session_poll_seconds}s")
+            time.sleep(self.session_poll_seconds)
+
+        statuses.update({name: 'pending' for name in pending})
+        for name, status in statuses.items():
+            logger.info(f"{name} session check: {status} (published session {last_sessions[name]})")
+        return statuses
+
+    def run_screening(
+        self,
+        market: str = 'all',
+        resume: bool = False,
+        time_budget_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the complete Turtle Trading screening process with improved data handling.
+        market='krx'/'us' screens only that market and merges it with the other market's part
+        of the last published results (see _merge_market_snapshot).
+        Completed main-pass batches are checkpointed; resume=True skips the work recorded by
+        an interrupted run of the same market scope and universe.
+        With time_budget_seconds, tickers are screened in signal-likelihood order and the run
+        stops starting batches when the budget runs out, publishing a result marked incomplete.
+        """
+        if market not in MARKET_SCOPES:
+            raise ValueError(f"Unknown market scope {market!r}; expected one of {', '.join(MARKET_SCOPES)}")
+        start_time = time.time()
+        self.metrics = RunMetrics()
+        self._time_budget_seconds = time_budget_seconds
+        self._deadline = time.monotonic() + time_budget_seconds if time_budget_seconds else None
+        self._deferred_tickers = []
+        self._session_dates = {}
+        logger.info("Starting Turtle Trading screening process")
+        if self._sanitized_ca_bundle_envs:
+            logger.info(
+                "Sanitized invalid CA bundle environment variables: "
+                + ", ".join(self._sanitized_ca_bundle_envs)
+            )
+        
+        # Get ticker universes
+        with self.metrics.timer('universe'):
+            krx_tickers, us_tickers = self.get_ticker_universe(market)
+        
+        if not krx_tickers and not us_tickers:
+            logger.error("No tickers to process")
+            results = self._create_empty_results()
+            return results if market == 'all' else self._merge_market_snapshot(results, market)
+        
+        universe = hashlib.sha256('\n'.join(krx_tickers + us_tickers).encode('utf-8')).hexdigest()[:16]
+        all_tickers = self._select_liquid_tickers(krx_tickers + us_tickers)
+        if self._deadline is not None:
+            all_tickers = self._prioritize_tickers(all_tickers)
+        
+        filtered_stocks = []
+        errors = []
+        retry_queue: Optional[List[str]] = [] if self.retry_max_attempts > 0 else None
+        cached_skip_base = self._cache_skipped_tickers
+        if resume:
+            processed = self._restore_checkpoint(market, universe, filtered_stocks, errors, retry_queue)
+            all_tickers = [ticker for ticker in all_tickers if ticker not in processed]
+        else:
+            processed = set()
+        if self.checkpoint_file:
+            self._checkpoint = {
+                'market': market,
+                'universe': universe,
+                'sessions': self._checkpoint_sessions(market),
+                'processed': list(processed),
+                'unsaved_batches': 0,
+                'cached_skip_base': cached_skip_base,
+            }
+        
+        logger.info(
+            f"Processing {len(all_tickers)} tickers in batches of {self.batch_size} "
+            f"({self.max_inflight_batches} in flight)"
+        )
+        with self.metrics.timer('price_store_load'):
+            self._load_price_store()
+        if self.adaptive_batching:
+            self._get_batch_controller()
+        self._reset_request_limiter()
+
+        with self.metrics.timer('main_pass'):
+            self._download_and_process_batches(
+                self._iter_download_batches(all_tickers), filtered_stocks, errors, retry_queue
+            )
+        # The retry pass is short; an interruption there resumes with the checkpointed queue
+        self._write_checkpoint(filtered_stocks, errors, retry_queue)
+        retry_stats = self._drain_retry_queue(retry_queue or [], filtered_stocks, errors)
+
+        results = self._assemble_results(krx_tickers, us_tickers, filtered_stocks, errors, retry_stats, start_time)
+        return results if market == 'all' else self._merge_market_snapshot(results, market)
+
+    def _signal_breakdown(self, stocks: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Count stocks carrying Signal 1 (entry or exit) and Signal 2 entries."""
+        return {
+            'signal1_count': sum(
+                1 for stock in stocks if stock['signals']['signal1']['entry'] or stock['signals']['signal1']['exit']
+            ),
+            'signal2_count': sum(1 for stock in stocks if stock['signals']['signal2']['entry']),
+        }
+
+    def _load_published_results(self) -> Optional[Dict[str, Any]]:
+        """Read the last published results file, or None when it is missing or unreadable."""
+        if not os.path.exists(self.output_file):
+            return None
+        try:
+            with open(self.output_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read published results {self.output_file}: {e}")
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    def _merge_market_snapshot(self, results: Dict[str, Any], market: str) -> Dict[str, Any]:
+        """
+        Combine a single-market run with the other market's stocks and metadata from the last
+        published results. Totals and the signal breakdown cover the merged list, while
+        metadata.markets keeps each market's own last_updated; run-level fields (timings,
+        errors, success rate) describe this run only.
+        """
+        scope = market.upper()
+        other = 'US' if scope == 'KRX' else 'KRX'
+        metadata = results['metadata']
+        metadata['market_scope'] = market
+
+        previous = self._load_published_results()
+        if previous is None:
+            logger.warning(f"No published results to merge with; publishing {scope} only")
+            metadata['markets'].pop(other, None)
+            return results
+
+        previous_metadata = previous.get('metadata', {})
+        carried = [stock for stock in previous.get('filtered_stocks', []) if stock.get('market') == other]
+        # Snapshots written before per-market metadata only have the flat krx_/us_ counters
+        other_summary = previous_metadata.get('markets', {}).get(other) or {
+            'last_updated': previous_metadata.get('last_updated'),
+            'analyzed': previous_metadata.get(f"{other.lower()}_analyzed", 0),
+            'with_signals': len(carried),
+        }
+
+        stocks = [stock for stock in results['filtered_stocks'] if stock['market'] == scope] + carried
+        metadata['markets'][other] = other_summary
+        metadata[f"{other.lower()}_analyzed"] = other_summary.get('analyzed', 0)
+        metadata[f"{other.lower()}_with_signals"] = len(carried)
+        metadata['total_analyzed'] = metadata['krx_analyzed'] + metadata['us_analyzed']
+        metadata['total_signals_found'] = len(stocks)
+        results['signal_breakdown'] = self._signal_breakdown(stocks)
+        results['filtered_stocks'] = sorted(stocks, key=lambda x: x['current_price'], reverse=True)
+
+        logger.info(
+            f"Merged {scope} run with {len(carried)} {other} stocks published {other_summary.get('last_updated')}"
+        )
+        return results
+
+    def _assemble_results(
+        self,
+        krx_tickers: List[str],
+        us_tickers: List[str],
+        filtered_stocks: List[Dict[str, Any]],
+        errors: List[str],
+        retry_stats: Dict[str, int],
+        start_time: float,
+    ) -> Dict[str, Any]:
+        """Build the published results payload (metadata, signal breakdown, sorted stocks)."""
+        all_tickers = krx_tickers + us_tickers
+        krx_processed = sum(1 for stock in filtered_stocks if stock['market'] == 'KRX')
+        us_processed = len(filtered_stocks) - krx_processed
         
         # Calculate processing time
         processing_time = time.time() - start_time
         
         # Separate signals by type for better organization
-        signal1_stocks = []
-        signal2_stocks = []
-        
-        for stock in filtered_stocks:
-            if stock['signals']['signal1']['entry'] or stock['signals']['signal1']['exit']:
-                signal1_stocks.append(stock)
-            if stock['signals']['signal2']['entry']:
-                signal2_stocks.append(stock)
+        breakdown = self._signal_breakdown(filtered_stocks)
+        last_updated = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        krx_errors = sum(1 for ticker in errors if ticker.endswith(('.KS', '.KQ')))
+        # A partial (time-budgeted) run leaves session_date unset so the next run is not skipped
+        session_dates = self._session_dates if not self._deferred_tickers else {}
         
         # Create results
         results = {
             'metadata': {
-                'last_updated': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                'last_updated': last_updated,
+                'market_scope': 'all',
+                'markets': {
+                    'KRX': {
+                        'last_updated': last_updated,
+                        'analyzed': len(krx_tickers),
+                        'with_signals': krx_processed,
+                        'errors_count': krx_errors,
+                        'session_date': session_dates.get('KRX'),
+                    },
+                    'US': {
+                        'last_updated': last_updated,
+                        'analyzed': len(us_tickers),
+                        'with_signals': us_processed,
+                        'errors_count': len(errors) - krx_errors,
+                        'session_date': session_dates.get('US'),
+                    },
+                },
                 'total_analyzed': len(all_tickers),
                 'total_signals_found': len(filtered_stocks),
                 'krx_analyzed': len(krx_tickers),
@@ -878,27 +3645,40 @@ class TurtleTradingScreener:
                 'processing_time_seconds': round(processing_time, 2),
                 'errors_count': len(errors),
                 'cached_skip_count': self._cache_skipped_tickers,
+                'liquidity_skip_count': self._liquidity_skipped_tickers,
+                'liquidity_revalidated_count': self._liquidity_revalidated_tickers,
+                'complete': not self._deferred_tickers,
+                'time_budget': {
+                    'seconds': self._time_budget_seconds,
+                    'deferred_count': len(self._deferred_tickers),
+                    'deferred_sample': self._deferred_tickers[:20],
+                } if self._time_budget_seconds else None,
+                'retried_tickers': retry_stats['queued'],
+                'retry_recovered': retry_stats['recovered'],
                 'no_data_cache_size': len(self._no_data_cache),
+                'download_tuning': self._batch_controller.to_dict() if self._batch_controller else None,
+                'metrics': self.metrics.summary(),
+                'universe_sources': self._universe_sources,
                 'success_rate': round((len(all_tickers) - len(errors)) / len(all_tickers) * 100, 1) if all_tickers else 0
             },
-            'signal_breakdown': {
-                'signal1_count': len(signal1_stocks),
-                'signal2_count': len(signal2_stocks)
-            },
+            'signal_breakdown': breakdown,
             'no_data_cache': self._build_no_data_cache_summary(),
             'filtered_stocks': sorted(filtered_stocks, key=lambda x: x['current_price'], reverse=True)
         }
         
         logger.info(f"Screening complete: {len(filtered_stocks)} stocks with Turtle signals")
         logger.info(f"KRX signals: {krx_processed}, US signals: {us_processed}")
-        logger.info(f"Signal 1 (20-day): {len(signal1_stocks)}, Signal 2 (55-day): {len(signal2_stocks)}")
+        logger.info(f"Signal 1 (20-day): {breakdown['signal1_count']}, Signal 2 (55-day): {breakdown['signal2_count']}")
         return results
-    
+
     def _create_empty_results(self) -> Dict[str, Any]:
         """Create empty results structure"""
         return {
             'metadata': {
                 'last_updated': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                'market_scope': 'all',
+                'markets': {},
+                'complete': True,
                 'total_analyzed': 0,
                 'total_signals_found': 0,
                 'krx_analyzed': 0,
@@ -909,6 +3689,7 @@ class TurtleTradingScreener:
                 'errors_count': 0,
                 'cached_skip_count': self._cache_skipped_tickers,
                 'no_data_cache_size': len(self._no_data_cache),
+                'metrics': self.metrics.summary(),
                 'success_rate': 0
             },
             'signal_breakdown': {
@@ -919,6 +3700,135 @@ class TurtleTradingScreener:
             'filtered_stocks': []
         }
     
+    def _save_metrics(self) -> None:
+        """Write the full run metrics (including serialization time and per-batch records)."""
+        timings = ', '.join(f"{stage}={seconds:.1f}s" for stage, seconds in sorted(self.metrics.timings.items()))
+        logger.info(f"Run timings: {timings}")
+        memory = self.metrics.summary()['memory_mb']
+        logger.info(f"Price history held: {memory['price_history']} MB, peak RSS: {memory['peak_rss']} MB")
+        if not self.metrics_file:
+            return
+
+        os.makedirs(os.path.dirname(self.metrics_file) or '.', exist_ok=True)
+        payload = {
+            'updated_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            **self.metrics.to_dict(),
+        }
+        with open(self.metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2)
+
+    def _shard_key(self, stock: Dict[str, Any]) -> str:
+        """Disjoint shard name: market plus the signals the stock carries, e.g. 'krx-signal1-signal2'."""
+        signals = stock['signals']
+        parts = [stock['market'].lower()]
+        if signals['signal1']['entry'] or signals['signal1']['exit']:
+            parts.append('signal1')
+        if signals['signal2']['entry']:
+            parts.append('signal2')
+        return '-'.join(parts)
+
+    def _write_precompressed(self, path: str, body: bytes) -> None:
+        """Write `body` plus .gz (and .br when brotli is installed) siblings for static hosting."""
+        with open(path, 'wb') as f:
+            f.write(body)
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(body, quality=11))
+
+    def _save_result_shards(self, results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Write compact per-market/per-signal shards under content-hashed names plus index.json
+        (everything but filtered_stocks, and one entry per shard) so clients fetch only the
+        shards their filters need. The index is written last; unreferenced shards are removed.
+        Returns: index path/hash and shard files for the version manifest (None when disabled)
+        """
+        if not self.shard_output_dir:
+            return None
+
+        os.makedirs(self.shard_output_dir, exist_ok=True)
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for stock in results['filtered_stocks']:
+            groups.setdefault(self._shard_key(stock), []).append(stock)
+
+        shards = []
+        for key, stocks in sorted(groups.items()):
+            body = json.dumps(stocks, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            file_name = f"{key}.{hashlib.sha256(body).hexdigest()[:12]}.json"
+            path = os.path.join(self.shard_output_dir, file_name)
+            if not os.path.exists(path):
+                self._write_precompressed(path, body)
+            actions = []
+            if any(stock['signals']['signal1']['entry'] or stock['signals']['signal2']['entry'] for stock in stocks):
+                actions.append('entry')
+            if any(stock['signals']['signal1']['exit'] for stock in stocks):
+                actions.append('exit')
+            shards.append(
+                {
+                    'file': file_name,
+                    'market': stocks[0]['market'],
+                    'signals': key.split('-')[1:],
+                    'actions': actions,
+                    'count': len(stocks),
+                    'bytes': len(body),
+                }
+            )
+
+        index = {key: value for key, value in results.items() if key != 'filtered_stocks'}
+        index['shards'] = shards
+        index_path = os.path.join(self.shard_output_dir, 'index.json')
+        index_body = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._write_precompressed(index_path, index_body)
+
+        keep = {'index.json'} | {shard['file'] for shard in shards}
+        for name in os.listdir(self.shard_output_dir):
+            if re.sub(r'\.(gz|br)$', '', name) not in keep and name.endswith(('.json', '.json.gz', '.json.br')):
+                os.remove(os.path.join(self.shard_output_dir, name))
+        logger.info(f"Wrote {len(shards)} result shards to {self.shard_output_dir}")
+        return {
+            'path': index_path,
+            'hash': hashlib.sha256(index_body).hexdigest(),
+            'shards': {shard['file'].split('.')[0]: shard['file'] for shard in shards},
+        }
+
+    def _save_version_manifest(
+        self,
+        results: Dict[str, Any],
+        results_body: bytes,
+        shard_info: Optional[Dict[str, Any]],
+    ) -> None:
+        """
+        Publish a tiny manifest of content hashes so clients can poll it and refetch the
+        results only when a hash changes. Written after every file it references.
+        `version` covers only the published stocks (canonical JSON), so a run that found the
+        same stocks keeps it even though timestamps and metrics in the results file moved on.
+        """
+        if not self.version_file:
+            return
+
+        base_dir = os.path.dirname(self.version_file) or '.'
+        os.makedirs(base_dir, exist_ok=True)
+
+        def relative(path: str) -> str:
+            return os.path.relpath(path, base_dir).replace(os.sep, '/')
+
+        results_hash = hashlib.sha256(results_body).hexdigest()
+        stocks_body = json.dumps(
+            results['filtered_stocks'], ensure_ascii=False, sort_keys=True, separators=(',', ':')
+        ).encode('utf-8')
+        manifest = {
+            'version': hashlib.sha256(stocks_body).hexdigest()[:16],
+            'last_updated': results['metadata'].get('last_updated'),
+            'results': {'file': relative(self.output_file), 'hash': results_hash},
+        }
+        if shard_info:
+            manifest['index'] = {'file': relative(shard_info['path']), 'hash': shard_info['hash']}
+            manifest['shards'] = shard_info['shards']
+
+        with open(self.version_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
     def save_results(self, results: Dict[str, Any]) -> bool:
         """Save results to JSON file"""
         try:
@@ -926,10 +3836,22 @@ class TurtleTradingScreener:
             os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
             
             # Save results
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-
-            self._save_no_data_cache()
+            with self.metrics.timer('serialization'):
+                results_body = json.dumps(results, indent=2, ensure_ascii=False).encode('utf-8')
+                with open(self.output_file, 'wb') as f:
+                    f.write(results_body)
+                shard_info = self._save_result_shards(results)
+                self._save_version_manifest(results, results_body, shard_info)
+
+            with self.metrics.timer('state_save'):
+                self._save_no_data_cache()
+                self._save_price_store()
+                self._save_download_tuning()
+                self._save_universe_cache()
+                self._save_signal_states()
+                self._save_liquidity_index()
+            self._clear_checkpoint()
+            self._save_metrics()
             
             logger.info(f"Results saved to {self.output_file}")
             return True
@@ -940,13 +3862,144 @@ class TurtleTradingScreener:
 
 def main():
     """Main execution function"""
-    screener = TurtleTradingScreener()
-    
+    parser = argparse.ArgumentParser(description="Extended Turtle Trading screener")
+    parser.add_argument(
+        '--fixture-dir',
+        help="Replay recorded/synthetic data from a fixture directory instead of Yahoo/FinanceDataReader; "
+        "caches are disabled and results go to <fixture-dir>/replay",
+    )
+    parser.add_argument(
+        '--market',
+        choices=MARKET_SCOPES,
+        default='all',
+        help="Screen one market and merge it with the other market's last published results",
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Continue an interrupted run from its checkpoint (same market scope and universe)",
+    )
+    parser.add_argument(
+        '--time-budget',
+        type=float,
+        help="Wall-clock budget in minutes: screen the most signal-relevant tickers first and "
+        "publish a result marked incomplete when time runs out",
+    )
+    parser.add_argument(
+        '--check-session',
+        action='store_true',
+        help="Only probe whether the market scope has a new daily bar since the published results; "
+        "prints new_session=true|false (for workflow outputs) and exits",
+    )
+    parser.add_argument(
+        '--session-wait',
+        type=float,
+        default=0,
+        help="With --check-session: minutes to keep re-probing while a closed session's bar is unpublished",
+    )
+    parser.add_argument('--metrics-file', help="Write per-stage timings, counters and batch records to this JSON file")
+    parser.add_argument(
+        '--profile',
+        help="Profile the full run with cProfile (main thread plus every download worker, merged) "
+        "and dump stats to this file",
+    )
+    parser.add_argument('--backtest', action='store_true', help="Backtest both signals instead of screening")
+    parser.add_argument('--backtest-period', default='5y', help="History period to backtest (yfinance period)")
+    parser.add_argument(
+        '--backtest-output',
+        help="Backtest summary JSON file (default: backtest_results.json in the results directory)",
+    )
+    parser.add_argument('--backtest-trades', help="Also write every backtested trade to this CSV file")
+    parser.add_argument('--sweep', action='store_true', help="Backtest a grid of entry/exit periods instead of screening")
+    parser.add_argument(
+        '--sweep-entry-periods', type=int, nargs='+', default=[10, 20, 30, 40, 55], help="Breakout periods to sweep"
+    )
+    parser.add_argument(
+        '--sweep-exit-periods', type=int, nargs='+', default=[5, 10, 15, 20], help="Exit-low periods to sweep"
+    )
+    parser.add_argument(
+        '--sweep-output', help="Sweep grid JSON file (default: sweep_results.json in the results directory)"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1, help="Processes for the backtest/sweep engines (0 = one per CPU core)"
+    )
+    args = parser.parse_args()
+
+    if args.fixture_dir:
+        # Replays never read or write the live caches/state, and publish under <fixture-dir>/replay
+        results_dir = os.path.join(args.fixture_dir, 'replay')
+        screener = TurtleTradingScreener(
+            output_file=os.path.join(results_dir, 'screener_results.json'),
+            no_data_cache_file=None,
+            price_store_dir=None,
+            download_tuning_file=None,
+            data_provider=FixtureDataProvider(args.fixture_dir),
+            metrics_file=args.metrics_file,
+            universe_cache_file=None,
+            signal_state_file=None,
+            shard_output_dir=os.path.join(results_dir, 'shards'),
+            version_file=os.path.join(results_dir, 'version.json'),
+            liquidity_index_file=None,
+            checkpoint_file=None,
+        )
+    else:
+        results_dir = 'public/data'
+        screener = TurtleTradingScreener(metrics_file=args.metrics_file)
+    backtest_output = args.backtest_output or os.path.join(results_dir, 'backtest_results.json')
+    sweep_output = args.sweep_output or os.path.join(results_dir, 'sweep_results.json')
+    screener.process_workers = args.workers
+
+    if args.check_session:
+        statuses = screener.check_new_session(args.market, wait_seconds=args.session_wait * 60)
+        print(f"new_session={'true' if 'fresh' in statuses.values() else 'false'}")
+        return
+
+    if args.sweep:
+        sweep = screener.run_period_sweep(args.sweep_entry_periods, args.sweep_exit_periods, args.backtest_period)
+        if not screener.save_backtest_results(sweep, pd.DataFrame(), sweep_output):
+            exit(1)
+        for row in sweep['grid']:
+            print(
+                f"{row['market']} {row['entry_period']}/{row['exit_period']}: {row['trades']} trades, "
+                f"hit rate {row['hit_rate']}%, avg return {row['avg_return_pct']}%"
+            )
+        return
+
+    if args.backtest:
+        backtest, trades = screener.run_backtest(args.backtest_period)
+        if not screener.save_backtest_results(backtest, trades, backtest_output, args.backtest_trades):
+            exit(1)
+        for market, signals in backtest['markets'].items():
+            for signal_name, stats in signals.items():
+                print(
+                    f"{market} {signal_name}: {stats['trades']} trades, hit rate {stats['hit_rate']}%, "
+                    f"avg return {stats['avg_return_pct']}%, worst drawdown {stats['worst_max_drawdown_pct']}%"
+                )
+        return
+
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        screener.profile_workers = True
+        profiler.enable()
+
     # Run screening
-    results = screener.run_screening()
+    results = screener.run_screening(
+        args.market,
+        resume=args.resume,
+        time_budget_seconds=args.time_budget * 60 if args.time_budget else None,
+    )
     
     # Save results
     success = screener.save_results(results)
+
+    if profiler is not None:
+        profiler.disable()
+        # Worker times are summed per function across threads, so they can exceed wall-clock time
+        stats = pstats.Stats(profiler, *screener.worker_profiles)
+        stats.dump_stats(args.profile)
+        stats.sort_stats('cumulative').print_stats(25)
+        logger.info(f"cProfile stats written to {args.profile}")
     
     if success:
         logger.info("Turtle Trading screening completed successfully")
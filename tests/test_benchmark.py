@@ -0,0 +1,45 @@
+import unittest
+
+from run_benchmark import compare_with_baseline, run_universe_benchmark
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_run_universe_benchmark_reports_every_stage(self):
+        run = run_universe_benchmark(40, track_memory=True)
+
+        self.assertEqual(run["downloaded"], 40)
+        self.assertEqual(
+            list(run["stages"].keys()),
+            [
+                "universe",
+                "download_normalize",
+                "signals_per_ticker",
+                "signals_batch",
+                "signal_state_build",
+                "signal_state_update",
+                "passes_filters",
+                "result_assembly",
+                "save_results",
+            ],
+        )
+        self.assertTrue(all(stage["peak_mb"] is not None for stage in run["stages"].values()))
+
+    def test_compare_with_baseline_flags_slow_stages_only(self):
+        baseline = {
+            "track_memory": False,
+            "runs": [{"tickers": 1000, "stages": {"universe": {"seconds": 1.0}, "save_results": {"seconds": 1.0}}}],
+        }
+        report = {
+            "track_memory": False,
+            "runs": [{"tickers": 1000, "stages": {"universe": {"seconds": 1.1}, "save_results": {"seconds": 2.0}}}],
+        }
+
+        regressions = compare_with_baseline(report, baseline, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("save_results", regressions[0])
+        self.assertEqual(compare_with_baseline(report, {**baseline, "track_memory": True}, 0.25), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
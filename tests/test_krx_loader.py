@@ -1,14 +1,31 @@
 import csv
+import gzip
+import hashlib
 import json
+import os
+import pstats
 import tempfile
+import threading
+import time
 import unittest
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
 
-from run_screener import TurtleTradingScreener
+import run_screener
+from run_screener import (
+    AdaptiveBatchController,
+    DataProvider,
+    FixtureDataProvider,
+    MarketCalendar,
+    RangeExtremeTable,
+    TokenBucket,
+    TurtleSignalState,
+    TurtleTradingScreener,
+)
 
 
 class KRXLoaderTests(unittest.TestCase):
@@ -37,7 +54,7 @@ class KRXLoaderTests(unittest.TestCase):
                 ]
             )
 
-            screener = TurtleTradingScreener(krx_classification_file=str(csv_path))
+            screener = TurtleTradingScreener(krx_classification_file=str(csv_path), universe_cache_file=None)
             with patch("run_screener.fdr.StockListing", return_value=listing_df) as mock_stock_listing:
                 tickers = screener._load_krx_from_classification_csv()
 
@@ -47,6 +64,42 @@ class KRXLoaderTests(unittest.TestCase):
             self.assertEqual(screener.krx_ticker_map["0001A0.KQ"], "덕양에너젠")
             mock_stock_listing.assert_called_once_with("KRX")
 
+    def test_load_krx_from_classification_csv_resolves_suffixes_and_counters_column_wise(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = Path(temp_dir) / "stock_classification.csv"
+            with csv_path.open("w", encoding="utf-8-sig", newline="") as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(["종목코드", "종목명", "시장구분", "Ticker"])
+                writer.writerow(["5930", "삼성전자", "유가증권시장", ""])
+                writer.writerow(["091990", "", "", "091990.KQ"])
+                writer.writerow(["035720", "카카오", "", "035720.KS"])
+                writer.writerow(["--", "무효", "KOSPI", ""])
+                writer.writerow(["000250", "", "", ""])
+                writer.writerow(["999999", "미상", "KONEX", ""])
+                writer.writerow(["5930.0", "삼성전자우선", "KOSPI", ""])
+
+            listing_df = pd.DataFrame(
+                [
+                    {"Code": "000250", "Market": "KOSDAQ", "Name": "삼천당제약"},
+                    {"Code": "091990", "Market": "KOSDAQ", "Name": "셀트리온헬스케어"},
+                ]
+            )
+            screener = TurtleTradingScreener(krx_classification_file=str(csv_path), universe_cache_file=None)
+            with patch("run_screener.fdr.StockListing", return_value=listing_df):
+                with patch("run_screener.logger.info") as mock_info:
+                    tickers = screener._load_krx_from_classification_csv()
+
+        self.assertEqual(tickers, ["005930.KS", "091990.KQ", "035720.KS", "000250.KQ"])
+        self.assertEqual(screener.krx_ticker_map["005930.KS"], "삼성전자우선")
+        self.assertEqual(screener.krx_ticker_map["035720.KS"], "카카오")
+        self.assertEqual(screener.krx_ticker_map["000250.KQ"], "삼천당제약")
+        # Listing names only fill rows from the first listing lookup onward
+        self.assertNotIn("091990.KQ", screener.krx_ticker_map)
+        mock_info.assert_any_call(
+            f"Loaded 4 KRX tickers from {csv_path} "
+            "(name mapped: 4, invalid_code_skipped: 1, unknown_market_skipped: 1, listing_fallback_hits: 1)"
+        )
+
     def test_calculate_turtle_signals_tolerates_nan_latest_volume(self):
         screener = TurtleTradingScreener()
         data = pd.DataFrame(
@@ -84,11 +137,49 @@ class KRXLoaderTests(unittest.TestCase):
         normalized = screener._normalize_downloaded_frame(data, "000300.KS")
 
         self.assertIsNotNone(normalized)
-        self.assertEqual(list(normalized.columns), ["Open", "High", "Low", "Close", "Volume"])
+        self.assertEqual(list(normalized.columns), ["High", "Low", "Close", "Volume"])
+        self.assertEqual(list(normalized.dtypes), [np.float64] * 4)
         self.assertEqual(len(normalized), 2)
 
-    def test_download_data_safe_recovers_missing_batch_member_with_single_ticker_retry(self):
-        screener = TurtleTradingScreener()
+    def test_split_history_batch_returns_compact_views_over_one_batch_array(self):
+        screener = TurtleTradingScreener(price_store_dir=None)
+        dates = pd.date_range("2025-01-01", periods=6, freq="D")
+        fields = ["Open", "High", "Low", "Close", "Volume"]
+        rows = np.arange(6, dtype=float)[:, None]
+        data = pd.concat(
+            {
+                "AAA": pd.DataFrame(np.hstack([rows + 1.25] * 4 + [rows * 1000]), index=dates, columns=fields),
+                "BBB": pd.DataFrame(np.hstack([rows + 7.5] * 4 + [rows * 10]), index=dates, columns=fields),
+            },
+            axis=1,
+        )
+        # BBB starts trading later and misses a bar mid-history; AAA is complete
+        data.loc[dates[:2], "BBB"] = np.nan
+        data.loc[dates[4], "BBB"] = np.nan
+
+        frames = screener._split_history_batch(data, ["AAA", "BBB", "ZZZ"])
+
+        self.assertEqual(sorted(frames), ["AAA", "BBB"])
+        aaa, bbb = frames["AAA"], frames["BBB"]
+        self.assertEqual(list(aaa.columns), ["High", "Low", "Close", "Volume"])
+        self.assertEqual(aaa["High"].dtype, np.float64)
+        self.assertEqual(aaa["Close"].tolist(), (np.arange(6) + 1.25).tolist())
+        self.assertEqual(aaa["Volume"].tolist(), (np.arange(6) * 1000.0).tolist())
+        self.assertEqual(list(bbb.index), [dates[2], dates[3], dates[5]])
+        # Gap-free histories are views into the batch-wide array; BBB's gap forces a copy
+        self.assertIsNotNone(aaa["High"].to_numpy().base)
+        self.assertIs(aaa["High"].to_numpy().base, aaa["Volume"].to_numpy().base)
+        self.assertIsNot(bbb["High"].to_numpy().base, aaa["High"].to_numpy().base)
+
+        screener.data_provider = type("Provider", (), {"download_history": lambda self, tickers, period: data})()
+        screener.min_history_rows = 3
+        screener.download_data_safe(["AAA", "BBB"])
+        memory = screener.metrics.summary()["memory_mb"]
+        self.assertGreater(screener.metrics.counters["history_bytes"], 0)
+        self.assertIn("peak_rss", memory)
+
+    def test_download_data_safe_defers_missing_batch_member_instead_of_inline_retry(self):
+        screener = TurtleTradingScreener(price_store_dir=None)
         dates = pd.date_range("2025-01-01", periods=65, freq="D")
 
         good_batch = pd.DataFrame(
@@ -101,35 +192,84 @@ class KRXLoaderTests(unittest.TestCase):
             },
             index=dates,
         )
-        recovered_single = pd.DataFrame(
-            {
-                "Open": range(65),
-                "High": range(1, 66),
-                "Low": range(65),
-                "Close": range(1, 66),
-                "Volume": [120000] * 65,
-            },
-            index=dates,
-        )
 
         download_calls = []
 
         def fake_download(tickers, **kwargs):
             download_calls.append(tickers)
-            if isinstance(tickers, list):
-                return good_batch
-            if tickers == "000300.KS":
-                return recovered_single
-            return pd.DataFrame()
+            return good_batch
 
         with patch("run_screener.yf.download", side_effect=fake_download):
             result = screener.download_data_safe(["000020.KS", "000300.KS"])
 
-        self.assertEqual(set(result.keys()), {"000020.KS", "000300.KS"})
-        self.assertEqual(len(result["000020.KS"]), 65)
-        self.assertEqual(len(result["000300.KS"]), 65)
-        self.assertIn(["000020.KS", "000300.KS"], download_calls)
-        self.assertIn("000300.KS", download_calls)
+        self.assertEqual(set(result.keys()), {"000020.KS"})
+        self.assertEqual(download_calls, [["000020.KS", "000300.KS"]])
+
+    def test_run_screening_recovers_missing_batch_members_in_deferred_retry_batch(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            screener = TurtleTradingScreener(
+                no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                price_store_dir=None,
+                download_tuning_file=None,
+                checkpoint_file=None,
+            )
+            screener.batch_size = 2
+            screener.max_inflight_batches = 1
+            dates = pd.date_range("2025-01-01", periods=65, freq="D")
+
+            def batch_frame(tickers):
+                return pd.DataFrame(
+                    {
+                        (ticker, column): (range(65) if column != "Volume" else [100000] * 65)
+                        for ticker in tickers
+                        for column in ("Open", "High", "Low", "Close", "Volume")
+                    },
+                    index=dates,
+                )
+
+            download_calls = []
+
+            def fake_download(tickers, **kwargs):
+                download_calls.append(list(tickers))
+                if len(download_calls) <= 2:
+                    # main pass: the second member of every batch is missing
+                    return batch_frame(tickers[:1])
+                return batch_frame(tickers)
+
+            sleep_calls = []
+            universe = (["000020.KS", "000030.KS", "000040.KS", "000050.KS"], [])
+            with patch.object(screener, "get_ticker_universe", return_value=universe):
+                with patch("run_screener.yf.download", side_effect=fake_download):
+                    with patch("run_screener.time.sleep", side_effect=sleep_calls.append):
+                        results = screener.run_screening()
+
+        self.assertEqual(
+            download_calls,
+            [["000020.KS", "000030.KS"], ["000040.KS", "000050.KS"], ["000030.KS", "000050.KS"]],
+        )
+        self.assertIn(screener.retry_backoff_seconds, sleep_calls)
+        self.assertEqual(results["metadata"]["errors_count"], 0)
+        self.assertEqual(results["metadata"]["retried_tickers"], 2)
+        self.assertEqual(results["metadata"]["retry_recovered"], 2)
+
+    def test_drain_retry_queue_counts_duplicate_tickers_once(self):
+        screener = TurtleTradingScreener(price_store_dir=None, liquidity_index_file=None, checkpoint_file=None)
+        screener.adaptive_batching = False
+        screener.retry_backoff_seconds = 0
+        dates = pd.date_range("2025-01-01", periods=80, freq="D")
+        prices = [10.0 + i for i in range(80)]
+        frame = pd.DataFrame({"High": prices, "Low": prices, "Close": prices, "Volume": [300000] * 80}, index=dates)
+        filtered_stocks, errors = [], []
+
+        def fake_download(batch):
+            return {ticker: frame for ticker in batch}
+
+        with patch.object(screener, "download_data_safe", side_effect=fake_download) as download:
+            stats = screener._drain_retry_queue(["AAA", "BBB", "AAA"], filtered_stocks, errors)
+
+        self.assertEqual(download.call_args.args[0], ["AAA", "BBB"])
+        self.assertEqual(stats, {"queued": 2, "recovered": 2, "rounds": 1})
+        self.assertEqual(screener.metrics.counters["retried_tickers"], 2)
 
     def test_download_single_ticker_applies_rate_limit_cooldown_before_retry(self):
         screener = TurtleTradingScreener()
@@ -259,6 +399,1060 @@ class KRXLoaderTests(unittest.TestCase):
             "Sanitized invalid CA bundle environment variables: CURL_CA_BUNDLE, REQUESTS_CA_BUNDLE"
         )
 
+    def test_download_data_safe_fetches_only_tail_for_stored_history(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store_dir = Path(temp_dir) / "price_history"
+            dates = pd.date_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=3), periods=100, freq="D")
+            history = pd.DataFrame(
+                {
+                    "Open": [float(i) for i in range(100)],
+                    "High": [float(i + 1) for i in range(100)],
+                    "Low": [float(i) for i in range(100)],
+                    "Close": [float(i + 1) for i in range(100)],
+                    "Volume": [100000] * 100,
+                },
+                index=pd.DatetimeIndex(dates, name="Date"),
+            )
+
+            screener = TurtleTradingScreener(
+                no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                price_store_dir=str(store_dir),
+            )
+            with patch("run_screener.yf.download", return_value=history):
+                first = screener.download_data_safe(["000300.KS"])
+            screener._save_price_store()
+
+            self.assertEqual(len(first["000300.KS"]), 100)
+            self.assertTrue((store_dir / "krx.parquet").exists())
+
+            tail_dates = pd.DatetimeIndex([dates[-1], pd.Timestamp.now().normalize()], name="Date")
+            tail = pd.DataFrame(
+                {"Open": [1.0, 2.0], "High": [100.0, 500.0], "Low": [99.0, 2.0], "Close": [100.0, 400.0], "Volume": [1, 2]},
+                index=tail_dates,
+            )
+
+            reloaded = TurtleTradingScreener(
+                no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                price_store_dir=str(store_dir),
+            )
+            with patch("run_screener.yf.download", return_value=tail) as mock_download:
+                second = reloaded.download_data_safe(["000300.KS"])
+
+            merged = second["000300.KS"]
+            self.assertEqual(mock_download.call_args.kwargs["period"], "8d")
+            self.assertEqual(len(merged), 101)
+            self.assertEqual(merged["Close"].iloc[-2], 100.0)
+            self.assertEqual(merged["Close"].iloc[-1], 400.0)
+
+    def test_download_data_safe_redownloads_only_tickers_with_revised_adjusted_history(self):
+        dates = pd.date_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=80, freq="D")
+        closes = np.linspace(100.0, 180.0, 80)
+
+        def history(scale, index):
+            prices = closes[: len(index)] * scale
+            return pd.DataFrame(
+                {"High": prices + 1, "Low": prices - 1, "Close": prices, "Volume": 1000.0}, index=index
+            ).astype({"High": np.float32, "Low": np.float32, "Close": np.float32})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            screener = TurtleTradingScreener(price_store_dir=temp_dir, download_tuning_file=None)
+            screener._price_store = {"AAA": history(1.0, dates), "SPLIT": history(1.0, dates)}
+            stored_tail = history(1.0, dates).iloc[-6:]
+            tail = pd.concat([stored_tail, stored_tail.iloc[[-1]].set_axis([pd.Timestamp.now().normalize()])])
+            fetches = []
+
+            def fake_batch(tickers, period, min_rows):
+                fetches.append((list(tickers), period))
+                if period == screener.history_period:
+                    return {ticker: history(0.5, dates) for ticker in tickers}
+                # The split halves every adjusted bar of SPLIT, including the overlap
+                return {"AAA": tail, "SPLIT": tail * np.float32(0.5)}
+
+            with patch.object(screener, "_download_history_batch", side_effect=fake_batch):
+                result = screener.download_data_safe(["AAA", "SPLIT"])
+
+            self.assertEqual(fetches, [(["AAA", "SPLIT"], "6d"), (["SPLIT"], screener.history_period)])
+            self.assertEqual(len(result["AAA"]), 81)
+            self.assertEqual(result["SPLIT"]["Close"].iloc[0], np.float32(50.0))
+            self.assertEqual(screener._price_store["SPLIT"]["Close"].iloc[-1], np.float32(90.0))
+            self.assertEqual(screener.metrics.counters["history_revisions"], 1)
+
+    def test_published_prices_and_levels_equal_the_downloaded_prices(self):
+        dates = pd.date_range(end=pd.Timestamp.now().normalize(), periods=60, freq="D")
+        closes = np.round(np.linspace(120.11, 139.87, 60), 2)
+        closes[-1] = 150.37
+        highs, lows = np.round(closes + 0.13, 2), np.round(closes - 0.07, 2)
+        fields = {"Open": closes, "High": highs, "Low": lows, "Close": closes, "Volume": np.full(60, 500000.0)}
+        data = pd.concat({"AAA": pd.DataFrame(fields, index=dates)}, axis=1)
+
+        screener = TurtleTradingScreener(price_store_dir=None, download_tuning_file=None)
+        screener.data_provider = type("Provider", (), {"download_history": lambda self, tickers, period: data})()
+        frames = screener.download_data_safe(["AAA", "BBB"])
+        analyses, _ = screener.calculate_turtle_signals_batch(frames)
+        published = json.loads(json.dumps(analyses["AAA"]))
+
+        entry = published["signals"]["signal1"]["entry"]
+        self.assertEqual(published["current_price"], 150.37)
+        self.assertEqual(entry["price"], 150.37)
+        self.assertEqual(entry["breakout_level"], float(highs[-21:-1].max()))
+        self.assertEqual(entry["exit_level"], float(lows[-11:-1].min()))
+        self.assertEqual(published["breakout_levels"]["low_20"], float(lows[-21:-1].min()))
+
+    def test_calculate_turtle_signals_batch_matches_per_ticker_results(self):
+        screener = TurtleTradingScreener(price_store_dir=None)
+        dates = pd.date_range("2025-01-01", periods=80, freq="D")
+        rising = [100.0 + i for i in range(80)]
+        falling = [200.0 - i for i in range(80)]
+        frames = {
+            "005930.KS": pd.DataFrame(
+                {"High": [p * 60 for p in rising], "Low": [p * 50 for p in rising], "Close": [p * 60 for p in rising], "Volume": [150000] * 80},
+                index=dates,
+            ),
+            "AAPL": pd.DataFrame(
+                {"High": [p + 1 for p in falling], "Low": [p - 0.5 for p in falling], "Close": falling, "Volume": [250000] * 79 + [float("nan")]},
+                index=dates,
+            ),
+            "TINY": pd.DataFrame(
+                {"High": rising[:40], "Low": rising[:40], "Close": rising[:40], "Volume": [1] * 40},
+                index=dates[:40],
+            ),
+        }
+        frames["AAPL"].iloc[30, frames["AAPL"].columns.get_loc("Low")] = float("nan")
+
+        analyses, passes = screener.calculate_turtle_signals_batch(frames)
+
+        for ticker, frame in frames.items():
+            expected = screener.calculate_turtle_signals(frame, ticker)
+            self.assertEqual(analyses[ticker], expected)
+            self.assertEqual(passes[ticker], screener.passes_filters(expected))
+        self.assertIsNotNone(analyses["005930.KS"]["signals"]["signal1"]["entry"])
+        self.assertIsNotNone(analyses["AAPL"]["signals"]["signal1"]["exit"])
+        self.assertTrue(passes["005930.KS"])
+
+    def test_token_bucket_reserves_tokens_and_sleeps_for_deficit(self):
+        sleep_calls = []
+        with patch("run_screener.time.sleep", side_effect=sleep_calls.append):
+            with patch("run_screener.time.monotonic", return_value=100.0):
+                bucket = TokenBucket(rate_per_second=2.0, capacity=1)
+                first = bucket.acquire()
+                second = bucket.acquire()
+                third = bucket.acquire()
+
+        self.assertEqual(first, 0.0)
+        self.assertAlmostEqual(second, 0.5)
+        self.assertAlmostEqual(third, 1.0)
+        self.assertEqual(len(sleep_calls), 2)
+
+    def test_run_screening_downloads_batches_concurrently_in_deterministic_order(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            screener = TurtleTradingScreener(
+                no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                price_store_dir=None,
+                checkpoint_file=None,
+            )
+            screener.adaptive_batching = False
+            screener.retry_max_attempts = 0
+            screener.batch_size = 2
+            screener.max_inflight_batches = 3
+            tickers = [f"T{i}" for i in range(7)]
+            dates = pd.date_range("2025-01-01", periods=80, freq="D")
+            prices = [10.0 + i for i in range(80)]
+            frame = pd.DataFrame(
+                {"Open": prices, "High": prices, "Low": prices, "Close": prices, "Volume": [300000] * 80},
+                index=dates,
+            )
+            in_flight = []
+            peak = []
+            lock = threading.Lock()
+
+            def fake_download(batch):
+                with lock:
+                    in_flight.append(batch)
+                    peak.append(len(in_flight))
+                time.sleep(0.05 if batch[0] == "T0" else 0.01)
+                with lock:
+                    in_flight.remove(batch)
+                return {ticker: frame for ticker in batch if ticker != "T3"}
+
+            with patch.object(screener, "get_ticker_universe", return_value=([], tickers)):
+                with patch.object(screener, "download_data_safe", side_effect=fake_download):
+                    results = screener.run_screening()
+
+        self.assertGreater(max(peak), 1)
+        self.assertEqual(results["metadata"]["errors_count"], 1)
+        self.assertEqual(
+            [stock["ticker"] for stock in results["filtered_stocks"]],
+            ["T0", "T1", "T2", "T4", "T5", "T6"],
+        )
+
+    def test_next_batch_downloads_while_current_batch_is_processed_without_extra_concurrency(self):
+        screener = TurtleTradingScreener(price_store_dir=None, liquidity_index_file=None, checkpoint_file=None)
+        screener.adaptive_batching = False
+        screener.retry_max_attempts = 0
+        screener.batch_size = 2
+        screener.max_inflight_batches = 1
+        dates = pd.date_range("2025-01-01", periods=80, freq="D")
+        prices = [10.0 + i for i in range(80)]
+        frame = pd.DataFrame({"High": prices, "Low": prices, "Close": prices, "Volume": [300000] * 80}, index=dates)
+        started = set()
+        overlapped = []
+        process_batch = screener._process_batch
+
+        def fake_download(batch):
+            started.add(batch[0])
+            return {ticker: frame for ticker in batch}
+
+        def process_after_next_download_starts(batch_tickers, *args):
+            # With a single download slot, the following batch is still fetched during this compute
+            next_first = f"T{int(batch_tickers[0][1:]) + 2}"
+            if next_first != "T6":
+                deadline = time.monotonic() + 2
+                while next_first not in started and time.monotonic() < deadline:
+                    time.sleep(0.005)
+                overlapped.append(next_first in started)
+            process_batch(batch_tickers, *args)
+
+        with patch.object(screener, "get_ticker_universe", return_value=([], [f"T{i}" for i in range(6)])):
+            with patch.object(screener, "download_data_safe", side_effect=fake_download):
+                with patch.object(screener, "_process_batch", side_effect=process_after_next_download_starts):
+                    results = screener.run_screening()
+
+        self.assertEqual(overlapped, [True, True])
+        self.assertEqual(len(results["filtered_stocks"]), 6)
+        self.assertIn("download_wait", results["metadata"]["metrics"]["timings_seconds"])
+
+    def test_profile_workers_captures_download_work_done_in_worker_threads(self):
+        screener = TurtleTradingScreener(price_store_dir=None, liquidity_index_file=None, checkpoint_file=None)
+        screener.adaptive_batching = False
+        screener.batch_size = 2
+        screener.profile_workers = True
+        dates = pd.date_range("2025-01-01", periods=80, freq="D")
+        prices = [10.0 + i for i in range(80)]
+        frame = pd.DataFrame({"High": prices, "Low": prices, "Close": prices, "Volume": [300000] * 80}, index=dates)
+
+        def fake_download(batch):
+            return {ticker: frame for ticker in batch}
+
+        with patch.object(screener, "get_ticker_universe", return_value=([], [f"T{i}" for i in range(6)])):
+            with patch.object(screener, "download_data_safe", side_effect=fake_download):
+                screener.run_screening()
+
+        self.assertEqual(len(screener.worker_profiles), 3)
+        stats = pstats.Stats(*screener.worker_profiles)
+        self.assertIn("fake_download", {name for _, _, name in stats.stats})
+
+    def test_interrupted_run_resumes_from_checkpoint_without_redownloading_completed_batches(self):
+        dates = pd.date_range("2025-01-01", periods=80, freq="D")
+        prices = [10.0 + i for i in range(80)]
+        frame = pd.DataFrame({"High": prices, "Low": prices, "Close": prices, "Volume": [300000] * 80}, index=dates)
+        tickers = [f"T{i}" for i in range(6)]
+        downloaded = []
+
+        def fake_download(batch):
+            downloaded.append(list(batch))
+            return {ticker: frame for ticker in batch if ticker != "T1"}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            def make_screener():
+                screener = TurtleTradingScreener(
+                    output_file=str(Path(temp_dir) / "results.json"),
+                    no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                    price_store_dir=None,
+                    download_tuning_file=None,
+                    universe_cache_file=None,
+                    signal_state_file=None,
+                    shard_output_dir=None,
+                    version_file=None,
+                    liquidity_index_file=None,
+                    checkpoint_file=str(Path(temp_dir) / "checkpoint.json"),
+                )
+                screener.adaptive_batching = False
+                screener.retry_max_attempts = 0
+                screener.batch_size = 2
+                screener.max_inflight_batches = 1
+                screener.checkpoint_every_batches = 1
+                return screener
+
+            interrupted = make_screener()
+            process_batch = interrupted._process_batch
+
+            def killed_on_third_batch(batch_tickers, *args):
+                if batch_tickers[0] == "T4":
+                    raise KeyboardInterrupt
+                process_batch(batch_tickers, *args)
+
+            with patch.object(interrupted, "get_ticker_universe", return_value=([], tickers)):
+                with patch.object(interrupted, "download_data_safe", side_effect=fake_download):
+                    with patch.object(interrupted, "_process_batch", side_effect=killed_on_third_batch):
+                        with self.assertRaises(KeyboardInterrupt):
+                            interrupted.run_screening()
+
+            downloaded.clear()
+            resumed = make_screener()
+            self.assertEqual(resumed._restore_checkpoint("us", "other", [], [], None), set())
+            with patch.object(resumed, "get_ticker_universe", return_value=([], tickers)):
+                with patch.object(resumed, "download_data_safe", side_effect=fake_download):
+                    results = resumed.run_screening(resume=True)
+            self.assertTrue(resumed.save_results(results))
+            checkpoint_left = (Path(temp_dir) / "checkpoint.json").exists()
+
+        self.assertEqual(downloaded, [["T4", "T5"]])
+        self.assertEqual(sorted(stock["ticker"] for stock in results["filtered_stocks"]), ["T0", "T2", "T3", "T4", "T5"])
+        self.assertEqual(results["metadata"]["errors_count"], 1)
+        self.assertFalse(checkpoint_left)
+
+    def test_checkpoint_resumes_within_the_same_trading_session_regardless_of_age(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_path = Path(temp_dir) / "checkpoint.json"
+            screener = TurtleTradingScreener(
+                price_store_dir=None,
+                download_tuning_file=None,
+                universe_cache_file=None,
+                signal_state_file=None,
+                liquidity_index_file=None,
+                checkpoint_file=str(checkpoint_path),
+            )
+            sessions = screener._checkpoint_sessions("us")
+            payload = {
+                "market": "us",
+                "universe": "abc",
+                "sessions": sessions,
+                # Written 30h ago, e.g. a failed scheduled run re-run over the weekend
+                "updated_at": (datetime.now(timezone.utc) - timedelta(hours=30)).isoformat(),
+                "processed": ["T0", "T1"],
+                "filtered_stocks": [{"ticker": "T0"}],
+            }
+            checkpoint_path.write_text(json.dumps(payload), encoding="utf-8")
+            stocks = []
+            same_session = screener._restore_checkpoint("us", "abc", stocks, [], None)
+
+            earlier = date.fromisoformat(sessions["US"]) - timedelta(days=1)
+            checkpoint_path.write_text(
+                json.dumps({**payload, "sessions": {"US": earlier.isoformat()}}), encoding="utf-8"
+            )
+            earlier_session = screener._restore_checkpoint("us", "abc", [], [], None)
+
+        self.assertEqual(sorted(sessions), ["US"])
+        self.assertEqual(same_session, {"T0", "T1"})
+        self.assertEqual(stocks, [{"ticker": "T0"}])
+        self.assertEqual(earlier_session, set())
+
+    def test_time_budget_screens_signal_relevant_tickers_first_and_marks_partial_results(self):
+        dates = pd.date_range("2025-01-01", periods=80, freq="D")
+
+        def bars(close, high, low):
+            return pd.DataFrame(
+                {"High": [high] * 80, "Low": [low] * 80, "Close": [close] * 80, "Volume": [500000] * 80},
+                index=dates,
+            )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir) / "results.json"
+            no_signals = {"signal1": {"entry": None, "exit": None}, "signal2": {"entry": None, "exit": None}}
+            output_file.write_text(
+                json.dumps({"filtered_stocks": [{"ticker": "OPEN", "market": "US", "signals": no_signals}]}),
+                encoding="utf-8",
+            )
+            screener = TurtleTradingScreener(
+                output_file=str(output_file),
+                price_store_dir=None,
+                download_tuning_file=None,
+                universe_cache_file=None,
+                signal_state_file=None,
+                liquidity_index_file=None,
+                checkpoint_file=None,
+            )
+            spec = screener._signal_window_spec()
+            screener._signal_states = {
+                ticker: TurtleSignalState.from_frame(frame, spec, screener.volume_avg_period, tail_bars=5)
+                for ticker, frame in {
+                    "FAIL": bars(2.0, 2.01, 1.5),
+                    "FAR": bars(100.0, 130.0, 70.0),
+                    "NEAR": bars(100.0, 101.0, 90.0),
+                }.items()
+            }
+            universe = ["FAIL", "FAR", "NONE", "NEAR", "OPEN"]
+            self.assertEqual(screener._prioritize_tickers(universe), ["OPEN", "NEAR", "FAR", "NONE", "FAIL"])
+
+            screener.adaptive_batching = False
+            screener.batch_size = 1
+            screener.max_inflight_batches = 1
+            screener.time_budget_reserve_seconds = 0
+            downloaded = []
+
+            def slow_download(batch):
+                downloaded.extend(batch)
+                time.sleep(0.1)
+                return {ticker: bars(100.0, 101.0, 90.0) for ticker in batch}
+
+            with patch.object(screener, "get_ticker_universe", return_value=([], universe)):
+                with patch.object(screener, "download_data_safe", side_effect=slow_download):
+                    results = screener.run_screening(time_budget_seconds=0.35)
+
+        metadata = results["metadata"]
+        self.assertFalse(metadata["complete"])
+        self.assertEqual(downloaded[:2], ["OPEN", "NEAR"])
+        self.assertLess(len(downloaded), len(universe))
+        self.assertEqual(metadata["time_budget"]["deferred_count"], len(universe) - len(downloaded))
+        self.assertEqual(metadata["time_budget"]["deferred_sample"][-1], "FAIL")
+
+    def test_session_check_skips_holidays_without_requests_and_waits_for_the_new_bar(self):
+        def bars(last_day):
+            dates = pd.date_range(end=last_day, periods=3, freq="B")
+            return pd.DataFrame({"High": 2.0, "Low": 1.0, "Close": 1.5, "Volume": 1000.0}, index=dates)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir) / "results.json"
+            published = {"KRX": {"session_date": "2026-10-15"}, "US": {"session_date": "2026-10-15"}}
+            output_file.write_text(json.dumps({"metadata": {"markets": published}}), encoding="utf-8")
+            screener = TurtleTradingScreener(
+                output_file=str(output_file),
+                price_store_dir=None,
+                download_tuning_file=None,
+                universe_cache_file=None,
+                signal_state_file=None,
+                liquidity_index_file=None,
+                checkpoint_file=None,
+            )
+            screener.market_calendars["KRX"] = MarketCalendar("Asia/Seoul", "15:30", {date(2026, 10, 16)})
+            screener.session_poll_seconds = 0
+            stale = {"AAPL": bars("2026-10-15")}
+            probes = [stale, stale, {"AAPL": bars("2026-10-16"), "MSFT": bars("2026-10-16")}]
+
+            with patch.object(screener, "_download_history_batch", side_effect=probes) as probe:
+                # Friday evening in Seoul is a KRX holiday; New York has not closed Friday yet
+                friday_morning_ny = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+                self.assertEqual(
+                    screener.check_new_session("all", now=friday_morning_ny), {"KRX": "closed", "US": "closed"}
+                )
+                probe.assert_not_called()
+
+                friday_close_ny = datetime(2026, 10, 16, 21, 0, tzinfo=timezone.utc)
+                self.assertEqual(screener.check_new_session("us", now=friday_close_ny), {"US": "pending"})
+                self.assertEqual(
+                    screener.check_new_session("us", wait_seconds=5, now=friday_close_ny), {"US": "fresh"}
+                )
+                self.assertEqual(probe.call_count, 3)
+                self.assertEqual(probe.call_args.args[0], ["AAPL", "MSFT", "SPY"])
+
+            screener._record_session_date("AAPL", pd.Timestamp("2026-10-16"))
+            results = screener._assemble_results(
+                [], ["AAPL"], [], [], {"queued": 0, "recovered": 0, "rounds": 0}, time.time()
+            )
+            self.assertEqual(results["metadata"]["markets"]["US"]["session_date"], "2026-10-16")
+            self.assertIsNone(results["metadata"]["markets"]["KRX"]["session_date"])
+
+    def test_adaptive_batch_controller_grows_additively_and_backs_off_multiplicatively(self):
+        controller = AdaptiveBatchController(
+            batch_size=50, pause_seconds=1, failure_cooldown_seconds=8, rate_limit_cooldown_seconds=20
+        )
+
+        controller.record_batch(missing_count=0, rate_limited=False, tickers=50)
+        controller.record_batch(missing_count=0, rate_limited=False, tickers=55)
+        self.assertEqual(controller.batch_size, 60)
+        self.assertAlmostEqual(controller.pause_seconds, 0.81)
+
+        controller.record_batch(missing_count=3, rate_limited=False, tickers=10)
+        self.assertEqual(controller.batch_size, 30)
+        self.assertAlmostEqual(controller.failure_cooldown_seconds, 16)
+
+        controller.record_batch(missing_count=0, rate_limited=True, tickers=30)
+        self.assertEqual(controller.batch_size, 15)
+        self.assertAlmostEqual(controller.rate_limit_cooldown_seconds, 40)
+
+        # One delisted name in a batch is below missing_failure_ratio and counts as clean
+        controller.record_batch(missing_count=1, rate_limited=False, tickers=15)
+        self.assertEqual(controller.batch_size, 20)
+
+    def test_rate_limit_feedback_is_charged_only_to_the_batch_that_hit_it(self):
+        screener = TurtleTradingScreener(
+            price_store_dir=None, download_tuning_file=None, liquidity_index_file=None, checkpoint_file=None
+        )
+        screener.batch_size = 2
+        screener.max_inflight_batches = 3
+        screener.rate_limit_cooldown_seconds = 0.01
+        screener.retry_max_attempts = 1
+        screener.retry_backoff_seconds = 0
+        dates = pd.date_range("2025-01-01", periods=80, freq="D")
+        prices = [10.0 + i for i in range(80)]
+        frame = pd.DataFrame({"High": prices, "Low": prices, "Close": prices, "Volume": [300000] * 80}, index=dates)
+        all_started = threading.Barrier(3, timeout=2)
+
+        def fake_download(batch):
+            if batch[0] in ("T0", "T2", "T4"):
+                all_started.wait()  # every main-pass batch is in flight when T2's batch is limited
+            if batch[0] == "T2":
+                screener._apply_rate_limit_cooldown()
+            return {ticker: frame for ticker in batch if ticker != "T5"}
+
+        with patch.object(screener, "get_ticker_universe", return_value=([], [f"T{i}" for i in range(6)])):
+            with patch.object(screener, "download_data_safe", side_effect=fake_download):
+                with patch.object(screener, "_record_batch_feedback") as feedback:
+                    screener.run_screening()
+
+        # The retry batch (T5) gives no feedback
+        self.assertEqual(
+            [call.args for call in feedback.call_args_list], [(0, 2, False), (0, 2, True), (1, 2, False)]
+        )
+
+    def test_batch_failure_cooldown_ignores_a_few_missing_tickers(self):
+        dates = pd.date_range("2025-01-01", periods=80, freq="D")
+        prices = [10.0 + i for i in range(80)]
+        frame = pd.DataFrame({"High": prices, "Low": prices, "Close": prices, "Volume": [300000] * 80}, index=dates)
+        cooldowns = []
+        for missing in (["T3"], ["T3", "T5", "T7"]):
+            screener = TurtleTradingScreener(
+                price_store_dir=None, download_tuning_file=None, liquidity_index_file=None, checkpoint_file=None
+            )
+            screener.batch_size = 10
+            screener.retry_max_attempts = 0
+
+            def fake_download(batch):
+                return {ticker: frame for ticker in batch if ticker not in missing}
+
+            with patch.object(screener, "get_ticker_universe", return_value=([], [f"T{i}" for i in range(10)])):
+                with patch.object(screener, "download_data_safe", side_effect=fake_download):
+                    with patch.object(screener, "_apply_rate_limit_cooldown") as cooldown:
+                        screener.run_screening()
+            cooldowns.append(cooldown.call_count)
+
+        # 1 of 10 missing is within missing_failure_ratio; 3 of 10 is a failed batch
+        self.assertEqual(cooldowns, [0, 1])
+
+    def test_download_tuning_persists_between_runs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tuning_path = Path(temp_dir) / "downloader_tuning.json"
+            screener = TurtleTradingScreener(download_tuning_file=str(tuning_path), price_store_dir=None)
+            screener._record_batch_feedback(missing_count=0, tickers=50, rate_limited=False)
+            screener._record_batch_feedback(missing_count=0, tickers=55, rate_limited=True)
+            screener._save_download_tuning()
+
+            reloaded = TurtleTradingScreener(download_tuning_file=str(tuning_path), price_store_dir=None)
+            reloaded._get_batch_controller()
+
+        self.assertEqual(screener.batch_size, 27)
+        self.assertEqual(reloaded.batch_size, 27)
+        self.assertAlmostEqual(reloaded.rate_limit_cooldown_seconds, 40)
+
+    def test_incomplete_data_provider_fails_at_instantiation(self):
+        class HistoryOnlyProvider(DataProvider):
+            def download_history(self, tickers, period):
+                return None
+
+        with self.assertRaises(TypeError):
+            HistoryOnlyProvider()
+
+    def test_run_screening_replays_fixture_provider_without_network(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dates = pd.date_range("2025-01-01", periods=120, freq="D", name="Date")
+            rising = [10.0 + i for i in range(120)]
+            flat = [20.0] * 120
+            FixtureDataProvider.save(
+                temp_dir,
+                history={
+                    "AAA": pd.DataFrame(
+                        {"Open": rising, "High": rising, "Low": rising, "Close": rising, "Volume": [500000] * 120},
+                        index=dates,
+                    ),
+                    "BBB": pd.DataFrame(
+                        {"Open": flat, "High": flat, "Low": flat, "Close": flat, "Volume": [500000] * 120},
+                        index=dates,
+                    ),
+                },
+                listings={
+                    "S&P500": pd.DataFrame({"Symbol": ["AAA"]}),
+                    "NASDAQ": pd.DataFrame({"Symbol": ["BBB", "AAA"]}),
+                },
+            )
+
+            screener = TurtleTradingScreener(
+                krx_classification_file=str(Path(temp_dir) / "missing.csv"),
+                no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                price_store_dir=None,
+                download_tuning_file=None,
+                data_provider=FixtureDataProvider(temp_dir),
+                universe_cache_file=None,
+                checkpoint_file=None,
+            )
+            screener.batch_pause_seconds = 0.01
+
+            with patch("run_screener.yf.download", side_effect=AssertionError("network used")):
+                with patch("run_screener.fdr.StockListing", side_effect=AssertionError("network used")):
+                    results = screener.run_screening()
+
+        self.assertEqual(results["metadata"]["us_analyzed"], 2)
+        self.assertEqual(results["metadata"]["errors_count"], 0)
+        self.assertEqual([stock["ticker"] for stock in results["filtered_stocks"]], ["AAA"])
+        self.assertEqual(results["filtered_stocks"][0]["signals"]["signal1"]["entry"]["date"], "2025-04-30")
+
+    def test_fixture_replay_cli_leaves_live_caches_and_published_results_untouched(self):
+        with tempfile.TemporaryDirectory() as fixture_dir, tempfile.TemporaryDirectory() as work_dir:
+            dates = pd.date_range("2025-01-01", periods=120, freq="D", name="Date")
+            rising = [10.0 + i for i in range(120)]
+            FixtureDataProvider.save(
+                fixture_dir,
+                history={
+                    "AAA": pd.DataFrame(
+                        {"Open": rising, "High": rising, "Low": rising, "Close": rising, "Volume": [500000] * 120},
+                        index=dates,
+                    )
+                },
+                listings={"S&P500": pd.DataFrame({"Symbol": ["AAA"]}), "NASDAQ": pd.DataFrame({"Symbol": []})},
+            )
+
+            cwd = os.getcwd()
+            os.chdir(work_dir)
+            try:
+                with patch("sys.argv", ["run_screener.py", "--fixture-dir", fixture_dir]):
+                    run_screener.main()
+            finally:
+                os.chdir(cwd)
+
+            self.assertEqual(os.listdir(work_dir), [])
+            replay = Path(fixture_dir) / "replay"
+            results = json.loads((replay / "screener_results.json").read_text(encoding="utf-8"))
+            self.assertEqual([stock["ticker"] for stock in results["filtered_stocks"]], ["AAA"])
+            self.assertTrue((replay / "version.json").exists())
+            self.assertEqual(sorted(os.listdir(fixture_dir)), ["history.parquet", "listings", "replay"])
+
+    def test_market_scoped_run_merges_other_market_from_published_results(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dates = pd.date_range("2025-01-01", periods=120, freq="D", name="Date")
+            rising = [10.0 + i for i in range(120)]
+            FixtureDataProvider.save(
+                temp_dir,
+                history={
+                    "AAA": pd.DataFrame(
+                        {"Open": rising, "High": rising, "Low": rising, "Close": rising, "Volume": [500000] * 120},
+                        index=dates,
+                    ),
+                },
+                listings={"S&P500": pd.DataFrame({"Symbol": ["AAA"]}), "NASDAQ": pd.DataFrame({"Symbol": ["AAA"]})},
+            )
+            no_signals = {"signal1": {"entry": None, "exit": None}, "signal2": {"entry": None, "exit": None}}
+            published = {
+                "metadata": {"last_updated": "2025-04-30T06:40:00Z", "krx_analyzed": 2500, "us_analyzed": 900},
+                "filtered_stocks": [
+                    {"ticker": "005930.KS", "market": "KRX", "current_price": 72500,
+                     "signals": {**no_signals, "signal2": {"entry": {"type": "BUY"}, "exit": None}}},
+                    {"ticker": "OLD", "market": "US", "current_price": 50, "signals": no_signals},
+                ],
+            }
+            output_file = Path(temp_dir) / "results.json"
+            output_file.write_text(json.dumps(published), encoding="utf-8")
+            screener = TurtleTradingScreener(
+                output_file=str(output_file),
+                krx_classification_file=str(Path(temp_dir) / "missing.csv"),
+                no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                price_store_dir=None,
+                download_tuning_file=None,
+                data_provider=FixtureDataProvider(temp_dir),
+                universe_cache_file=None,
+                signal_state_file=None,
+                checkpoint_file=None,
+            )
+            screener.batch_pause_seconds = 0.01
+
+            with patch.object(screener, "_load_krx_from_classification_csv", side_effect=AssertionError("KRX loaded")):
+                results = screener.run_screening("us")
+
+        metadata = results["metadata"]
+        self.assertEqual(metadata["market_scope"], "us")
+        self.assertEqual([stock["ticker"] for stock in results["filtered_stocks"]], ["005930.KS", "AAA"])
+        self.assertEqual((metadata["krx_analyzed"], metadata["us_analyzed"], metadata["total_analyzed"]), (2500, 1, 2501))
+        self.assertEqual((metadata["krx_with_signals"], metadata["us_with_signals"]), (1, 1))
+        self.assertEqual(metadata["markets"]["KRX"]["last_updated"], "2025-04-30T06:40:00Z")
+        self.assertEqual(metadata["markets"]["US"]["last_updated"], metadata["last_updated"])
+        self.assertEqual(results["signal_breakdown"], {"signal1_count": 1, "signal2_count": 2})
+        with self.assertRaises(ValueError):
+            screener.run_screening("eu")
+
+    def test_liquidity_index_skips_persistently_illiquid_tickers_with_rotating_revalidation(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file = str(Path(temp_dir) / "liquidity_index.json")
+            screener = TurtleTradingScreener(price_store_dir=None, liquidity_index_file=index_file)
+            today = pd.Timestamp.now().normalize()
+            thin = [f"T{i:02d}" for i in range(20)]
+            for _ in range(screener.liquidity_skip_min_runs):
+                for ticker in thin:
+                    screener._record_liquidity(ticker, {"current_price": 1.0, "volume_20_avg": 5_000}, today)
+                screener._record_liquidity("AAPL", {"current_price": 150.0, "volume_20_avg": 2_000_000}, today)
+                # Fails the $5 price filter, but not by enough to be skipped
+                screener._record_liquidity("NEAR", {"current_price": 4.0, "volume_20_avg": 150_000}, today)
+            screener._record_liquidity("OLD", {"current_price": 1.0, "volume_20_avg": 5_000}, today - pd.Timedelta(days=45))
+            screener._save_liquidity_index()
+
+            reloaded = TurtleTradingScreener(price_store_dir=None, liquidity_index_file=index_file)
+            universe = ["AAPL", "NEAR", "NEW", "OLD"] + thin
+            runs = [reloaded._select_liquid_tickers(universe) for _ in range(10)]
+
+            for selected in runs:
+                self.assertEqual(selected[:4], ["AAPL", "NEAR", "NEW", "OLD"])
+            revalidated = [ticker for selected in runs for ticker in selected[4:]]
+            self.assertEqual(sorted(revalidated), thin)
+            self.assertEqual(reloaded._liquidity_skipped_tickers + reloaded._liquidity_revalidated_tickers, 20)
+
+            reloaded._record_liquidity("T00", {"current_price": 9.0, "volume_20_avg": 400_000}, today)
+            self.assertIn("T00", reloaded._select_liquid_tickers(universe))
+
+    def test_run_metrics_are_exported_in_metadata_and_metrics_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dates = pd.date_range("2025-01-01", periods=120, freq="D", name="Date")
+            rising = [10.0 + i for i in range(120)]
+            FixtureDataProvider.save(
+                temp_dir,
+                history={
+                    ticker: pd.DataFrame(
+                        {"Open": rising, "High": rising, "Low": rising, "Close": rising, "Volume": [500000] * 120},
+                        index=dates,
+                    )
+                    for ticker in ["AAA", "BBB", "CCC"]
+                },
+                listings={"S&P500": pd.DataFrame({"Symbol": ["AAA", "BBB"]}), "NASDAQ": pd.DataFrame({"Symbol": ["CCC"]})},
+            )
+            metrics_path = Path(temp_dir) / "run_metrics.json"
+            screener = TurtleTradingScreener(
+                output_file=str(Path(temp_dir) / "out" / "results.json"),
+                krx_classification_file=str(Path(temp_dir) / "missing.csv"),
+                no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                price_store_dir=None,
+                download_tuning_file=None,
+                data_provider=FixtureDataProvider(temp_dir),
+                universe_cache_file=None,
+                metrics_file=str(metrics_path),
+                signal_state_file=None,
+                shard_output_dir=None,
+                version_file=None,
+                liquidity_index_file=None,
+                checkpoint_file=None,
+            )
+            screener.adaptive_batching = False
+            screener.batch_size = 2
+            screener.batch_pause_seconds = 0.01
+
+            results = screener.run_screening()
+            self.assertTrue(screener.save_results(results))
+            with metrics_path.open(encoding="utf-8") as f:
+                metrics_file = json.load(f)
+
+        metrics = results["metadata"]["metrics"]
+        self.assertEqual(metrics["counters"]["http_requests"], 2)
+        self.assertEqual(metrics["counters"]["listing_requests"], 2)
+        self.assertEqual(metrics["download_batches"]["count"], 2)
+        for stage in ("universe", "main_pass", "download_batches", "signals"):
+            self.assertIn(stage, metrics["timings_seconds"])
+        self.assertIn("serialization", metrics_file["timings_seconds"])
+        self.assertEqual([batch["tickers"] for batch in metrics_file["batches"]], [2, 1])
+
+    def test_process_pool_backtest_and_sweep_match_in_process_results(self):
+        screener = TurtleTradingScreener(price_store_dir=None, signal_state_file=None)
+        dates = pd.date_range("2025-01-01", periods=120, freq="D")
+        frames = {}
+        for offset, ticker in enumerate(["005930.KS", "000660.KS", "AAPL", "MSFT", "NVDA"]):
+            closes = [100.0 + ((i + offset * 5) % 29) * 2 - ((i + offset) % 6) * 3 + i * 0.3 for i in range(120 - offset * 7)]
+            frames[ticker] = pd.DataFrame(
+                {"High": [c + 1 for c in closes], "Low": [c - 1 for c in closes], "Close": closes},
+                index=dates[offset * 7:],
+            )
+
+        summary, trades = screener.backtest_turtle_signals(frames)
+        grid = screener.sweep_turtle_periods(frames, [20, 55], [10, 20])
+
+        screener.process_workers = 2
+        screener.min_tickers_per_process = 1
+        with self.assertLogs("run_screener", level="INFO") as logs:
+            pooled_summary, pooled_trades = screener.backtest_turtle_signals(frames)
+            pooled_grid = screener.sweep_turtle_periods(frames, [20, 55], [10, 20])
+
+        self.assertIn("_backtest_panels: 5 tickers over 2 processes", "\n".join(logs.output))
+        self.assertGreater(len(trades), 0)
+        self.assertEqual(pooled_summary, summary)
+        pd.testing.assert_frame_equal(pooled_trades, trades)
+        pd.testing.assert_frame_equal(pooled_grid, grid)
+
+    def test_save_results_writes_compact_shards_index_and_version_manifest(self):
+        def stock(ticker, market, price, signal1_entry=None, signal1_exit=None, signal2_entry=None):
+            return {
+                "ticker": ticker,
+                "market": market,
+                "current_price": price,
+                "signals": {
+                    "signal1": {"entry": signal1_entry, "exit": signal1_exit},
+                    "signal2": {"entry": signal2_entry},
+                },
+            }
+
+        entry = {"type": "BUY", "breakout_level": 1.0, "exit_level": 0.5, "date": "2025-08-12"}
+        results = {
+            "metadata": {"total_signals_found": 3},
+            "signal_breakdown": {"signal1_count": 2, "signal2_count": 1},
+            "filtered_stocks": [
+                stock("005930.KS", "KRX", 72500, signal1_entry=entry, signal2_entry=entry),
+                stock("AAPL", "US", 190, signal1_exit={"type": "SELL", "date": "2025-08-12"}),
+                stock("MSFT", "US", 120, signal1_entry=entry),
+            ],
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            shard_dir = Path(temp_dir) / "shards"
+            screener = TurtleTradingScreener(
+                output_file=str(Path(temp_dir) / "results.json"),
+                no_data_cache_file=str(Path(temp_dir) / "no_data_cache.json"),
+                price_store_dir=None,
+                download_tuning_file=None,
+                universe_cache_file=None,
+                signal_state_file=None,
+                shard_output_dir=str(shard_dir),
+                version_file=str(Path(temp_dir) / "version.json"),
+                liquidity_index_file=None,
+                checkpoint_file=None,
+            )
+            (shard_dir).mkdir()
+            (shard_dir / "us-signal1.stale.json").write_text("[]", encoding="utf-8")
+            self.assertTrue(screener.save_results(results))
+
+            index = json.loads((shard_dir / "index.json").read_text(encoding="utf-8"))
+            loaded = {}
+            for shard in index["shards"]:
+                raw = (shard_dir / shard["file"]).read_bytes()
+                self.assertEqual(gzip.decompress((shard_dir / (shard["file"] + ".gz")).read_bytes()), raw)
+                self.assertNotIn(b"\n", raw)
+                loaded[shard["file"].split(".")[0]] = (shard, json.loads(raw))
+            self.assertFalse((shard_dir / "us-signal1.stale.json").exists())
+            manifest = json.loads((Path(temp_dir) / "version.json").read_text(encoding="utf-8"))
+            results_hash = hashlib.sha256((Path(temp_dir) / "results.json").read_bytes()).hexdigest()
+            index_hash = hashlib.sha256((shard_dir / "index.json").read_bytes()).hexdigest()
+
+            self.assertTrue(screener.save_results(results))
+            unchanged = json.loads((Path(temp_dir) / "version.json").read_text(encoding="utf-8"))
+            results["filtered_stocks"][2]["current_price"] = 121
+            self.assertTrue(screener.save_results(results))
+            changed = json.loads((Path(temp_dir) / "version.json").read_text(encoding="utf-8"))
+
+        self.assertNotIn("filtered_stocks", index)
+        self.assertEqual(index["signal_breakdown"], results["signal_breakdown"])
+        self.assertEqual(sorted(loaded), ["krx-signal1-signal2", "us-signal1"])
+        us_shard, us_stocks = loaded["us-signal1"]
+        self.assertEqual([stock["ticker"] for stock in us_stocks], ["AAPL", "MSFT"])
+        self.assertEqual((us_shard["market"], us_shard["signals"], us_shard["actions"]), ("US", ["signal1"], ["entry", "exit"]))
+        self.assertEqual(loaded["krx-signal1-signal2"][0]["signals"], ["signal1", "signal2"])
+        self.assertEqual(manifest["results"], {"file": "results.json", "hash": results_hash})
+        self.assertEqual(manifest["index"], {"file": "shards/index.json", "hash": index_hash})
+        self.assertEqual(len(manifest["version"]), 16)
+        self.assertEqual(unchanged, manifest)
+        self.assertNotEqual(changed["version"], manifest["version"])
+        self.assertEqual(changed["shards"]["krx-signal1-signal2"], manifest["shards"]["krx-signal1-signal2"])
+        self.assertNotEqual(changed["shards"]["us-signal1"], manifest["shards"]["us-signal1"])
+
+    def test_version_manifest_ignores_run_metadata_when_stocks_are_unchanged(self):
+        stocks = [{"ticker": "AAPL", "market": "US", "current_price": 190, "signals": {}}]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            screener = TurtleTradingScreener(
+                output_file=str(Path(temp_dir) / "results.json"),
+                no_data_cache_file=None,
+                price_store_dir=None,
+                download_tuning_file=None,
+                universe_cache_file=None,
+                signal_state_file=None,
+                shard_output_dir=None,
+                version_file=str(Path(temp_dir) / "version.json"),
+                liquidity_index_file=None,
+                checkpoint_file=None,
+            )
+            manifests = []
+            for run, price in enumerate([190, 190, 191]):
+                results = {
+                    "metadata": {"last_updated": f"2025-08-1{run}T21:00:00Z", "processing_time": 10.0 + run},
+                    "filtered_stocks": [{**stocks[0], "current_price": price}],
+                }
+                self.assertTrue(screener.save_results(results))
+                manifests.append(json.loads((Path(temp_dir) / "version.json").read_text(encoding="utf-8")))
+
+        self.assertEqual(manifests[0]["version"], manifests[1]["version"])
+        self.assertNotEqual(manifests[0]["results"]["hash"], manifests[1]["results"]["hash"])
+        self.assertEqual(manifests[1]["last_updated"], "2025-08-11T21:00:00Z")
+        self.assertNotEqual(manifests[1]["version"], manifests[2]["version"])
+
+    def test_universe_cache_serves_fresh_snapshot_and_falls_back_to_stale_one(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = Path(temp_dir) / "ticker_universe.json"
+            listings = {
+                "S&P500": pd.DataFrame(
+                    {"Symbol": ["BRK.B", "AAA"], "Name": ["Berkshire", "Triple A"], "Sector": ["Financials", None]}
+                ),
+                "NASDAQ": pd.DataFrame({"Symbol": ["BBB", "AAA"], "Name": ["Double B", "Triple A"]}),
+            }
+
+            def make_screener():
+                return TurtleTradingScreener(
+                    krx_classification_file=str(Path(temp_dir) / "missing.csv"),
+                    universe_cache_file=str(cache_path),
+                )
+
+            screener = make_screener()
+            with patch.object(screener.data_provider, "stock_listing", side_effect=lambda market: listings[market]):
+                _, us_tickers = screener.get_ticker_universe()
+            screener._save_universe_cache()
+
+            cached = make_screener()
+            with patch.object(cached.data_provider, "stock_listing", side_effect=AssertionError("listing fetched")):
+                _, cached_tickers = cached.get_ticker_universe()
+
+            stale = make_screener()
+            stale.universe_cache_ttl_hours = 0
+            with patch.object(stale.data_provider, "stock_listing", side_effect=RuntimeError("listing down")):
+                _, stale_tickers = stale.get_ticker_universe()
+
+            with cache_path.open(encoding="utf-8") as f:
+                snapshot = json.load(f)["sources"]["S&P500"]
+
+        self.assertEqual(us_tickers, ["BRK-B", "AAA", "BBB"])
+        self.assertEqual(cached_tickers, us_tickers)
+        self.assertEqual(stale_tickers, us_tickers)
+        self.assertEqual(cached._universe_sources["NASDAQ"]["status"], "cached")
+        self.assertEqual(stale._universe_sources["S&P500"]["status"], "stale")
+        self.assertEqual(snapshot["records"][0], {"ticker": "BRK-B", "name": "Berkshire", "sector": "Financials"})
+        self.assertEqual(len(snapshot["content_hash"]), 64)
+
+    def test_signal_state_folds_new_bars_and_rebuilds_on_revised_history(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_path = Path(temp_dir) / "signal_state.json"
+            dates = pd.date_range("2025-01-01", periods=90, freq="D")
+            closes = [100.0 + (i % 17) * 3 - (i % 5) for i in range(80)] + [200.0 + 2 * i for i in range(10)]
+            frame = pd.DataFrame(
+                {
+                    "Open": closes,
+                    "High": [c + 1 for c in closes],
+                    "Low": [c - 1 for c in closes],
+                    "Close": closes,
+                    "Volume": [250000 + i for i in range(90)],
+                },
+                index=dates,
+            )
+
+            first = TurtleTradingScreener(price_store_dir=None, signal_state_file=str(state_path))
+            first._calculate_signals_incremental({"AAA": frame.iloc[:80]})
+            first._save_signal_states()
+
+            second = TurtleTradingScreener(price_store_dir=None, signal_state_file=str(state_path))
+            analyses, passes = second._calculate_signals_incremental({"AAA": frame})
+            folded_state = second._signal_states["AAA"].to_dict()
+
+            revised = frame.copy()
+            revised.loc[dates[78], "Close"] += 0.5
+            rebuilt, _ = second._calculate_signals_incremental({"AAA": revised})
+            rebuilt_state = second._signal_states["AAA"]
+
+        spec = second._signal_window_spec()
+        replayed = TurtleSignalState.from_frame(frame, spec, second.volume_avg_period, tail_bars=5).to_dict()
+        for key in ("bars", "tail", "volumes", "volume_avg", "levels"):
+            self.assertEqual(folded_state[key], replayed[key])
+        replayed_revised = TurtleSignalState.from_frame(revised, spec, second.volume_avg_period, tail_bars=5)
+        self.assertEqual(list(rebuilt_state.tail), list(replayed_revised.tail))
+        self.assertEqual(rebuilt_state.levels, replayed_revised.levels)
+        self.assertEqual(
+            {name: window.value() for name, window in rebuilt_state.windows.items()},
+            {name: window.value() for name, window in replayed_revised.windows.items()},
+        )
+
+        expected = second.calculate_turtle_signals(frame, "AAA")
+        self.assertEqual(analyses["AAA"], expected)
+        self.assertEqual(passes["AAA"], second.passes_filters(expected))
+        self.assertIsNotNone(expected["signals"]["signal1"]["entry"])
+        self.assertEqual(second.metrics.counters["signal_state_updates"], 1)
+        self.assertEqual(second.metrics.counters["signal_state_rebuilds"], 1)
+        self.assertEqual(rebuilt["AAA"], second.calculate_turtle_signals(revised, "AAA"))
+
+    def test_incremental_signals_read_from_state_match_full_recompute(self):
+        dates = pd.bdate_range("2025-01-01", periods=100)
+        rng = np.random.default_rng(7)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (100, 3)), axis=0))
+        frames = {
+            ticker: pd.DataFrame(
+                {
+                    "Open": closes[:, idx],
+                    "High": closes[:, idx] * 1.01,
+                    "Low": closes[:, idx] * 0.99,
+                    "Close": closes[:, idx],
+                    "Volume": 200000.0 + idx,
+                },
+                index=dates,
+            )
+            for idx, ticker in enumerate(["AAA", "BBB", "CCC"])
+        }
+        screener = TurtleTradingScreener(price_store_dir=None, signal_state_file=None)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            screener.signal_state_file = str(Path(temp_dir) / "signal_state.json")
+            screener._calculate_signals_incremental({ticker: frame.iloc[:80] for ticker, frame in frames.items()})
+
+            for end in range(81, 95):
+                # CCC skips ahead by more than signal_state_max_new_bars, so it is recomputed once
+                day = {ticker: frame.iloc[:end] for ticker, frame in frames.items() if ticker != "CCC" or end >= 90}
+                with patch.object(screener, "_compute_signal_arrays", wraps=screener._compute_signal_arrays) as batch:
+                    analyses, passes = screener._calculate_signals_incremental(day)
+                if end > 90:
+                    batch.assert_not_called()
+                for ticker in day:
+                    expected = screener.calculate_turtle_signals(day[ticker], ticker)
+                    self.assertEqual(analyses[ticker], expected)
+                    self.assertEqual(passes[ticker], screener.passes_filters(expected))
+
+        self.assertEqual(screener.metrics.counters["signal_state_rebuilds"], 4)
+        self.assertEqual(screener.metrics.counters["signal_state_updates"], 2 * 14 + 4)
+
+    def test_backtest_turtle_signals_pairs_entries_with_signal_specific_exits(self):
+        screener = TurtleTradingScreener(price_store_dir=None, signal_state_file=None)
+        dates = pd.date_range("2025-01-01", periods=90, freq="D")
+        # Flat until a breakout on bar 70, then a pullback on bar 80 that only breaks the 10-day low
+        closes = [100.0] * 70 + [110.0 + 2 * i for i in range(10)] + [105.0] * 10
+        breakout = pd.DataFrame(
+            {"High": [c + 1 for c in closes], "Low": [c - 1 for c in closes], "Close": closes, "Volume": [250000] * 90},
+            index=dates,
+        )
+        flat = pd.DataFrame({"High": [11.0] * 90, "Low": [9.0] * 90, "Close": [10.0] * 90, "Volume": [1000] * 90}, index=dates)
+
+        summary, trades = screener.backtest_turtle_signals({"005930.KS": breakout, "FLAT": flat})
+
+        signal1 = trades[trades["signal"] == "signal1"].iloc[0]
+        self.assertEqual((signal1["entry_date"], signal1["exit_date"]), (dates[70], dates[80]))
+        self.assertEqual(signal1["holding_bars"], 10)
+        self.assertAlmostEqual(signal1["return_pct"], (105.0 / 110.0 - 1) * 100)
+        signal2 = trades[trades["signal"] == "signal2"].iloc[0]
+        self.assertEqual(signal2["entry_date"], dates[70])
+        self.assertTrue(signal2["open"])
+        self.assertEqual(len(trades), 2)
+        self.assertEqual(summary["KRX"]["signal1"]["trades"], 1)
+        self.assertEqual(summary["KRX"]["signal1"]["hit_rate"], 0.0)
+        self.assertEqual(summary["KRX"]["signal2"]["open_trades"], 1)
+        self.assertIsNone(summary["US"]["signal1"]["hit_rate"])
+        self.assertEqual(summary["US"]["signal2"]["worst_max_drawdown_pct"], 0.0)
+
+    def test_period_sweep_reads_every_window_from_shared_sparse_table(self):
+        screener = TurtleTradingScreener(price_store_dir=None, signal_state_file=None)
+        dates = pd.date_range("2025-01-01", periods=150, freq="D")
+        closes = [100.0 + (i % 23) * 2 - (i % 7) * 3 + i * 0.4 for i in range(150)]
+        lows = [c - 1 - (i % 3) for i, c in enumerate(closes)]
+        lows[40] = float("nan")
+        frames = {
+            "005930.KS": pd.DataFrame({"High": [c + 1 for c in closes], "Low": lows, "Close": closes}, index=dates),
+            "AAPL": pd.DataFrame({"High": [c * 1.01 for c in closes[::-1]], "Low": [c * 0.99 for c in closes[::-1]], "Close": closes[::-1]}, index=dates),
+        }
+
+        panels = screener._build_history_panels(frames)
+        table = RangeExtremeTable(panels["Low"], [5, 13, 37], is_max=False)
+        for window in (5, 13, 37):
+            expected = pd.DataFrame(panels["Low"]).rolling(window).min().shift(1).to_numpy()
+            np.testing.assert_array_equal(table.window(window), expected)
+        with self.assertRaises(ValueError):
+            table.window(6)
+
+        grid = screener.sweep_turtle_periods(frames, [55, 20, 30], [10, 20])
+        summary, _ = screener.backtest_turtle_signals(frames)
+
+        self.assertEqual(len(grid), 2 * 3 * 2)
+        for market in ("KRX", "US"):
+            row = grid[(grid["market"] == market) & (grid["entry_period"] == 55) & (grid["exit_period"] == 20)].iloc[0]
+            for key, value in summary[market]["signal2"].items():
+                self.assertEqual(None if pd.isna(row[key]) else row[key], value)
 
 if __name__ == "__main__":
     unittest.main()